@@ -8,6 +8,10 @@ from ..core.types import UserCommand
 from ..core.queue_mgr import CommandQueue
 from ..core.gateway import SecurityGateway
 from ..core.privacy import PrivacyScrubber
+from ..core.model_manager import ModelManager, models_for
+from ..core.admission import AdmissionController, Admission
+from ..core.outbox import OutboxRelay
+from ..core.cancellation import is_stop, handle_stop
 
 logger = logging.getLogger(__name__)
 
@@ -16,11 +20,16 @@ class TelegramAdapter:
         self.app = ApplicationBuilder().token(Config.TELEGRAM_TOKEN).build()
         self.queue = CommandQueue.get_instance()
         self.coordinator = coordinator
+        self.models = ModelManager.get_instance()
+        self.admission = AdmissionController.get_instance()
         self.bot: Optional[Bot] = None
 
         if self.coordinator:
             # Register callback so Coordinator can send messages properly
             self.coordinator.set_callback(self.send_message_sync)
+        elif Config.WORKER_PROCESSES:
+            # Coordinators run in worker processes and reply through the outbox
+            OutboxRelay(self.send_message_sync, "telegram").start()
 
         # Add Handlers
         handler = MessageHandler(filters.TEXT & (~filters.COMMAND), self.handle_message)
@@ -49,11 +58,33 @@ class TelegramAdapter:
         )
 
         # Gateway Check
-        if SecurityGateway.validate_command(command):
-            self.queue.put(command)
-            # Don't auto-reply here; let Coordinator handle logic
-        else:
+        if not SecurityGateway.validate_command(command):
             await update.message.reply_text("⛔ Access Denied.")
+            return
+
+        # STOP skips the queue, or it would wait behind the very command it stops
+        if is_stop(text):
+            await update.message.reply_text(handle_stop(command, self.queue))
+            return
+
+        # Readiness Check (only the models this command needs)
+        ready, failed = self.models.check(models_for(command))
+        if not ready:
+            await update.message.reply_text("⏳ Still loading models, please try again in a moment.")
+            return
+
+        # Admission (dedup, load shedding, rate limits)
+        decision = self.admission.admit(command)
+        if decision != Admission.ACCEPT:
+            reply = self.admission.reply_for(decision)
+            if reply:
+                await update.message.reply_text(reply)
+            return
+
+        self.queue.put(command)
+        if failed:
+            await update.message.reply_text(f"⚠️ Could not load {', '.join(failed)}; this may be slow or fail.")
+        # Don't auto-reply here; let Coordinator handle logic
 
     def send_message_sync(self, chat_id: str, text: str):
         """
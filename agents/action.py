@@ -4,7 +4,12 @@ import pyautogui
 import subprocess
 from typing import Any
 from ..core.types import Step, AgentResult
+from ..core.metrics import Metrics
+from ..core.cancellation import CancellationToken
 from .skeletons import BaseAgent
+from ..core.waits import profile, settle, wait_for_window, wait_for_process
+from ..core.text_entry import type_text
+from ..skills.launcher import AppLauncher
 
 logger = logging.getLogger(__name__)
 
@@ -14,12 +19,22 @@ pyautogui.FAILSAFE = True
 class ActionAgent(BaseAgent):
     def __init__(self):
         super().__init__("Action")
+        self.metrics = Metrics.get_instance()
 
-    def execute(self, step: Step, context: Any) -> AgentResult:
+    def execute(self, step: Step, context: Any, cancel: CancellationToken = None) -> AgentResult:
         """
         Executes a single step.
         Context usually contains {"x": 123, "y": 456} from VisionAgent.
+        cancel cuts WAIT steps short.
         """
+        start = time.perf_counter()
+        result = self._dispatch(step, context, cancel)
+        elapsed = (time.perf_counter() - start) * 1000
+        self.metrics.observe(f"action.{step.action_type.upper()}.ms", elapsed)
+        logger.info(f"{step.action_type} took {elapsed:.0f} ms")
+        return result
+
+    def _dispatch(self, step: Step, context: Any, cancel: CancellationToken = None) -> AgentResult:
         try:
             action = step.action_type.upper()
             
@@ -32,13 +47,17 @@ class ActionAgent(BaseAgent):
                 return self._click(context["x"], context["y"])
             
             elif action == "TYPE":
-                return self._type_text(step.value)
+                return self._type_text(step.value, hint=step.description)
             
             elif action == "PRESS":
                 return self._press_key(step.value)
             
             elif action == "WAIT":
-                time.sleep(float(step.value or 1.0))
+                seconds = float(step.value or 1.0)
+                if cancel is None:
+                    time.sleep(seconds)
+                elif cancel.wait(seconds):
+                    return AgentResult(success=False, message=f"Cancelled ({cancel.reason})")
                 return AgentResult(success=True, message="Waited")
 
             else:
@@ -53,23 +72,28 @@ class ActionAgent(BaseAgent):
 
     def _open_app(self, app_name: str) -> AgentResult:
         logger.info(f"Opening App: {app_name}")
-        # Method 1: PyAutoGUI Win+R (More visual, generic)
+        # Method 1: Direct spawn from the app index
+        launched = AppLauncher.get_instance().launch(app_name)
+        if launched:
+            return AgentResult(success=launched.success, data=launched.data, message=launched.message)
+
+        # Method 2: PyAutoGUI Win+R (More visual, generic)
         pyautogui.hotkey('win', 'r')
-        time.sleep(0.5)
+        settle(0.5, lambda t: wait_for_window(r"^run$", t), label="run_dialog")
         pyautogui.write(app_name)
         pyautogui.press('enter')
-        time.sleep(2.0) # Wait for launch
+        settle(2.0, lambda t: wait_for_process(app_name, t), label="app_launch") # Wait for launch
         return AgentResult(success=True, message=f"Launched {app_name}")
 
     def _click(self, x: int, y: int) -> AgentResult:
         logger.info(f"Clicking at {x}, {y}")
-        pyautogui.moveTo(x, y, duration=0.5) # Human-like movement
+        pyautogui.moveTo(x, y, duration=profile().move_duration) # Human-like unless profile is fast
         pyautogui.click()
         return AgentResult(success=True, message=f"Clicked {x},{y}")
 
-    def _type_text(self, text: str) -> AgentResult:
-        logger.info(f"Typing: {text}")
-        pyautogui.write(text, interval=0.05) # Human-like typing
+    def _type_text(self, text: str, hint: str = None) -> AgentResult:
+        strategy = type_text(text, hint=hint)
+        logger.info(f"Typed {len(text)} chars ({strategy})")
         return AgentResult(success=True, message="Typed text")
 
     def _press_key(self, key: str) -> AgentResult:
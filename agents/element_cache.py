@@ -0,0 +1,142 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+from PIL import Image, ImageStat
+from ..core.config import Config
+from ..core.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+Region = Tuple[int, int, int, int]
+
+def dhash(image: Image.Image, hash_size: int = 16) -> int:
+    """
+    Difference hash: grayscale, shrink to (hash_size+1) x hash_size and
+    record whether each pixel is brighter than its right neighbour.
+    Robust to compression noise, sensitive to layout and text changes.
+    """
+    small = image.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+    pixels = small.tobytes()
+    bits = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return bits
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+def brightness(image: Image.Image) -> float:
+    return ImageStat.Stat(image.convert("L")).mean[0]
+
+class ElementLocationCache:
+    """
+    Remembers where elements were found, together with a perceptual hash of
+    the screen region around them. While that region still looks the same,
+    the stored location is returned without asking the vision model; once
+    the hash drifts past max_distance the entry is dropped.
+    dHash only sees gradients, so mean brightness is checked as well to
+    catch a flat region turning into a different flat region.
+    Besides the shared instance, a plan keeps a private one (name
+    "sightings") for locations no action has confirmed yet.
+    """
+    MAX_BRIGHTNESS_DELTA = 24.0
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, max_entries: int = None, max_distance: int = None, region_size: int = None,
+                 name: str = "element_cache"):
+        self.max_entries = max_entries or Config.ELEMENT_CACHE_SIZE
+        self.max_distance = Config.ELEMENT_CACHE_MAX_DISTANCE if max_distance is None else max_distance
+        self.region_size = region_size or Config.ELEMENT_CACHE_REGION
+        self.name = name
+        self.metrics = Metrics.get_instance()
+        # (description, region hash) -> (screen x, screen y, frame region, brightness)
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[int, int, Region, float]]" = OrderedDict()
+        self._entries_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = ElementLocationCache()
+        return cls._instance
+
+    @staticmethod
+    def _key(description: str) -> str:
+        return " ".join(description.lower().split())
+
+    def region_around(self, frame: Image.Image, fx: int, fy: int) -> Region:
+        half = self.region_size // 2
+        width, height = frame.size
+        return (max(0, fx - half), max(0, fy - half), min(width, fx + half), min(height, fy + half))
+
+    def region_signature(self, frame: Image.Image, region: Region) -> Tuple[int, float]:
+        crop = frame.crop(region)
+        return dhash(crop), brightness(crop)
+
+    def lookup(self, description: str, frame: Image.Image) -> Optional[Tuple[int, int]]:
+        """Screen coordinates of the element if its surroundings are unchanged."""
+        key = self._key(description)
+        with self._entries_lock:
+            candidates = [(k, v) for k, v in reversed(self._entries.items()) if k[0] == key]
+
+        for entry_key, (x, y, region, level) in candidates:
+            current_hash, current_level = self.region_signature(frame, region)
+            distance = hamming(entry_key[1], current_hash)
+            if distance <= self.max_distance and abs(current_level - level) <= self.MAX_BRIGHTNESS_DELTA:
+                with self._entries_lock:
+                    if entry_key in self._entries:
+                        self._entries.move_to_end(entry_key)
+                self.metrics.incr(f"{self.name}.hit")
+                return x, y
+
+            with self._entries_lock:
+                self._entries.pop(entry_key, None)
+            self.metrics.incr(f"{self.name}.invalidated")
+            logger.debug(f"Element cache: '{description}' region changed (distance {distance})")
+
+        self.metrics.incr(f"{self.name}.miss")
+        return None
+
+    def store(self, description: str, frame: Image.Image, screen_xy: Tuple[int, int],
+              frame_xy: Tuple[int, int]):
+        """
+        Records a location (confirmed, unless this is a plan's sightings). frame_xy is the same point in frame
+        pixels, which differ from screen pixels on HiDPI displays.
+        """
+        region = self.region_around(frame, *frame_xy)
+        region_hash, level = self.region_signature(frame, region)
+        entry_key = (self._key(description), region_hash)
+        with self._entries_lock:
+            self._entries[entry_key] = (screen_xy[0], screen_xy[1], region, level)
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.metrics.incr(f"{self.name}.evicted")
+
+    def invalidate(self, description: str):
+        """Drops every stored location of the element, e.g. after a click on it had no effect."""
+        key = self._key(description)
+        with self._entries_lock:
+            for entry_key in [k for k in self._entries if k[0] == key]:
+                del self._entries[entry_key]
+                self.metrics.incr(f"{self.name}.invalidated")
+
+    def clear(self):
+        with self._entries_lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._entries_lock:
+            size = len(self._entries)
+        return {
+            "hits": self.metrics.get(f"{self.name}.hit"),
+            "misses": self.metrics.get(f"{self.name}.miss"),
+            "invalidated": self.metrics.get(f"{self.name}.invalidated"),
+            "evicted": self.metrics.get(f"{self.name}.evicted"),
+            "size": size
+        }
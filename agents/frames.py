@@ -0,0 +1,97 @@
+import time
+import logging
+import pyautogui
+from typing import Callable, Dict, List, Optional
+from PIL import Image
+from ..core.types import Step, AgentResult
+from ..core.metrics import Metrics
+from .element_cache import ElementLocationCache
+from .vision import frame_to_screen_scale
+
+logger = logging.getLogger(__name__)
+
+# Actions that leave the screen in a different state than they found it
+# (both browse actions the planner emits open a visible browser window)
+SCREEN_CHANGING_ACTIONS = {"CLICK", "TYPE", "PRESS", "OPEN_APP", "WAIT", "BROWSE_GOTO", "BROWSE_READ"}
+
+class FrameProvider:
+    """
+    Per-plan screen capture on demand. A frame is only grabbed when a step
+    actually needs pixels, and the same frame is shared by detection and
+    verification until an action makes it stale. Element locations found
+    on the current frame are kept alongside it and dropped with it.
+    Locations no action has confirmed yet are also kept as sightings for
+    the rest of the plan: a later step can reuse one while its surroundings
+    look the same, but they never reach the shared element cache.
+    """
+
+    def __init__(self, grab: Callable[[], Image.Image] = None):
+        self._grab = grab or pyautogui.screenshot
+        self._frame: Optional[Image.Image] = None
+        self.locations: Dict[str, AgentResult] = {}
+        self.sightings = ElementLocationCache(name="frames.sightings")
+        self.metrics = Metrics.get_instance()
+        self.captures = 0
+        self.capture_ms = 0.0
+
+    @staticmethod
+    def needs_pixels(step: Step) -> bool:
+        return bool(step.target_element)
+
+    def get(self) -> Image.Image:
+        """Current frame, capturing only if there is no fresh one."""
+        if self._frame is None:
+            start = time.perf_counter()
+            self._frame = self._grab()
+            elapsed = (time.perf_counter() - start) * 1000
+            self.captures += 1
+            self.capture_ms += elapsed
+            self.metrics.observe("frames.capture_ms", elapsed)
+        return self._frame
+
+    def peek(self) -> Optional[Image.Image]:
+        """Current frame if one was captured, without capturing."""
+        return self._frame
+
+    def put(self, frame: Image.Image):
+        """Adopts a frame captured elsewhere (e.g. by the verifier) as current."""
+        self._frame = frame
+
+    def invalidate(self):
+        self._frame = None
+        self.locations.clear()
+
+    def found(self, results: Dict[str, AgentResult]):
+        """Adopts locations detected on the current frame."""
+        frame = self.get()
+        scale_x, scale_y = frame_to_screen_scale(frame)
+        for description, result in results.items():
+            self.locations[description] = result
+            if result.success:
+                x, y = result.data["x"], result.data["y"]
+                self.sightings.store(description, frame, (x, y), (int(x / scale_x), int(y / scale_y)))
+
+    def recall(self, descriptions: List[str]):
+        """Fills in locations from earlier sightings whose surroundings are unchanged."""
+        for description in descriptions:
+            if description in self.locations:
+                continue
+            point = self.sightings.lookup(description, self.get())
+            if point:
+                self.locations[description] = AgentResult(
+                    success=True, data={"x": point[0], "y": point[1]}, message=f"Seen at {point[0]},{point[1]}"
+                )
+
+    def refute(self, description: str):
+        """Forgets a location an action on which failed."""
+        self.locations.pop(description, None)
+        self.sightings.invalidate(description)
+
+    def after_action(self, step: Step):
+        if step.action_type.upper() in SCREEN_CHANGING_ACTIONS:
+            self.invalidate()
+
+    def report(self):
+        self.metrics.observe("frames.captures_per_plan", self.captures)
+        self.metrics.observe("frames.capture_ms_per_plan", self.capture_ms)
+        logger.info(f"Plan used {self.captures} screen captures ({self.capture_ms:.0f} ms)")
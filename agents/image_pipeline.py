@@ -0,0 +1,90 @@
+import io
+import base64
+import logging
+from typing import Optional, Tuple
+from PIL import Image
+from pydantic import BaseModel
+from ..core.config import Config
+
+logger = logging.getLogger(__name__)
+
+Region = Tuple[int, int, int, int]  # left, top, right, bottom in frame pixels
+
+class ImageTransform(BaseModel):
+    """Maps a point in the encoded image back to screen coordinates."""
+    scale_x: float = 1.0
+    scale_y: float = 1.0
+    offset_x: float = 0.0
+    offset_y: float = 0.0
+    width: int = 0   # Encoded image size, for bounds checks
+    height: int = 0
+
+    def to_screen(self, x: float, y: float) -> Tuple[int, int]:
+        return int(round(self.offset_x + x * self.scale_x)), int(round(self.offset_y + y * self.scale_y))
+
+class ImagePipeline:
+    """
+    Prepares frames for the vision model: optional region-of-interest crop,
+    downscale to a target long edge, then lossy or lossless encoding.
+    Every encode returns the transform needed to map answers back to the screen.
+    """
+    FORMATS = {"JPEG", "WEBP", "PNG"}
+
+    def __init__(self, max_long_edge: int = None, image_format: str = None, quality: int = None):
+        self.max_long_edge = Config.VISION_MAX_EDGE if max_long_edge is None else max_long_edge
+        self.image_format = (image_format or Config.VISION_FORMAT).upper()
+        self.quality = quality or Config.VISION_QUALITY
+        if self.image_format not in self.FORMATS:
+            logger.warning(f"Unsupported vision image format {self.image_format}, using PNG")
+            self.image_format = "PNG"
+
+    def encode(self, frame: Image.Image, roi: Optional[Region] = None,
+               screen_size: Optional[Tuple[int, int]] = None) -> Tuple[str, ImageTransform]:
+        """
+        Returns (base64 payload, transform). screen_size corrects for frames
+        captured at a different resolution than the pointer space (HiDPI).
+        """
+        frame_w, frame_h = frame.size
+        left, top = 0, 0
+        image = frame
+
+        # 1. Crop
+        if roi:
+            left, top = max(0, roi[0]), max(0, roi[1])
+            right, bottom = min(frame_w, roi[2]), min(frame_h, roi[3])
+            if right > left and bottom > top:
+                image = frame.crop((left, top, right, bottom))
+            else:
+                logger.warning(f"Ignoring empty vision ROI {roi}")
+                left, top = 0, 0
+
+        # 2. Downscale
+        crop_w, crop_h = image.size
+        scale = 1.0
+        if self.max_long_edge and max(crop_w, crop_h) > self.max_long_edge:
+            scale = self.max_long_edge / max(crop_w, crop_h)
+            size = (max(1, round(crop_w * scale)), max(1, round(crop_h * scale)))
+            image = image.resize(size, Image.BILINEAR, reducing_gap=2.0)
+
+        # 3. Encode
+        buffered = io.BytesIO()
+        if self.image_format == "PNG":
+            image.save(buffered, format="PNG", compress_level=1)
+        else:
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+            image.save(buffered, format=self.image_format, quality=self.quality)
+        payload = base64.b64encode(buffered.getvalue()).decode("utf-8")
+
+        # Image px -> frame px -> screen px
+        to_screen_x = screen_size[0] / frame_w if screen_size else 1.0
+        to_screen_y = screen_size[1] / frame_h if screen_size else 1.0
+        transform = ImageTransform(
+            scale_x=crop_w / image.size[0] * to_screen_x,
+            scale_y=crop_h / image.size[1] * to_screen_y,
+            offset_x=left * to_screen_x,
+            offset_y=top * to_screen_y,
+            width=image.size[0],
+            height=image.size[1]
+        )
+        return payload, transform
@@ -1,7 +1,9 @@
 import logging
 import json
-from typing import Optional
+import threading
+from typing import Optional, Iterator, Callable, Tuple, Dict
 from ..core.llm import OllamaClient
+from ..core.cancellation import CancellationToken
 from ..core.rag import KnowledgeBase
 from .skeletons import BaseAgent
 
@@ -10,19 +12,19 @@ logger = logging.getLogger(__name__)
 class AttributionAgent(BaseAgent):
     def __init__(self, model: str = "llama3.2"):
         super().__init__("Attribution")
-        self.llm = OllamaClient()
+        self.llm = OllamaClient.get_instance()
         self.kb = KnowledgeBase.get_instance()
         self.model = model
 
-    def answer_question(self, query: str) -> str:
+    def _build_prompt(self, query: str) -> Optional[Tuple[str, str]]:
         """
-        RAG workflow: Retrieve -> Augment -> Generate -> Cite.
+        Retrieve + Augment. Returns (system, prompt) or None if nothing relevant was found.
         """
         # 1. Retrieve
         chunks = self.kb.query(query, n_results=3)
         
         if not chunks:
-            return "I checked the Knowledge Base, but found no relevant documents."
+            return None
 
         # Filter by relevance threshold (e.g., distance < 1.5, varies by metric)
         # For PoC, we just use what we found.
@@ -45,15 +47,63 @@ class AttributionAgent(BaseAgent):
         """
         
         full_prompt = f"Context:\n{context_str}\n\nQuestion: {query}\nAnswer:"
+        return system, full_prompt
+
+    def answer_question(self, query: str, on_token: Callable[[str], None] = None,
+                        cancel: CancellationToken = None) -> str:
+        """
+        RAG workflow: Retrieve -> Augment -> Generate -> Cite.
+        With on_token, the answer is streamed and each fragment is handed over as it arrives.
+        """
+        if on_token:
+            fragments = []
+            outcome: Dict[str, bool] = {}
+            for text in self.stream_answer(query, stop_event=cancel, outcome=outcome):
+                on_token(text)
+                fragments.append(text)
+            if not outcome["complete"]:
+                # Cut off (error or cancel): the fragments are not an answer
+                return "Failed to generate answer."
+            return "".join(fragments) or "Failed to generate answer."
+
+        built = self._build_prompt(query)
+        if not built:
+            return "I checked the Knowledge Base, but found no relevant documents."
+        system, full_prompt = built
         
         logger.info(f"Generating RAG answer for: {query}")
         response = self.llm.generate(
             prompt=full_prompt,
             system=system,
-            model=self.model
+            model=self.model,
+            cancel=cancel
         )
         
         if response:
             return response
         else:
             return "Failed to generate answer."
+
+    def stream_answer(self, query: str, stop_event: threading.Event = None,
+                      outcome: Dict[str, bool] = None) -> Iterator[str]:
+        """
+        Streaming variant of answer_question. Yields answer fragments as the model produces them.
+        outcome["complete"] tells afterwards whether the whole answer arrived.
+        """
+        outcome = {} if outcome is None else outcome
+        outcome["complete"] = False
+        built = self._build_prompt(query)
+        if not built:
+            yield "I checked the Knowledge Base, but found no relevant documents."
+            outcome["complete"] = True
+            return
+        system, full_prompt = built
+
+        logger.info(f"Streaming RAG answer for: {query}")
+        yield from self.llm.generate_stream(
+            prompt=full_prompt,
+            system=system,
+            model=self.model,
+            stop_event=stop_event,
+            outcome=outcome
+        )
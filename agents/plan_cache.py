@@ -0,0 +1,239 @@
+import re
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+from ..core.types import Step
+from ..core.config import Config
+from ..core.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+# Order matters: earlier slots are cut out of the text before later ones run
+SLOT_PATTERNS: List[Tuple[str, "re.Pattern"]] = [
+    ("url", re.compile(
+        r"\bhttps?://\S+|\b(?:www\.)?[a-z0-9-]+(?:\.[a-z0-9-]+)*\.(?:com|org|net|io|dev|ai|gov|edu|co|uk|de|in)(?:/\S*)?\b",
+        re.IGNORECASE
+    )),
+    ("quoted", re.compile(r"\"([^\"]+)\"|'([^']+)'")),
+    ("file", re.compile(
+        r"(?:[a-z]:)?[\w\-./\\]+\.(?:txt|pdf|docx?|xlsx?|pptx?|csv|md|json|ya?ml|py|png|jpe?g|log|html?)\b",
+        re.IGNORECASE
+    )),
+    ("term", re.compile(r"\b(?:search(?:\s+for)?|look\s+up|google|find)\s+(.+?)[\s.!?]*$", re.IGNORECASE)),
+]
+
+# Plans for these depend on conversation history, not just the request text
+CONTEXT_DEPENDENT = re.compile(r"\b(?:it|that|this|those|them|again|same|previous|last one)\b", re.IGNORECASE)
+
+STEP_FIELDS = ("description", "target_element", "value")
+
+# UI element names ("Address Bar") are not user data; a slot may only replace them whole
+WHOLE_FIELD_ONLY = {"target_element"}
+
+
+def _bounded(value: str) -> "re.Pattern":
+    """Matches value as a whole word (or words), never inside a longer one."""
+    return re.compile(r"(?<!\w)" + re.escape(value) + r"(?!\w)", re.IGNORECASE)
+
+
+def normalize_intent(text: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Returns (template key, slot values). "Open Chrome and search for Cats"
+    becomes ("open chrome and search for {term0}", {"term0": "Cats"}).
+    """
+    slots: Dict[str, str] = {}
+    counts: Dict[str, int] = {}
+    work = " ".join(text.strip().split())
+
+    for name, pattern in SLOT_PATTERNS:
+        def cut(match, name=name):
+            # Use the inner group when the pattern has one (quotes, search term)
+            group = next((i for i, g in enumerate(match.groups(), 1) if g), 0)
+            value = match.group(group)
+            if "{" in value:
+                return match.group(0)  # Already holds an earlier slot
+            slot = f"{name}{counts.get(name, 0)}"
+            counts[name] = counts.get(name, 0) + 1
+            slots[slot] = value
+            # Replace exactly the slot's span; the value may also occur elsewhere in the match
+            start, end = match.start(group) - match.start(0), match.end(group) - match.start(0)
+            whole = match.group(0)
+            return whole[:start] + "{" + slot + "}" + whole[end:]
+        work = pattern.sub(cut, work)
+
+    key = re.sub(r"[\s.!?]+$", "", work.lower())
+    return key, slots
+
+
+class PlanCache:
+    """
+    Reuses validated plans for recurring requests. A plan is stored as a
+    template with the request's slot values (URLs, quoted text, filenames,
+    search terms) replaced by placeholders, and re-filled on the next
+    request with the same shape.
+
+    Entries carry a fingerprint of the planner prompt and model; anything
+    stored under another fingerprint is dropped on startup.
+    """
+
+    def __init__(self, fingerprint: str, allowed_actions: Set[str], max_entries: int = None,
+                 db_path: str = None):
+        self.fingerprint = fingerprint
+        self.allowed_actions = allowed_actions
+        self.max_entries = max_entries or Config.PLAN_CACHE_SIZE
+        self.metrics = Metrics.get_instance()
+        self._templates: "OrderedDict[str, List[dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._db = None
+        db_path = Config.PLAN_CACHE_DB if db_path is None else db_path
+        if db_path:
+            self._init_db(db_path)
+
+    def _init_db(self, db_path: str):
+        try:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute('''
+                CREATE TABLE IF NOT EXISTS plan_templates (
+                    key TEXT,
+                    fingerprint TEXT,
+                    steps TEXT,
+                    updated_at REAL,
+                    PRIMARY KEY (key, fingerprint)
+                )
+            ''')
+            stale = self._db.execute(
+                'DELETE FROM plan_templates WHERE fingerprint != ?', (self.fingerprint,)
+            ).rowcount
+            if stale:
+                logger.info(f"Plan cache: dropped {stale} templates from an older planner prompt/model")
+            rows = self._db.execute('''
+                SELECT key, steps FROM plan_templates WHERE fingerprint = ?
+                ORDER BY updated_at DESC LIMIT ?
+            ''', (self.fingerprint, self.max_entries)).fetchall()
+            self._db.commit()
+            for key, steps in reversed(rows):
+                self._templates[key] = json.loads(steps)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open plan cache DB, using memory only: {e}")
+            self._db = None
+
+    def lookup(self, user_intent: str) -> Optional[List[Step]]:
+        if CONTEXT_DEPENDENT.search(user_intent):
+            self.metrics.incr("plan_cache.bypass")
+            return None
+
+        key, slots = normalize_intent(user_intent)
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None:
+                self._templates.move_to_end(key)
+
+        if template is None:
+            self.metrics.incr("plan_cache.miss")
+            return None
+
+        self.metrics.incr("plan_cache.hit")
+        logger.info(f"Plan cache hit for template: {key}")
+        return [self._fill(step, slots) for step in template]
+
+    def store(self, user_intent: str, plan: List[Step]) -> bool:
+        """
+        Saves the plan as a template. Rejected if it uses unknown actions or
+        does not contain every slot value, since re-filling it would then
+        silently reuse the old parameters. Also rejected when a slot value is
+        ambiguous: it occurs in the request outside its slot, or inside a UI
+        element name, so which occurrences to re-fill can't be told apart.
+        """
+        if not plan or CONTEXT_DEPENDENT.search(user_intent):
+            return False
+        if any(step.action_type.upper() not in self.allowed_actions for step in plan):
+            self.metrics.incr("plan_cache.rejected")
+            return False
+
+        key, slots = normalize_intent(user_intent)
+        template = [step.model_dump(include=set(STEP_FIELDS) | {"action_type"}) for step in plan]
+        for slot, value in slots.items():
+            found = False
+            pattern = _bounded(value)
+            if pattern.search(key):
+                self.metrics.incr("plan_cache.rejected")
+                return False
+            for step in template:
+                for field in STEP_FIELDS:
+                    text = step.get(field)
+                    if not text or not pattern.search(text):
+                        continue
+                    if text.strip().lower() == value.strip().lower():
+                        step[field] = "{" + slot + "}"
+                    elif field in WHOLE_FIELD_ONLY:
+                        self.metrics.incr("plan_cache.rejected")
+                        return False
+                    else:
+                        step[field] = pattern.sub(lambda _: "{" + slot + "}", text)
+                    found = True
+            if not found:
+                self.metrics.incr("plan_cache.rejected")
+                return False
+
+        with self._lock:
+            self._templates[key] = template
+            self._templates.move_to_end(key)
+            while len(self._templates) > self.max_entries:
+                self._templates.popitem(last=False)
+        self._persist(key, template)
+        self.metrics.incr("plan_cache.stored")
+        return True
+
+    def _persist(self, key: str, template: List[dict]):
+        if not self._db:
+            return
+        try:
+            with self._lock:
+                self._db.execute('''
+                    INSERT INTO plan_templates (key, fingerprint, steps, updated_at)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(key, fingerprint) DO UPDATE SET
+                        steps=excluded.steps,
+                        updated_at=excluded.updated_at
+                ''', (key, self.fingerprint, json.dumps(template), time.time()))
+                self._db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to persist plan template: {e}")
+
+    @staticmethod
+    def _fill(step: dict, slots: Dict[str, str]) -> Step:
+        filled = dict(step)
+        for field in STEP_FIELDS:
+            text = filled.get(field)
+            if text:
+                for slot, value in slots.items():
+                    text = text.replace("{" + slot + "}", value)
+                filled[field] = text
+        return Step(**filled)
+
+    def invalidate(self):
+        with self._lock:
+            self._templates.clear()
+            if self._db:
+                self._db.execute('DELETE FROM plan_templates WHERE fingerprint = ?', (self.fingerprint,))
+                self._db.commit()
+
+    def report(self) -> Dict[str, float]:
+        hits = self.metrics.get("plan_cache.hit")
+        misses = self.metrics.get("plan_cache.miss")
+        with self._lock:
+            size = len(self._templates)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "bypassed": self.metrics.get("plan_cache.bypass"),
+            "stored": self.metrics.get("plan_cache.stored"),
+            "rejected": self.metrics.get("plan_cache.rejected"),
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "templates": size
+        }
@@ -0,0 +1,81 @@
+import json
+import logging
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+class IncrementalStepParser:
+    """
+    Pulls step objects out of a streamed JSON plan as soon as each one closes.
+    Tracks brace depth (ignoring braces inside strings), so it copes with a
+    bare array, a {"steps": [...]} wrapper or stray markdown fences alike:
+    any completed object that has an "action_type" key is a step.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._starts: List[int] = []  # Offsets of currently open '{'
+        self._in_string = False
+        self._escape = False
+        self.emitted = 0
+        self.malformed = 0
+
+    def feed(self, chunk: str) -> List[dict]:
+        """Consumes a fragment and returns the steps it completed."""
+        self._text += chunk
+        steps = []
+
+        while self._pos < len(self._text):
+            ch = self._text[self._pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._starts.append(self._pos)
+            elif ch == "}" and self._starts:
+                start = self._starts.pop()
+                step = self._decode(self._text[start:self._pos + 1])
+                if step is not None:
+                    steps.append(step)
+
+            self._pos += 1
+
+        if not self._starts:
+            # Nothing open, so nothing before here is needed again
+            self._text = ""
+            self._pos = 0
+
+        self.emitted += len(steps)
+        return steps
+
+    def _decode(self, raw: str):
+        try:
+            obj = json.loads(raw)
+        except json.JSONDecodeError:
+            if len(self._starts) <= 1:
+                # Only complain about step-level objects, not the wrapper
+                self.malformed += 1
+                logger.warning(f"Skipping malformed plan step: {raw[:120]}")
+            return None
+        if isinstance(obj, dict) and "action_type" in obj:
+            return obj
+        return None
+
+    @property
+    def truncated(self) -> bool:
+        """True if the stream ended inside an unfinished object."""
+        return bool(self._starts)
+
+    def close(self) -> bool:
+        """Call when the stream ends. Returns False if the tail was cut off or malformed."""
+        if self.truncated:
+            logger.warning(f"Plan stream ended mid-object; dropped partial step after {self.emitted} steps")
+        return not self.truncated and self.malformed == 0
@@ -1,9 +1,15 @@
 import json
+import hashlib
 import logging
-from typing import List
+import threading
+from typing import Dict, List, Callable, Iterator, Optional
 from ..core.types import Step
+from ..core.config import Config
 from ..core.llm import OllamaClient
+from ..core.cancellation import CancellationToken
 from .skeletons import BaseAgent
+from .plan_cache import PlanCache
+from .plan_stream import IncrementalStepParser
 
 logger = logging.getLogger(__name__)
 
@@ -38,15 +44,24 @@ Example Output:
 ]
 """
 
+# Action types a plan may contain (SYSTEM_PROMPT list plus executor built-ins)
+SUPPORTED_ACTIONS = {
+    "OPEN_APP", "TYPE", "CLICK", "READ", "PRESS", "WAIT", "ANSWER", "BRIEFING", "SPEAK",
+    "RENDER_CANVAS", "BROWSE_GOTO", "BROWSE_READ", "RUN_SHELL", "FILE_READ", "FILE_WRITE",
+}
+
 class PlannerAgent(BaseAgent):
     def __init__(self, model_name: str = "llama3.2"):
         super().__init__("Planner")
-        self.llm = OllamaClient()
+        self.llm = OllamaClient.get_instance()
         self.model = model_name
+        self.cache = None
+        if Config.PLAN_CACHE_ENABLED:
+            # Templates from a different prompt or model are invalidated
+            fingerprint = hashlib.sha256(f"{self.model}\n{SYSTEM_PROMPT}".encode("utf-8")).hexdigest()[:16]
+            self.cache = PlanCache(fingerprint, SUPPORTED_ACTIONS)
 
-    def create_plan(self, user_intent: str, context: List[dict] = None) -> List[Step]:
-        logger.info(f"Planning task for: {user_intent}")
-        
+    def _build_system_prompt(self, context: List[dict] = None) -> str:
         # Build Context String
         cols = []
         if context:
@@ -56,39 +71,110 @@ class PlannerAgent(BaseAgent):
         
         context_str = "\n".join(cols)
         
-        full_system_prompt = f"{SYSTEM_PROMPT}\n\n{context_str}"
-        
-        response = self.llm.generate(
+        return f"{SYSTEM_PROMPT}\n\n{context_str}"
+
+    def create_plan(self, user_intent: str, context: List[dict] = None,
+                    on_token: Callable[[str], None] = None, cancel: CancellationToken = None) -> List[Step]:
+        """
+        Asks the LLM for a plan. With on_token, the response is streamed and
+        each fragment is handed over as it arrives. A cancelled plan is empty.
+        """
+        logger.info(f"Planning task for: {user_intent}")
+        if self.cache:
+            cached = self.cache.lookup(user_intent)
+            if cached:
+                return cached
+
+        full_system_prompt = self._build_system_prompt(context)
+
+        if on_token:
+            fragments = []
+            outcome: Dict[str, bool] = {}
+            for text in self.llm.generate_stream(prompt=user_intent, system=full_system_prompt, model=self.model,
+                                                 stop_event=cancel, outcome=outcome):
+                on_token(text)
+                fragments.append(text)
+            # A cut-off stream is a failed call, not a shorter plan
+            response = "".join(fragments) if outcome["complete"] else None
+        else:
+            response = self.llm.generate(
+                prompt=user_intent,
+                system=full_system_prompt,
+                model=self.model,
+                cancel=cancel
+            )
+
+        if cancel is not None and cancel.is_set():
+            return []
+        return self._parse_plan(response)
+
+    def stream_plan(self, user_intent: str, context: List[dict] = None,
+                    stop_event: threading.Event = None, outcome: Dict[str, bool] = None) -> Iterator[Step]:
+        """
+        Yields each Step as soon as its JSON object closes in the streamed
+        response, so execution can start while later steps are still being
+        generated. A truncated or malformed tail is dropped, never guessed at.
+        outcome["complete"] tells afterwards whether the whole plan arrived.
+        """
+        outcome = {} if outcome is None else outcome
+        outcome["complete"] = False
+        logger.info(f"Streaming plan for: {user_intent}")
+        if self.cache:
+            cached = self.cache.lookup(user_intent)
+            if cached:
+                yield from cached
+                outcome["complete"] = True
+                return
+
+        parser = IncrementalStepParser()
+        streamed: Dict[str, bool] = {}
+        for text in self.llm.generate_stream(
             prompt=user_intent,
-            system=full_system_prompt,
-            model=self.model
-        )
+            system=self._build_system_prompt(context),
+            model=self.model,
+            stop_event=stop_event,
+            outcome=streamed
+        ):
+            for item in parser.feed(text):
+                step = self._step_from_item(item)
+                if step:
+                    yield step
+        outcome["complete"] = parser.close() and streamed["complete"]
+
+    def remember_plan(self, user_intent: str, plan: List[Step]) -> bool:
+        """
+        Offers a plan to the template cache. Callers do this only once the
+        plan has run to completion, so a wrong or cut-short plan is never
+        replayed without asking the LLM again.
+        """
+        return bool(self.cache) and self.cache.store(user_intent, plan)
 
+    def _parse_plan(self, response: str) -> List[Step]:
         if not response:
             logger.error("Failed to get plan from Ollama.")
             return []
 
-        try:
-            # Clean response if it contains markdown code blocks (even if we asked for JSON)
-            clean_response = response.strip()
-            if clean_response.startswith("```json"):
-                clean_response = clean_response[7:]
-            if clean_response.endswith("```"):
-                clean_response = clean_response[:-3]
-
-            data = json.loads(clean_response)
-            steps = []
-            for item in data:
-                steps.append(Step(
-                    description=item.get("description", "Unknown Step"),
-                    action_type=item.get("action_type", "UNKNOWN"),
-                    target_element=item.get("target_element"),
-                    value=item.get("value")
-                ))
-            return steps
-        except json.JSONDecodeError:
+        parser = IncrementalStepParser()
+        items = parser.feed(response)
+        if not parser.close():
+            # All-or-nothing here: a partial plan must not run as if it were whole
             logger.error(f"Failed to parse JSON plan: {response}")
             return []
-        except Exception as e:
-            logger.error(f"Error creating plan: {e}")
+
+        steps = [step for step in (self._step_from_item(item) for item in items) if step]
+        if len(steps) != len(items):
             return []
+        return steps
+
+    def _step_from_item(self, item: dict) -> Optional[Step]:
+        try:
+            value = item.get("value")
+            return Step(
+                description=item.get("description", "Unknown Step"),
+                action_type=item.get("action_type", "UNKNOWN"),
+                target_element=item.get("target_element"),
+                value=None if value is None else str(value)
+            )
+        except Exception as e:
+            logger.error(f"Error creating plan step from {item}: {e}")
+            return None
@@ -26,11 +26,3 @@ class ActionAgent(BaseAgent):
         # Mock Execution
         print(f"[ACTION] Executing: {step.action_type} on {step.target_element or step.value}")
         return AgentResult(success=True, message="Action executed")
-
-class VerifierAgent(BaseAgent):
-    def __init__(self):
-        super().__init__("Verifier")
-
-    def verify(self, step: Step, pre_state: Any, post_state: Any) -> AgentResult:
-        # Mock Verification
-        return AgentResult(success=True, message="State verification passed")
@@ -0,0 +1,230 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from PIL import Image
+from ..core.config import Config
+from ..core.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+Region = Tuple[int, int, int, int]
+
+def to_gray(image: Image.Image, scale: int = 1) -> np.ndarray:
+    # Box-filter reduce before the colour conversion: fewer pixels to convert
+    if scale > 1:
+        image = image.reduce(scale)
+    return np.asarray(image.convert("L"), dtype=np.float32)
+
+def ncc_map(image: np.ndarray, template: np.ndarray) -> np.ndarray:
+    """
+    Normalised cross-correlation of template at every position where it fits
+    entirely inside image (top-left anchored). The correlation term is done
+    with real FFTs, the per-window energy with integral images.
+    """
+    ih, iw = image.shape
+    th, tw = template.shape
+    if th > ih or tw > iw:
+        return np.zeros((0, 0), dtype=np.float32)
+
+    t = template - template.mean()
+    t_norm = np.sqrt((t * t).sum())
+    if t_norm == 0:
+        return np.zeros((ih - th + 1, iw - tw + 1), dtype=np.float32)
+
+    shape = (ih + th - 1, iw + tw - 1)
+    spectrum = np.fft.rfft2(image, shape) * np.fft.rfft2(t[::-1, ::-1], shape)
+    corr = np.fft.irfft2(spectrum, shape)[th - 1:ih, tw - 1:iw]
+
+    def window_sums(values):
+        integral = np.pad(values.cumsum(0).cumsum(1), ((1, 0), (1, 0)))
+        return integral[th:, tw:] - integral[:-th, tw:] - integral[th:, :-tw] + integral[:-th, :-tw]
+
+    image64 = image.astype(np.float64)
+    sums = window_sums(image64)
+    variance = window_sums(image64 * image64) - sums * sums / (th * tw)
+    denom = np.sqrt(np.maximum(variance, 0)) * t_norm
+    return np.where(denom > 1e-3, corr / np.maximum(denom, 1e-3), 0).astype(np.float32)
+
+class TemplateMatcher:
+    """
+    Finds elements by matching crops saved where an action on a detected
+    element visibly worked; an element whose match led nowhere is forgotten.
+    Matching runs coarse-to-fine: a normalised cross-correlation over a
+    downscaled grayscale frame, then a full-resolution pass in a small window
+    around the best coarse hit. Matches that are weak, or not clearly better
+    than the runner-up (repeated icons), are treated as misses.
+    """
+    MIN_CONTRAST = 8.0  # Std dev of a template below this is too flat to match reliably
+    MAX_PER_ELEMENT = 3
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, template_dir: str = None, template_size: int = None, scale: int = None,
+                 threshold: float = None, margin: float = None):
+        self.template_dir = Config.TEMPLATE_DIR if template_dir is None else template_dir
+        self.template_size = template_size or Config.TEMPLATE_SIZE
+        self.scale = scale or Config.TEMPLATE_SCALE
+        self.threshold = threshold or Config.TEMPLATE_THRESHOLD
+        self.margin = Config.TEMPLATE_MARGIN if margin is None else margin
+        self.metrics = Metrics.get_instance()
+        self._templates: Dict[str, List[np.ndarray]] = {}
+        self._templates_lock = threading.Lock()
+        self._gray: Tuple[Optional[Image.Image], Optional[np.ndarray]] = (None, None)
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = TemplateMatcher()
+        return cls._instance
+
+    @staticmethod
+    def _key(description: str) -> str:
+        return " ".join(description.lower().split())
+
+    def _prefix(self, key: str) -> str:
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+    def _load(self, key: str) -> List[np.ndarray]:
+        with self._templates_lock:
+            if key in self._templates:
+                return self._templates[key]
+
+        templates = []
+        # The directory only exists once something has been learned
+        if self.template_dir and os.path.isdir(self.template_dir):
+            prefix = self._prefix(key)
+            for name in sorted(os.listdir(self.template_dir)):
+                if name.startswith(prefix) and name.endswith(".png"):
+                    try:
+                        templates.append(to_gray(Image.open(os.path.join(self.template_dir, name))))
+                    except OSError as e:
+                        logger.warning(f"Unreadable template {name}: {e}")
+
+        with self._templates_lock:
+            return self._templates.setdefault(key, templates[-self.MAX_PER_ELEMENT:])
+
+    def _coarse(self, frame: Image.Image) -> np.ndarray:
+        # Detection and batch detection hit the same frame repeatedly
+        cached_frame, gray = self._gray
+        if cached_frame is not frame:
+            gray = to_gray(frame, self.scale)
+            self._gray = (frame, gray)
+        return gray
+
+    def learn(self, description: str, frame: Image.Image, frame_xy: Tuple[int, int]):
+        """Saves the area around a confirmed element location as a template."""
+        half = self.template_size // 2
+        fx, fy = frame_xy
+        width, height = frame.size
+        box = (max(0, fx - half), max(0, fy - half), min(width, fx + half), min(height, fy + half))
+        crop = frame.crop(box).convert("L")
+        # The stored point must stay the crop centre, so drop clipped crops
+        if crop.size != (self.template_size, self.template_size):
+            return
+        template = np.asarray(crop, dtype=np.float32)
+        if template.std() < self.MIN_CONTRAST:
+            return
+
+        key = self._key(description)
+        templates = self._load(key)
+        with self._templates_lock:
+            templates.append(template)
+            del templates[:-self.MAX_PER_ELEMENT]
+
+        if self.template_dir:
+            os.makedirs(self.template_dir, exist_ok=True)
+            crop.save(os.path.join(self.template_dir, f"{self._prefix(key)}-{time.time_ns()}.png"))
+        self.metrics.incr("template.learned")
+
+    def match(self, description: str, frame: Image.Image,
+              roi: Optional[Region] = None) -> Optional[Tuple[int, int, float]]:
+        """Returns (frame x, frame y, score) of the element's centre, or None."""
+        templates = self._load(self._key(description))
+        if not templates:
+            return None
+
+        start = time.perf_counter()
+        best = None
+        for template in templates:
+            found = self._match_one(template, frame, roi)
+            if found and (best is None or found[2] > best[2]):
+                best = found
+        self.metrics.observe("template.ms", (time.perf_counter() - start) * 1000)
+
+        self.metrics.incr("template.hit" if best else "template.miss")
+        return best
+
+    def _match_one(self, template: np.ndarray, frame: Image.Image,
+                   roi: Optional[Region]) -> Optional[Tuple[int, int, float]]:
+        s = self.scale
+        th, tw = template.shape
+        gray = self._coarse(frame)
+        left, top = 0, 0
+        if roi:
+            left, top = max(0, roi[0] // s), max(0, roi[1] // s)
+            gray = gray[top:max(top, roi[3] // s), left:max(left, roi[2] // s)]
+
+        small = template
+        if s > 1:
+            small = np.asarray(Image.fromarray(template).reduce(s), dtype=np.float32)
+        scores = ncc_map(gray, small)
+        if scores.size == 0:
+            return None
+
+        # 1. Coarse: best peak, and the runner-up outside its neighbourhood
+        y, x = np.unravel_index(int(scores.argmax()), scores.shape)
+        peak = float(scores[y, x])
+        if peak < self.threshold:
+            return None
+        sh, sw = small.shape
+        masked = scores.copy()
+        masked[max(0, y - sh // 2):y + sh // 2 + 1, max(0, x - sw // 2):x + sw // 2 + 1] = -1
+        if masked.max() > peak - self.margin:
+            self.metrics.incr("template.ambiguous")
+            return None
+
+        # 2. Fine: full resolution within one coarse pixel either way
+        fx, fy = (x + left) * s, (y + top) * s
+        box = (max(0, fx - s), max(0, fy - s), min(frame.size[0], fx + tw + s), min(frame.size[1], fy + th + s))
+        fine = ncc_map(to_gray(frame.crop(box)), template)
+        if fine.size == 0:
+            return int(fx + tw // 2), int(fy + th // 2), peak
+        dy, dx = np.unravel_index(int(fine.argmax()), fine.shape)
+        score = float(fine[dy, dx])
+        if score < self.threshold:
+            return None
+        return int(box[0] + dx + tw // 2), int(box[1] + dy + th // 2), score
+
+    def forget(self, description: str):
+        """Deletes the element's templates, in memory and on disk."""
+        key = self._key(description)
+        with self._templates_lock:
+            self._templates[key] = []
+        if self.template_dir and os.path.isdir(self.template_dir):
+            prefix = self._prefix(key)
+            for name in os.listdir(self.template_dir):
+                if name.startswith(prefix) and name.endswith(".png"):
+                    try:
+                        os.remove(os.path.join(self.template_dir, name))
+                    except OSError as e:
+                        logger.warning(f"Could not delete template {name}: {e}")
+        self.metrics.incr("template.forgotten")
+
+    def clear(self):
+        with self._templates_lock:
+            self._templates.clear()
+
+    def stats(self):
+        return {
+            "hits": self.metrics.get("template.hit"),
+            "misses": self.metrics.get("template.miss"),
+            "ambiguous": self.metrics.get("template.ambiguous"),
+            "learned": self.metrics.get("template.learned"),
+            "forgotten": self.metrics.get("template.forgotten")
+        }
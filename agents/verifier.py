@@ -0,0 +1,166 @@
+import time
+import logging
+import numpy as np
+from typing import Any, Callable, Optional, Tuple
+from PIL import Image
+from pydantic import BaseModel
+from ..core.types import Step, AgentResult
+from ..core.config import Config
+from ..core.metrics import Metrics
+from .skeletons import BaseAgent
+from .template_match import to_gray
+
+logger = logging.getLogger(__name__)
+
+Region = Tuple[int, int, int, int]
+
+# Actions that should leave a visible trace; others are diffed but never fail
+EXPECTS_CHANGE = {"CLICK", "TYPE", "OPEN_APP"}
+
+class FrameDiff(BaseModel):
+    """Outcome of comparing two frames block by block."""
+    changed: bool
+    ratio: float = 0.0                # Fraction of blocks that changed
+    bbox: Optional[Region] = None     # Changed area in frame px
+    ms: float = 0.0
+
+class SettleResult(BaseModel):
+    """Last frame seen while waiting, and how the wait ended."""
+    model_config = {"arbitrary_types_allowed": True}
+
+    frame: Image.Image
+    changed: bool   # Differs from the baseline
+    settled: bool   # Stopped changing before the timeout
+    ms: float = 0.0
+
+def block_diff(before: np.ndarray, after: np.ndarray, block: int, threshold: float) -> np.ndarray:
+    """
+    Mean absolute difference per block x block tile of two equally sized
+    grayscale arrays, thresholded. Returns a boolean grid of changed tiles.
+    """
+    h = before.shape[0] // block * block
+    w = before.shape[1] // block * block
+    delta = np.abs(after[:h, :w] - before[:h, :w])
+    tiles = delta.reshape(h // block, block, w // block, block).mean(axis=(1, 3))
+    return tiles > threshold
+
+def _screenshot() -> Image.Image:
+    # Imported here: diffing frames someone else captured needs no display
+    import pyautogui
+    return pyautogui.screenshot()
+
+class VerifierAgent(BaseAgent):
+    """
+    Checks that an action had a visible effect by diffing before/after frames
+    on downscaled grayscale copies, and waits for the UI to settle by polling
+    until consecutive frames stop changing. Frames come from grab, by default
+    a full screenshot.
+    """
+
+    def __init__(self, grab: Callable[[], Image.Image] = None, scale: int = None, block: int = None,
+                 threshold: float = None):
+        super().__init__("Verifier")
+        self._grab = grab or _screenshot
+        self.scale = scale or Config.DIFF_SCALE
+        self.block = block or Config.DIFF_BLOCK
+        self.threshold = Config.DIFF_THRESHOLD if threshold is None else threshold
+        self.metrics = Metrics.get_instance()
+
+    def _gray(self, frame: Any) -> np.ndarray:
+        return frame if isinstance(frame, np.ndarray) else to_gray(frame, self.scale)
+
+    def diff(self, before: Any, after: Any) -> FrameDiff:
+        """Compares two frames (images or arrays already from _gray)."""
+        start = time.perf_counter()
+        a, b = self._gray(before), self._gray(after)
+        if a.shape != b.shape:
+            # Resolution change: everything moved
+            return FrameDiff(changed=True, ratio=1.0, ms=(time.perf_counter() - start) * 1000)
+
+        tiles = block_diff(a, b, self.block, self.threshold)
+        rows, cols = np.nonzero(tiles)
+        bbox = None
+        if rows.size:
+            unit = self.block * self.scale
+            bbox = (int(cols.min()) * unit, int(rows.min()) * unit,
+                    int(cols.max() + 1) * unit, int(rows.max() + 1) * unit)
+
+        elapsed = (time.perf_counter() - start) * 1000
+        self.metrics.observe("verifier.diff_ms", elapsed)
+        return FrameDiff(changed=bool(rows.size), ratio=float(tiles.mean()) if tiles.size else 0.0,
+                         bbox=bbox, ms=elapsed)
+
+    def wait_for_settle(self, baseline: Optional[Image.Image] = None, timeout: float = None,
+                        interval: float = None, stable_frames: int = 2, cancel=None) -> SettleResult:
+        """
+        Polls the screen until it stops changing. With a baseline, first waits
+        (within the same timeout) for the screen to differ from it, so an
+        action whose effect lands late is not mistaken for a no-op. Setting
+        cancel (a CancellationToken) ends the wait early, unsettled.
+        """
+        timeout = Config.SETTLE_TIMEOUT if timeout is None else timeout
+        interval = Config.SETTLE_INTERVAL if interval is None else interval
+        start = time.perf_counter()
+        deadline = start + timeout
+
+        base = self._gray(baseline) if baseline is not None else None
+        frame = self._grab()
+        previous = self._gray(frame)
+        changed = base is not None and self.diff(base, previous).changed
+        stable = 0
+
+        while time.perf_counter() < deadline:
+            if cancel is None:
+                time.sleep(interval)
+            elif cancel.wait(interval):
+                break
+            frame = self._grab()
+            current = self._gray(frame)
+            if base is not None and not changed:
+                changed = self.diff(base, current).changed
+                previous = current
+                continue
+
+            if self.diff(previous, current).changed:
+                stable = 0
+            else:
+                stable += 1
+                if stable >= stable_frames:
+                    break
+            previous = current
+
+        elapsed = (time.perf_counter() - start) * 1000
+        settled = stable >= stable_frames
+        self.metrics.observe("verifier.settle_ms", elapsed)
+        if not settled:
+            self.metrics.incr("verifier.settle_timeout")
+        return SettleResult(frame=frame, changed=changed or base is None, settled=settled, ms=elapsed)
+
+    def verify(self, step: Step, pre_state: Any, post_state: Any) -> AgentResult:
+        """
+        pre_state/post_state are frames from before and after the action.
+        Without a baseline there is nothing to compare and the step passes.
+        """
+        if pre_state is None:
+            return AgentResult(success=True, message="No baseline frame, not verified")
+        if post_state is None:
+            post_state = self.wait_for_settle(pre_state).frame
+
+        result = self.diff(pre_state, post_state)
+        data = result.model_dump()
+
+        if result.changed:
+            self.metrics.incr("verifier.changed")
+            return AgentResult(success=True, data=data, message=f"Screen changed in {result.bbox}")
+
+        if step.action_type.upper() in EXPECTS_CHANGE:
+            self.metrics.incr("verifier.failed")
+            return AgentResult(success=False, data=data,
+                               message=f"No visible effect after {step.action_type}")
+
+        self.metrics.incr("verifier.unchanged")
+        return AgentResult(success=True, data=data, message="Screen unchanged")
+
+def screen_settled(timeout: float) -> bool:
+    """Settle check for core.waits.set_screen_settle: polls full screenshots."""
+    return VerifierAgent().wait_for_settle(timeout=timeout).settled
@@ -1,12 +1,19 @@
-import io
-import base64
+import json
 import logging
 import pyautogui
+from abc import ABC, abstractmethod
+from PIL import Image
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Any, Tuple, Dict
 from ..core.types import AgentResult
 from ..core.llm import OllamaClient
+from ..core.cancellation import CancellationToken
 from .skeletons import BaseAgent
+from .image_pipeline import ImagePipeline, ImageTransform, Region
+from .element_cache import ElementLocationCache
+from .template_match import TemplateMatcher
+from ..core.config import Config
+from ..core.metrics import Metrics
 
 logger = logging.getLogger(__name__)
 
@@ -14,11 +21,91 @@ class ElementCoordinates(BaseModel):
     x: int
     y: int
 
+def frame_to_screen_scale(frame: Image.Image) -> Tuple[float, float]:
+    screen_w, screen_h = pyautogui.size()
+    return screen_w / frame.size[0], screen_h / frame.size[1]
+
+class Detector(ABC):
+    """
+    One CPU-side stage of the detection chain, tried before the vision model.
+    detect returns screen coordinates or None; learn is told about a location
+    once an action on it visibly worked, forget once one on it did not.
+    """
+    name = "detector"
+
+    @abstractmethod
+    def detect(self, frame: Image.Image, description: str, roi: Optional[Region]) -> Optional[Tuple[int, int]]:
+        """Screen coordinates of the described element, or None."""
+        pass
+
+    def learn(self, frame: Image.Image, description: str, screen_xy: Tuple[int, int], frame_xy: Tuple[int, int]):
+        pass
+
+    def forget(self, description: str):
+        pass
+
+class ElementCacheDetector(Detector):
+    name = "cache"
+
+    def __init__(self):
+        self.cache = ElementLocationCache.get_instance()
+
+    def detect(self, frame, description, roi):
+        # An explicit ROI means the caller wants a fresh look
+        if roi:
+            return None
+        return self.cache.lookup(description, frame)
+
+    def learn(self, frame, description, screen_xy, frame_xy):
+        self.cache.store(description, frame, screen_xy, frame_xy)
+
+    def forget(self, description):
+        self.cache.invalidate(description)
+
+class TemplateDetector(Detector):
+    name = "template"
+
+    def __init__(self):
+        self.matcher = TemplateMatcher.get_instance()
+
+    def detect(self, frame, description, roi):
+        found = self.matcher.match(description, frame, roi)
+        if not found:
+            return None
+        scale_x, scale_y = frame_to_screen_scale(frame)
+        return int(round(found[0] * scale_x)), int(round(found[1] * scale_y))
+
+    def learn(self, frame, description, screen_xy, frame_xy):
+        self.matcher.learn(description, frame, frame_xy)
+
+    def forget(self, description):
+        self.matcher.forget(description)
+
+DETECTORS = {
+    ElementCacheDetector.name: ElementCacheDetector,
+    TemplateDetector.name: TemplateDetector
+}
+
 class VisionAgent(BaseAgent):
     def __init__(self, model: str = "llama3.2-vision"):
         super().__init__("Vision")
-        self.llm = OllamaClient()
+        self.llm = OllamaClient.get_instance()
         self.model = model
+        self.pipeline = ImagePipeline()
+        self.metrics = Metrics.get_instance()
+        self.detectors = self._build_chain(Config.VISION_DETECTORS)
+
+    @staticmethod
+    def _build_chain(names: str) -> List[Detector]:
+        chain = []
+        for name in (n.strip() for n in names.split(",")):
+            if not name or (name == ElementCacheDetector.name and not Config.ELEMENT_CACHE_ENABLED):
+                continue
+            if name not in DETECTORS:
+                logger.warning(f"Unknown vision detector '{name}', skipping")
+                continue
+            chain.append(DETECTORS[name]())
+        return chain
 
     def capture_screen(self) -> str:
         """
@@ -30,55 +117,185 @@ class VisionAgent(BaseAgent):
         # In a real app we might save it for debugging.
         return "latest_screenshot.png"
 
-    def detect_element(self, screenshot_path_placeholder: str, description: str) -> AgentResult:
+    def capture_frame(self) -> Image.Image:
+        logger.info("Capturing screen...")
+        return pyautogui.screenshot()
+
+    def _frame(self, screenshot: Any) -> Image.Image:
+        # Anything other than an image (e.g. the old path placeholder) means "capture one now"
+        if isinstance(screenshot, Image.Image):
+            return screenshot
+        return self.capture_frame()
+
+    def _encode(self, frame: Image.Image, roi: Optional[Region] = None) -> Tuple[str, ImageTransform]:
+        return self.pipeline.encode(frame, roi=roi, screen_size=tuple(pyautogui.size()))
+
+    def _fast_detect(self, frame: Image.Image, description: str, roi: Optional[Region]) -> Optional[AgentResult]:
+        """Runs the CPU detectors in order; None means the vision model is needed."""
+        for detector in self.detectors:
+            point = detector.detect(frame, description, roi)
+            if point:
+                self.metrics.incr(f"vision.{detector.name}.hit")
+                x, y = point
+                return AgentResult(success=True, data={"x": x, "y": y}, message=f"Found at {x},{y} ({detector.name})")
+        self.metrics.incr("vision.fallthrough")
+        return None
+
+    def confirm(self, frame: Image.Image, description: str, screen_xy: Tuple[int, int]):
         """
-        Takes a screenshot, sends to Llama Vision, asks for coordinates.
+        Teaches the CPU detectors a location after an action on it visibly
+        changed the screen. frame is the one the action was aimed on.
+        Detections are never learned before that: a wrong answer from the
+        model would otherwise be replayed from then on.
+        """
+        scale_x, scale_y = frame_to_screen_scale(frame)
+        frame_xy = (int(screen_xy[0] / scale_x), int(screen_xy[1] / scale_y))
+        for detector in self.detectors:
+            detector.learn(frame, description, screen_xy, frame_xy)
+        self.metrics.incr("vision.confirmed")
+
+    def forget(self, description: str):
+        """Drops what the CPU detectors know about an element an action on which failed."""
+        for detector in self.detectors:
+            detector.forget(description)
+        self.metrics.incr("vision.forgotten")
+
+    def _build_prompt(self, description: str, transform: ImageTransform) -> str:
+        return (
+            f"The image is {transform.width}x{transform.height} pixels. "
+            f"Find the center coordinates of the UI element '{description}'. Return ONLY a JSON array [x, y]. If not found, return empty []."
+        )
+
+    def _build_batch_prompt(self, descriptions: List[str], transform: ImageTransform) -> str:
+        listing = "\n".join(f"{i + 1}. '{d}'" for i, d in enumerate(descriptions))
+        return (
+            f"The image is {transform.width}x{transform.height} pixels. "
+            f"Find the center coordinates of each of these UI elements:\n{listing}\n"
+            f"Return ONLY a JSON object mapping each element number to [x, y], using [] for elements not found. "
+            f'Example: {{"1": [120, 45], "2": []}}'
+        )
+
+    @staticmethod
+    def _clean_json(response: str) -> str:
+        # Cleanup markdown
+        clean = response.strip()
+        if clean.startswith("```json"): clean = clean[7:]
+        if clean.endswith("```"): clean = clean[:-3]
+        return clean
+
+    def _to_screen(self, coords: Any, transform: ImageTransform) -> Tuple[Optional[Tuple[int, int]], str]:
+        if not (isinstance(coords, list) and len(coords) == 2):
+            return None, "Element not found or invalid format"
+
+        # The model answers in the encoded image's pixels
+        x, y = transform.to_screen(float(coords[0]), float(coords[1]))
+
+        # Validate bounds (basic)
+        width, height = pyautogui.size()
+
+        # Check if reasonable
+        if 0 <= x <= width and 0 <= y <= height:
+            return (x, y), f"Found at {x},{y}"
+        return None, f"Coordinates {x},{y} out of bounds"
+
+    def _parse_coordinates(self, response: Optional[str], transform: ImageTransform) -> AgentResult:
+        if not response:
+            return AgentResult(success=False, message="No response from Vision Model")
+
+        point, message = self._to_screen(json.loads(self._clean_json(response)), transform)
+        if point:
+            return AgentResult(success=True, data={"x": point[0], "y": point[1]}, message=message)
+        return AgentResult(success=False, message=message)
+
+    def _parse_batch(self, response: Optional[str], descriptions: List[str],
+                     transform: ImageTransform) -> Dict[str, AgentResult]:
+        if not response:
+            return {d: AgentResult(success=False, message="No response from Vision Model") for d in descriptions}
+
+        answer = json.loads(self._clean_json(response))
+        if isinstance(answer, list) and len(descriptions) == 1:
+            answer = {"1": answer}
+        if not isinstance(answer, dict):
+            answer = {}
+
+        results = {}
+        for i, description in enumerate(descriptions):
+            coords = answer.get(str(i + 1), answer.get(description))
+            point, message = self._to_screen(coords, transform)
+            if point:
+                results[description] = AgentResult(success=True, data={"x": point[0], "y": point[1]}, message=message)
+            else:
+                results[description] = AgentResult(success=False, message=message)
+        return results
+
+    def detect_element(self, screenshot: Any, description: str, roi: Optional[Region] = None) -> AgentResult:
+        """
+        Sends a frame to Llama Vision and asks for coordinates.
+        Pass a frame from a FrameProvider to reuse it; otherwise one is captured.
+        roi limits the lookup to a region of the frame.
+        The CPU detectors (element cache, template matching) are tried first.
         """
         try:
             # 1. Capture
-            logger.info("Capturing screen...")
-            screenshot = pyautogui.screenshot()
-            
+            frame = self._frame(screenshot)
+            cached = self._fast_detect(frame, description, roi)
+            if cached:
+                return cached
+
             # 2. Encode
-            buffered = io.BytesIO()
-            screenshot.save(buffered, format="PNG")
-            img_str = base64.b64encode(buffered.getvalue()).decode("utf-8")
+            img_str, transform = self._encode(frame, roi)
 
             # 3. Prompt
-            prompt = f"Find the center coordinates of the UI element '{description}'. Return ONLY a JSON array [x, y]. If not found, return empty []."
-            
             logger.info(f"Asking {self.model} to find '{description}'...")
             response = self.llm.generate(
-                prompt=prompt, 
-                model=self.model, 
+                prompt=self._build_prompt(description, transform),
+                model=self.model,
                 images=[img_str]
             )
 
             # 4. Parse
-            import json
-            if not response:
-                return AgentResult(success=False, message="No response from Vision Model")
-
-            # Cleanup markdown
-            clean = response.strip()
-            if clean.startswith("```json"): clean = clean[7:]
-            if clean.endswith("```"): clean = clean[:-3]
-            
-            coords = json.loads(clean)
-            
-            if isinstance(coords, list) and len(coords) == 2:
-                # Validate bounds (basic)
-                width, height = pyautogui.size()
-                x, y = int(coords[0]), int(coords[1])
-                
-                # Check if reasonable
-                if 0 <= x <= width and 0 <= y <= height:
-                     return AgentResult(success=True, data={"x": x, "y": y}, message=f"Found at {x},{y}")
-                else:
-                    return AgentResult(success=False, message=f"Coordinates {x},{y} out of bounds")
-            
-            return AgentResult(success=False, message="Element not found or invalid format")
+            return self._parse_coordinates(response, transform)
 
         except Exception as e:
             logger.error(f"Vision Error: {e}")
             return AgentResult(success=False, message=str(e))
+
+    def _split_cached(self, frame: Image.Image, descriptions: List[str]) -> Tuple[Dict[str, AgentResult], List[str]]:
+        found, missing = {}, []
+        for description in dict.fromkeys(descriptions):
+            cached = self._fast_detect(frame, description, None)
+            if cached:
+                found[description] = cached
+            else:
+                missing.append(description)
+        return found, missing
+
+    def detect_elements(self, screenshot: Any, descriptions: List[str],
+                        cancel: CancellationToken = None) -> Dict[str, AgentResult]:
+        """
+        Locates several elements on one frame with a single vision call.
+        Elements a CPU detector can find are not sent to the model.
+        Returns a result per description.
+        """
+        try:
+            frame = self._frame(screenshot)
+            results, missing = self._split_cached(frame, descriptions)
+            if not missing:
+                return results
+
+            img_str, transform = self._encode(frame)
+
+            logger.info(f"Asking {self.model} to find {len(missing)} elements: {missing}")
+            response = self.llm.generate(
+                prompt=self._build_batch_prompt(missing, transform),
+                model=self.model,
+                images=[img_str],
+                cancel=cancel
+            )
+
+            results.update(self._parse_batch(response, missing, transform))
+            return results
+
+        except Exception as e:
+            logger.error(f"Vision Error: {e}")
+            return {d: AgentResult(success=False, message=str(e)) for d in descriptions}
@@ -0,0 +1,77 @@
+"""
+Cancel-to-idle latency: how long after STOP a command stops using the model
+and the desktop. Measured for a vision-sized model call against a stand-in
+Ollama server that streams slowly, and for a step waiting on the desktop
+lease, against how long the same work ran before it could be cancelled.
+
+    python -m ghostdesk.benchmarks.bench_cancel [trials] [cancel_after_ms]
+"""
+import sys
+import time
+import threading
+import statistics
+from ghostdesk.core.llm import OllamaClient
+from ghostdesk.core.cancellation import CancellationToken, Cancelled
+from ghostdesk.core.desktop_lease import DesktopLease
+from ghostdesk.benchmarks.fake_ollama import FakeOllamaServer
+
+
+def _model_call(client: OllamaClient, cancel_after: float, cancellable: bool) -> float:
+    token = CancellationToken()
+    timer = threading.Timer(cancel_after, token.cancel, args=("stop",))
+    timer.start()
+    client.generate("find the OK button", model="llama3.2-vision", use_cache=False,
+                    cancel=token if cancellable else None)
+    done = time.time()
+    timer.join()
+    return (done - token.cancelled_at) * 1000
+
+
+def _lease_wait(lease: DesktopLease, cancel_after: float, hold_for: float) -> float:
+    token = CancellationToken()
+    held = threading.Event()
+
+    def holder():
+        with lease.hold("other"):
+            held.set()
+            time.sleep(hold_for)
+
+    other = threading.Thread(target=holder)
+    other.start()
+    held.wait()
+    threading.Timer(cancel_after, token.cancel, args=("stop",)).start()
+    try:
+        with lease.hold("stopped", cancel=token):
+            pass
+    except Cancelled:
+        pass
+    done = time.time()
+    other.join()
+    return (done - token.cancelled_at) * 1000
+
+
+def _report(label: str, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1] if len(samples) >= 20 else samples[-1]
+    print(f"{label:<34} p50 {statistics.median(samples):8.1f} ms   p95 {p95:8.1f} ms")
+
+
+def main():
+    trials = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    cancel_after = (float(sys.argv[2]) if len(sys.argv) > 2 else 100) / 1000
+
+    # ~2 s of generation either way: all at once, or 100 tokens at 20 ms each when streamed
+    text = '{"x": 100, "y": 200}' * 20
+    with FakeOllamaServer(response_text=text, latency=2.0) as server:
+        client = OllamaClient(base_url=server.url, cache=None)
+        _report("model call, no token", [_model_call(client, cancel_after, False) for _ in range(max(3, trials // 5))])
+    with FakeOllamaServer(response_text=text, token_delay=0.02) as server:
+        client = OllamaClient(base_url=server.url, cache=None)
+        _report("model call, cancellable", [_model_call(client, cancel_after, True) for _ in range(trials)])
+
+    lease = DesktopLease(lock_path="")
+    _report("desktop lease wait, cancellable", [_lease_wait(lease, cancel_after, 1.0) for _ in range(trials)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Encode time and payload size of the vision image pipeline at several
+settings, on a synthetic desktop-like frame.
+
+    python -m ghostdesk.benchmarks.bench_image_encode [width] [height]
+"""
+import io
+import sys
+import time
+import base64
+import random
+from PIL import Image, ImageDraw
+from ghostdesk.agents.image_pipeline import ImagePipeline
+
+SETTINGS = [
+    ("PNG level 1, full resolution", dict(max_long_edge=0, image_format="PNG")),
+    ("PNG, 1920", dict(max_long_edge=1920, image_format="PNG")),
+    ("JPEG q90, 1920", dict(max_long_edge=1920, image_format="JPEG", quality=90)),
+    ("JPEG q80, 1280", dict(max_long_edge=1280, image_format="JPEG", quality=80)),
+    ("JPEG q70, 1024", dict(max_long_edge=1024, image_format="JPEG", quality=70)),
+    ("WEBP q75, 1280", dict(max_long_edge=1280, image_format="WEBP", quality=75)),
+]
+
+
+def synthetic_desktop(width: int, height: int) -> Image.Image:
+    """Flat panels, window chrome and text lines, roughly like a real desktop."""
+    rng = random.Random(42)
+    image = Image.new("RGB", (width, height), (32, 36, 44))
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x0, y0 = rng.randrange(0, width - 400), rng.randrange(0, height - 300)
+        x1, y1 = x0 + rng.randrange(300, width // 2), y0 + rng.randrange(200, height // 2)
+        draw.rectangle((x0, y0, x1, y1), fill=(rng.randrange(200, 256),) * 3, outline=(90, 90, 90))
+        draw.rectangle((x0, y0, x1, y0 + 28), fill=(rng.randrange(40, 90), 90, 160))
+        for line in range(y0 + 40, y1 - 10, 18):
+            draw.text((x0 + 10, line), "Lorem ipsum dolor sit amet " * rng.randrange(1, 4), fill=(20, 20, 20))
+    return image
+
+
+def main():
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 3840
+    height = int(sys.argv[2]) if len(sys.argv) > 2 else 2160
+    frame = synthetic_desktop(width, height)
+    runs = 5
+
+    print(f"frame {width}x{height}, mean of {runs} runs")
+
+    # What VisionAgent did before the pipeline: default PNG, full resolution
+    start = time.perf_counter()
+    for _ in range(runs):
+        buffered = io.BytesIO()
+        frame.save(buffered, format="PNG")
+        payload = base64.b64encode(buffered.getvalue()).decode("utf-8")
+    elapsed = (time.perf_counter() - start) * 1000 / runs
+    print(f"{'old: PNG, full resolution':<28} {width:>5}x{height:<5} {elapsed:8.1f} ms  {len(payload) / 1024:9.1f} KiB")
+
+    for label, kwargs in SETTINGS:
+        pipeline = ImagePipeline(**kwargs)
+        start = time.perf_counter()
+        for _ in range(runs):
+            payload, transform = pipeline.encode(frame)
+        elapsed = (time.perf_counter() - start) * 1000 / runs
+        print(f"{label:<28} {transform.width:>5}x{transform.height:<5} {elapsed:8.1f} ms  {len(payload) / 1024:9.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
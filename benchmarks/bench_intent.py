@@ -0,0 +1,69 @@
+"""
+Accuracy versus cost of the tiered IntentParser on a labelled corpus.
+Reports, per tier, how many messages it decided, how many of those it got
+right and its mean latency. Messages no fast tier is confident about are
+counted as deferred (they would cost an LLM round trip).
+
+    python -m ghostdesk.benchmarks.bench_intent [--embeddings] [--llm]
+
+--llm sends deferred messages to the local Ollama for an end-to-end score.
+"""
+import os
+import sys
+import json
+import time
+from ghostdesk.core.intent import IntentParser
+
+CORPUS = os.path.join(os.path.dirname(__file__), "intent_corpus.jsonl")
+
+
+def main():
+    use_embeddings = "--embeddings" in sys.argv
+    use_llm = "--llm" in sys.argv
+
+    with open(CORPUS, encoding="utf-8") as f:
+        corpus = [json.loads(line) for line in f if line.strip()]
+
+    parser = IntentParser(use_embeddings=use_embeddings)
+    if use_embeddings:
+        parser.embeddings.classify("warm up")  # Exclude model load from the timings
+
+    per_tier = {}
+    deferred, correct = [], 0
+    for item in corpus:
+        start = time.perf_counter()
+        if use_llm:
+            intent, tier = parser.classify(item["text"])
+        else:
+            decided = parser.fast_path(item["text"])
+            if not decided:
+                deferred.append(item)
+                continue
+            intent, tier = decided
+        elapsed = (time.perf_counter() - start) * 1000
+
+        stats = per_tier.setdefault(tier, {"n": 0, "correct": 0, "ms": 0.0})
+        stats["n"] += 1
+        stats["ms"] += elapsed
+        if intent == item["intent"]:
+            stats["correct"] += 1
+            correct += 1
+        else:
+            print(f"  miss [{tier}] {item['text']!r}: got {intent}, want {item['intent']}")
+
+    print(f"\n{len(corpus)} messages")
+    for tier in IntentParser.TIERS:
+        stats = per_tier.get(tier)
+        if not stats:
+            continue
+        print(f"{tier:<10} decided {stats['n']:3d} ({stats['n'] / len(corpus):5.1%})  "
+              f"accuracy {stats['correct'] / stats['n']:5.1%}  avg {stats['ms'] / stats['n']:8.3f} ms")
+    if deferred:
+        print(f"{'deferred':<10} {len(deferred):3d} ({len(deferred) / len(corpus):5.1%}) would go to the LLM")
+    decided = len(corpus) - len(deferred)
+    if decided:
+        print(f"accuracy on decided messages: {correct / decided:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Per-call latency of MemoryManager operations: the previous connect-per-call
+implementation versus the thread-local connection layer (WAL, tuned pragmas,
+cached prepared statements), on the same on-disk database.
+
+    python -m ghostdesk.benchmarks.bench_memory [calls_per_op]
+"""
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import statistics
+from datetime import datetime
+from ghostdesk.core.memory import MemoryManager, REMEMBER_SQL, RECALL_SQL, LOG_INTERACTION_SQL, RECENT_HISTORY_SQL
+
+
+class _ConnectPerCall:
+    """What MemoryManager did before: open, run one statement, commit, close."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    def remember(self, key, value):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(REMEMBER_SQL, (key, value, datetime.now().isoformat()))
+        conn.commit()
+        conn.close()
+
+    def recall(self, key):
+        conn = sqlite3.connect(self.db_path)
+        row = conn.execute(RECALL_SQL, (key,)).fetchone()
+        conn.close()
+        return row
+
+    def log_interaction(self, role, content, session_id="default"):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(LOG_INTERACTION_SQL, (role, content, datetime.now().isoformat(), session_id))
+        conn.commit()
+        conn.close()
+
+    def get_recent_history(self, limit=10, session_id="default"):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(RECENT_HISTORY_SQL, (session_id, limit)).fetchall()
+        conn.close()
+        return rows
+
+
+def _time(fn, n: int):
+    samples = []
+    for i in range(n):
+        start = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples), sorted(samples)[int(n * 0.95) - 1]
+
+
+def _ops(memory):
+    return [
+        ("remember", lambda i: memory.remember(f"fact{i % 50}", "value")),
+        ("recall", lambda i: memory.recall(f"fact{i % 50}")),
+        ("log_interaction", lambda i: memory.log_interaction("system", f"Executed step {i}")),
+        ("get_recent_history", lambda i: memory.get_recent_history(limit=5)),
+    ]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "memory.db")
+        pooled = MemoryManager(db_path=db_path)
+        # Same schema, but in the rollback-journal mode the old code left the file in
+        legacy_path = os.path.join(tmp, "memory_legacy.db")
+        MemoryManager(db_path=legacy_path).close()
+        sqlite3.connect(legacy_path).execute("PRAGMA journal_mode=DELETE").close()
+        legacy = _ConnectPerCall(legacy_path)
+
+        print(f"{n} calls per operation, median / p95 in microseconds")
+        print(f"{'operation':<20} {'connect per call':>22} {'thread-local':>22} {'speed-up':>9}")
+        for (name, old), (_, new) in zip(_ops(legacy), _ops(pooled)):
+            old_p50, old_p95 = _time(old, n)
+            new_p50, new_p95 = _time(new, n)
+            print(f"{name:<20} {old_p50:10.1f} / {old_p95:9.1f} {new_p50:10.1f} / {new_p95:9.1f} {old_p50 / new_p50:8.1f}x")
+        pooled.close()
+
+
+if __name__ == "__main__":
+    main()
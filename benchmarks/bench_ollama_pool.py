@@ -0,0 +1,53 @@
+"""
+Requests/sec against a stand-in Ollama server: a fresh connection per call
+(the old requests.post path) versus the shared pooled OllamaClient.
+
+    python -m ghostdesk.benchmarks.bench_ollama_pool [n_requests] [threads]
+"""
+import sys
+import time
+import itertools
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from ghostdesk.core.llm import OllamaClient
+from ghostdesk.benchmarks.fake_ollama import FakeOllamaServer
+
+
+def _fresh_connection(url: str):
+    payload = {"model": "llama3.2", "prompt": "hi", "stream": False, "format": "json"}
+    response = requests.post(f"{url}/api/generate", json=payload, timeout=30)
+    response.raise_for_status()
+    return response.json().get("response", "")
+
+
+def _run(label: str, fn, n: int, threads: int):
+    start = time.perf_counter()
+    if threads <= 1:
+        for _ in range(n):
+            fn()
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(lambda _: fn(), range(n)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} threads={threads:<3} {n / elapsed:8.1f} req/s")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    with FakeOllamaServer() as server:
+        client = OllamaClient(base_url=server.url, pool_size=threads)
+        # Unique prompts so the response cache and in-flight coalescing stay out of the way
+        counter = itertools.count()
+        pooled = lambda: client.generate(f"hi {next(counter)}", use_cache=False)
+        fresh = lambda: _fresh_connection(server.url)
+
+        for t in (1, threads):
+            _run("before (fresh connection)", fresh, n, t)
+            _run("after (pooled session)", pooled, n, t)
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Command queue throughput: the old in-memory queue.Queue versus the durable
+SQLite CommandQueue (put, then get + task_done for every command), with one
+producer and one consumer thread running concurrently.
+
+    python -m ghostdesk.benchmarks.bench_queue [n_commands] [batch_size]
+"""
+import os
+import sys
+import time
+import queue
+import tempfile
+import threading
+from ghostdesk.core.queue_mgr import CommandQueue
+from ghostdesk.core.types import UserCommand
+
+
+def _commands(n: int):
+    return [
+        UserCommand(raw_text=f"open notepad {i}", sender_id=f"user{i % 8}", platform="bench", message_id=str(i))
+        for i in range(n)
+    ]
+
+
+def _run(put, get, ack, commands) -> float:
+    n = len(commands)
+
+    def consume():
+        for _ in range(n):
+            command = get()
+            ack(command)
+
+    consumer = threading.Thread(target=consume)
+    start = time.perf_counter()
+    consumer.start()
+    for command in commands:
+        put(command)
+    consumer.join()
+    return time.perf_counter() - start
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    commands = _commands(n)
+
+    plain = queue.Queue()
+    elapsed_plain = _run(plain.put, plain.get, lambda c: plain.task_done(), commands)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        durable = CommandQueue(db_path=os.path.join(tmp, "queue.db"), batch_size=batch)
+        elapsed_durable = _run(durable.put, lambda: durable.get(timeout=5.0), durable.task_done, commands)
+        durable.close()
+
+        unbatched = CommandQueue(db_path=os.path.join(tmp, "queue1.db"), batch_size=1)
+        elapsed_unbatched = _run(unbatched.put, lambda: unbatched.get(timeout=5.0), unbatched.task_done, commands)
+        unbatched.close()
+
+    print(f"{n} commands, put + get + ack, producer and consumer threads")
+    for label, elapsed in (
+        ("queue.Queue (in memory)", elapsed_plain),
+        (f"CommandQueue, batch {batch}", elapsed_durable),
+        ("CommandQueue, batch 1", elapsed_unbatched),
+    ):
+        print(f"{label:26}: {elapsed:6.2f} s  {n / elapsed:9.0f} commands/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Throughput of coordinator worker processes sharing one SQLite CommandQueue.
+Each command stands in for a model-heavy step: cpu_ms of pure-Python work
+(holds the GIL, like prompt building and response parsing) plus io_ms of
+waiting on the model. Scaling with processes is bounded by the core count.
+
+    python -m ghostdesk.benchmarks.bench_workers [n_commands] [cpu_ms] [io_ms] [threads]
+"""
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import threading
+from ghostdesk.core.types import UserCommand
+
+
+def _burn(ms: float):
+    end = time.perf_counter() + ms / 1000
+    x = 0
+    while time.perf_counter() < end:
+        x += 1
+    return x
+
+
+def _consume(index: int, threads: int, stop_event):
+    from ghostdesk.core.queue_mgr import CommandQueue
+
+    queue = CommandQueue.get_instance()
+    cpu_ms = float(os.environ["BENCH_CPU_MS"])
+    io_ms = float(os.environ["BENCH_IO_MS"])
+
+    def run():
+        while not stop_event.is_set():
+            command = queue.get(timeout=0.2)
+            if command is None:
+                continue
+            _burn(cpu_ms)
+            time.sleep(io_ms / 1000)
+            queue.task_done(command)
+
+    pool = [threading.Thread(target=run) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    queue.close()
+
+
+def _run(processes: int, threads: int, n: int, tmp: str) -> float:
+    db_path = os.path.join(tmp, f"queue-{processes}.db")
+    os.environ["QUEUE_DB"] = db_path
+    os.environ["STATE_DB"] = os.path.join(tmp, "state.db")
+    # Config reads the environment at import time, so set it before importing
+    from ghostdesk.core.queue_mgr import CommandQueue
+    from ghostdesk.core.workers import WorkerPool
+
+    producer = CommandQueue(db_path=db_path)
+    for i in range(n):
+        producer.put(UserCommand(raw_text=f"step {i}", sender_id=f"user{i}", platform="bench", message_id=str(i)))
+    producer.flush()
+
+    pool = WorkerPool(processes=processes, threads=threads, target=_consume)
+    start = time.perf_counter()
+    pool.start()
+    probe = sqlite3.connect(db_path)
+    while probe.execute("SELECT COUNT(*) FROM commands").fetchone()[0]:
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    probe.close()
+    pool.stop()
+    producer.close()
+    return elapsed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    os.environ["BENCH_CPU_MS"] = sys.argv[2] if len(sys.argv) > 2 else "10"
+    os.environ["BENCH_IO_MS"] = sys.argv[3] if len(sys.argv) > 3 else "20"
+    threads = int(sys.argv[4]) if len(sys.argv) > 4 else 4
+
+    print(f"{n} commands, {os.environ['BENCH_CPU_MS']} ms CPU + {os.environ['BENCH_IO_MS']} ms I/O each, "
+          f"{threads} threads per process, {os.cpu_count()} cores")
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline = None
+        for processes in (1, 2, 4):
+            elapsed = _run(processes, threads, n, tmp)
+            baseline = baseline or elapsed
+            # Includes process start-up (interpreter + imports), as a real restart would
+            print(f"{processes} process(es): {elapsed:6.2f} s  {n / elapsed:7.1f} commands/s  x{baseline / elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    main()
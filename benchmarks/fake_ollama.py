@@ -0,0 +1,91 @@
+"""
+Stand-in Ollama server for benchmarks.
+Answers /api/generate with a canned response so client overhead can be measured
+without a real model.
+"""
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive
+
+    def setup(self):
+        super().setup()
+        # Go's net/http (and so Ollama) disables Nagle; mirror that or keep-alive
+        # connections stall on delayed ACKs and skew the numbers.
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        time.sleep(self.server.latency)
+
+        if payload.get("stream"):
+            self._stream(payload)
+            return
+
+        body = json.dumps({
+            "model": payload.get("model"),
+            "response": self.server.response_text,
+            "done": True
+        }).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+    def _stream(self, payload):
+        # NDJSON over chunked transfer encoding, one token per line
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        tokens = [self.server.response_text[i:i + 4] for i in range(0, len(self.server.response_text), 4)]
+        try:
+            for token in tokens:
+                self._write_chunk({"model": payload.get("model"), "response": token, "done": False})
+                time.sleep(self.server.token_delay)
+            self._write_chunk({"model": payload.get("model"), "response": "", "done": True})
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client cancelled
+
+    def _write_chunk(self, obj):
+        line = json.dumps(obj).encode("utf-8") + b"\n"
+        self.wfile.write(f"{len(line):X}\r\n".encode("ascii") + line + b"\r\n")
+        self.wfile.flush()
+
+
+class FakeOllamaServer:
+    def __init__(self, latency: float = 0.0, response_text: str = '["ok"]', token_delay: float = 0.0):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency = latency
+        self.httpd.response_text = response_text
+        self.httpd.token_delay = token_delay
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -1,9 +1,11 @@
 import uuid
 import logging
-from typing import Dict, List, Optional
+import threading
+from typing import List, Optional
 from pydantic import BaseModel
 from .types import Step, UserCommand
 from .identity import UserIdentity
+from .shared_state import connect
 
 logger = logging.getLogger(__name__)
 
@@ -15,10 +17,24 @@ class ApprovalRequest(BaseModel):
     status: str = "PENDING" # PENDING, APPROVED, REJECTED
 
 class ApprovalService:
+    """
+    Approval requests live in STATE_DB so any worker process can resolve a
+    request another one created. Status changes are a conditional UPDATE, so
+    a request flips out of PENDING exactly once across all processes.
+    """
     _instance = None
-    
-    def __init__(self):
-        self._requests: Dict[str, ApprovalRequest] = {}
+
+    def __init__(self, db_path: str = None):
+        self._db = connect(db_path)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute('''
+                CREATE TABLE IF NOT EXISTS approvals (
+                    request_id TEXT PRIMARY KEY,
+                    request TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'PENDING'
+                )
+            ''')
 
     @classmethod
     def get_instance(cls):
@@ -34,25 +50,37 @@ class ApprovalService:
             identity=identity,
             plan=plan
         )
-        self._requests[req_id] = request
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO approvals (request_id, request, status) VALUES (?, ?, ?)",
+                (req_id, request.model_dump_json(), request.status)
+            )
         logger.info(f"Created Approval Request [{req_id}] for user {identity.user_id}")
         return req_id
 
     def get_request(self, request_id: str) -> Optional[ApprovalRequest]:
-        return self._requests.get(request_id)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT request, status FROM approvals WHERE request_id = ?", (request_id,)
+            ).fetchone()
+        if not row:
+            return None
+        request = ApprovalRequest.model_validate_json(row[0])
+        request.status = row[1]
+        return request
+
+    def _resolve(self, request_id: str, status: str) -> bool:
+        with self._lock:
+            changed = self._db.execute(
+                "UPDATE approvals SET status = ? WHERE request_id = ? AND status = 'PENDING'",
+                (status, request_id)
+            ).rowcount
+        if changed:
+            logger.info(f"Request [{request_id}] {status}.")
+        return bool(changed)
 
     def approve_request(self, request_id: str) -> bool:
-        req = self._requests.get(request_id)
-        if req and req.status == "PENDING":
-            req.status = "APPROVED"
-            logger.info(f"Request [{request_id}] APPROVED.")
-            return True
-        return False
+        return self._resolve(request_id, "APPROVED")
 
     def reject_request(self, request_id: str) -> bool:
-        req = self._requests.get(request_id)
-        if req and req.status == "PENDING":
-            req.status = "REJECTED"
-            logger.info(f"Request [{request_id}] REJECTED.")
-            return True
-        return False
+        return self._resolve(request_id, "REJECTED")
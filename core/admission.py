@@ -0,0 +1,138 @@
+import time
+import logging
+import threading
+from enum import Enum
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from .types import UserCommand
+from .config import Config
+from .metrics import Metrics
+from .queue_mgr import CommandQueue, Priority, classify
+
+logger = logging.getLogger(__name__)
+
+class Admission(str, Enum):
+    ACCEPT = "accept"
+    DUPLICATE = "duplicate"
+    SHED = "shed"
+    RATE_LIMITED = "rate_limited"
+
+REPLIES = {
+    Admission.SHED: "🚦 Busy right now, please try again in a minute.",
+    Admission.RATE_LIMITED: "🐢 You're sending commands faster than I can take them, please slow down.",
+}
+
+class TokenBucket:
+    """rate tokens per second, holding at most burst."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= 1.0
+
+    def take(self):
+        self.tokens -= 1.0
+
+    def full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.burst
+
+class AdmissionController:
+    """
+    Bounded front door for CommandQueue. In order: drops resubmissions of an
+    already accepted message_id (silently), sheds work once the queue is
+    QUEUE_MAX_DEPTH deep (approvals always get through), then enforces
+    token buckets per sender and per platform.
+    """
+    MAX_BUCKETS = 10000
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, queue: CommandQueue = None):
+        self.queue = queue or CommandQueue.get_instance()
+        self.metrics = Metrics.get_instance()
+        self.max_depth = Config.QUEUE_MAX_DEPTH
+        self._state_lock = threading.Lock()
+        self._senders: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._platforms: Dict[str, TokenBucket] = {}
+        self._seen: "OrderedDict[Tuple[str, str, str], float]" = OrderedDict()  # -> expires_at
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = AdmissionController()
+        return cls._instance
+
+    def _sender_bucket(self, key: str, now: float) -> TokenBucket:
+        bucket = self._senders.get(key)
+        if bucket is None:
+            bucket = TokenBucket(Config.ADMISSION_SENDER_RATE, Config.ADMISSION_SENDER_BURST)
+            self._senders[key] = bucket
+            if len(self._senders) > self.MAX_BUCKETS:
+                # A full bucket is indistinguishable from a new one, so drop idle senders
+                for idle in [k for k, b in self._senders.items() if b.full(now)]:
+                    del self._senders[idle]
+        self._senders.move_to_end(key)
+        return bucket
+
+    def _platform_bucket(self, platform: str) -> TokenBucket:
+        bucket = self._platforms.get(platform)
+        if bucket is None:
+            bucket = TokenBucket(Config.ADMISSION_PLATFORM_RATE, Config.ADMISSION_PLATFORM_BURST)
+            self._platforms[platform] = bucket
+        return bucket
+
+    def _is_duplicate(self, key: Tuple[str, str, str], now: float) -> bool:
+        while self._seen:
+            oldest, expires_at = next(iter(self._seen.items()))
+            if expires_at > now and len(self._seen) <= Config.ADMISSION_DEDUP_SIZE:
+                break
+            del self._seen[oldest]
+        return key in self._seen
+
+    def admit(self, command: UserCommand) -> Admission:
+        now = time.monotonic()
+        dedup_key = (command.platform, command.sender_id, command.message_id)
+        priority = classify(command)
+
+        with self._state_lock:
+            if self._is_duplicate(dedup_key, now):
+                decision = Admission.DUPLICATE
+            elif priority != Priority.APPROVAL and self.queue.qsize() >= self.max_depth:
+                decision = Admission.SHED
+            else:
+                sender = self._sender_bucket(f"{command.platform}:{command.sender_id}", now)
+                platform = self._platform_bucket(command.platform)
+                if priority == Priority.APPROVAL:
+                    decision = Admission.ACCEPT
+                elif sender.available(now) and platform.available(now):
+                    sender.take()
+                    platform.take()
+                    decision = Admission.ACCEPT
+                else:
+                    decision = Admission.RATE_LIMITED
+
+            if decision == Admission.ACCEPT:
+                self._seen[dedup_key] = now + Config.ADMISSION_DEDUP_TTL
+
+        self.metrics.incr(f"admission.{decision.value}")
+        self.metrics.incr(f"admission.{decision.value}.{command.platform}")
+        if decision != Admission.ACCEPT:
+            logger.info(f"Admission {decision.value} for {command.sender_id} on {command.platform}")
+        return decision
+
+    @staticmethod
+    def reply_for(decision: Admission) -> Optional[str]:
+        """What to tell the sender; None means say nothing (duplicates)."""
+        return REPLIES.get(decision)
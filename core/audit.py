@@ -2,6 +2,7 @@ import json
 import logging
 import time
 import os
+import threading
 from typing import Any, Dict
 
 logger = logging.getLogger(__name__)
@@ -11,6 +12,7 @@ class AuditLogger:
     LOG_FILE = "audit_log.jsonl"
 
     def __init__(self):
+        self._write_lock = threading.Lock()
         # Ensure log file exists or create it
         if not os.path.exists(self.LOG_FILE):
              with open(self.LOG_FILE, 'w') as f:
@@ -35,7 +37,7 @@ class AuditLogger:
         }
         
         try:
-            with open(self.LOG_FILE, "a", encoding="utf-8") as f:
+            with self._write_lock, open(self.LOG_FILE, "a", encoding="utf-8") as f:
                 f.write(json.dumps(entry) + "\n")
         except Exception as e:
             logger.error(f"Failed to write audit log: {e}")
@@ -1,12 +1,19 @@
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor, Future
 from .queue_mgr import CommandQueue
 from .memory import MemoryManager
 from .types import UserCommand
 from ..agents.planner import PlannerAgent
 from ..agents.vision import VisionAgent
+from ..agents.verifier import screen_settled
 from .skill_engine import SkillEngine
 from .intent import IntentParser
+from .model_manager import ModelManager
+from .config import Config
+from .metrics import Metrics
+from .cancellation import CancellationToken, CancellationRegistry, sender_key
+from .waits import set_screen_settle
 # from ..agents.knowledge import AttributionAgent # RAG
 
 logger = logging.getLogger(__name__)
@@ -28,6 +35,13 @@ class Brain:
         self.planner = PlannerAgent(model_name="llama3.2")
         self.vision = VisionAgent(model="llama3.2-vision")
         self.skill_engine = SkillEngine()
+        set_screen_settle(screen_settled)
+        self.models = ModelManager.get_instance()
+        self.models.warm_up_async(["llama3.2", "llama3.2-vision"])
+        self.metrics = Metrics.get_instance()
+        self.cancellations = CancellationRegistry.get_instance()
+        self.speculative = Config.SPECULATIVE_PLANNING
+        self._speculation_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="speculative-plan")
         # self.attribution = AttributionAgent() # Logic bringing logic here later
         
         self.running = False
@@ -38,24 +52,42 @@ class Brain:
         
         while self.running:
             try:
-                command = self.queue.get_command(timeout=1.0)
+                command = self.queue.get(timeout=1.0)
                 if command:
-                    self._process_command(command)
+                    cancel = CancellationToken(Config.PLAN_TIMEOUT)
+                    self.cancellations.register(sender_key(command), cancel, since=command.timestamp.timestamp())
+                    try:
+                        self._process_command(command, cancel)
+                    finally:
+                        self.cancellations.unregister(sender_key(command), cancel)
+                        self.queue.task_done(command)
             except Exception as e:
                 # queue empty
                 pass
 
-    def _process_command(self, command: UserCommand):
+    def _process_command(self, command: UserCommand, cancel: CancellationToken = None):
         logger.info(f"Processing: {command.raw_text}")
         
         # 1. Memory Log (User)
         self.memory.log_interaction("user", command.raw_text)
         
-        # 2. Context Retrieval
-        history = self.memory.get_recent_history(limit=5)
-        
-        # 3. Intent Parsing
-        intent = self.intent_parser.parse(command.raw_text)
+        plan = None
+        fast = self.intent_parser.fast_path(command.raw_text)
+        if fast:
+            # Cheap tier already knows the answer, nothing to speculate on
+            intent = fast[0]
+            history = self.memory.get_recent_history(limit=5)
+        elif self.speculative:
+            intent, history, plan = self._parse_with_speculative_plan(command, cancel)
+        else:
+            # 2. Context Retrieval
+            history = self.memory.get_recent_history(limit=5)
+
+            # 3. Intent Parsing (fast tiers already deferred)
+            intent = self.intent_parser.llm_parse(command.raw_text, cancel=cancel)
+        if cancel is not None and cancel.is_set():
+            self._respond(command.sender_id, "⏹ Stopped." if cancel.reason == "stop" else "⌛ Timed out.")
+            return
         logger.info(f"Detected Intent: {intent}")
         
         if intent == "CHAT":
@@ -67,28 +99,87 @@ class Brain:
             self._respond(command.sender_id, "I need to check the Knowledge Base for that. (Query Mode)")
             
         elif intent == "TASK":
-            self._execute_task_pipeline(command, history)
+            self._execute_task_pipeline(command, history, plan=plan, cancel=cancel)
+
+    def _parse_with_speculative_plan(self, command: UserCommand, cancel: CancellationToken = None):
+        """
+        Starts planning alongside the LLM intent call instead of after it.
+        The plan is kept only if the intent turns out to be TASK; otherwise
+        it is cut off and its cost is recorded as wasted. A STOP on the
+        command cancels both calls.
+        """
+        start = time.perf_counter()
+        speculation = (cancel or CancellationToken()).child()
+
+        def speculate():
+            plan_start = time.perf_counter()
+            history = self.memory.get_recent_history(limit=5)
+            plan = self.planner.create_plan(command.raw_text, context=history, cancel=speculation)
+            return history, plan, (time.perf_counter() - plan_start) * 1000
+
+        future: Future = self._speculation_pool.submit(speculate)
 
-    def _execute_task_pipeline(self, command: UserCommand, context: list):
-        plan = self.planner.create_plan(command.raw_text, context=context)
+        intent_start = time.perf_counter()
+        intent = self.intent_parser.llm_parse(command.raw_text, cancel=cancel)
+        intent_ms = (time.perf_counter() - intent_start) * 1000
+
+        if intent != "TASK" or speculation.is_set():
+            speculation.cancel("unused")
+            if not future.cancel():
+                future.add_done_callback(self._record_wasted_plan)
+            else:
+                self.metrics.incr("speculation.cancelled")
+            return intent, self.memory.get_recent_history(limit=5), None
+
+        history, plan, plan_ms = future.result()
+        wall_ms = (time.perf_counter() - start) * 1000
+        saved_ms = max(0.0, intent_ms + plan_ms - wall_ms)
+        self.metrics.incr("speculation.used")
+        self.metrics.observe("speculation.saved_ms", saved_ms)
+        logger.info(f"Speculative plan used, saved {saved_ms:.0f} ms")
+        return intent, history, plan
+
+    def _record_wasted_plan(self, future: Future):
+        if future.exception():
+            return
+        _, _, plan_ms = future.result()
+        self.metrics.incr("speculation.wasted")
+        self.metrics.observe("speculation.wasted_ms", plan_ms)
+
+    def _execute_task_pipeline(self, command: UserCommand, context: list, plan: list = None,
+                               cancel: CancellationToken = None):
+        cancel = cancel or CancellationToken(Config.PLAN_TIMEOUT)
+        if plan is None:
+            plan = self.planner.create_plan(command.raw_text, context=context, cancel=cancel)
+        if cancel.is_set():
+            self._respond(command.sender_id, "⏹ Stopped." if cancel.reason == "stop" else "⌛ Timed out while planning.")
+            return
         
         if not plan:
             self._respond(command.sender_id, "I couldn't come up with a plan.")
             return
 
-        self._respond(command.sender_id, f"🧠 Planning {len(plan.steps)} steps...")
+        self._respond(command.sender_id, f"🧠 Planning {len(plan)} steps...")
         
-        for step in plan.steps:
+        completed = True
+        for step in plan:
+            if cancel.is_set():
+                self._respond(command.sender_id, "⏹ Stopped." if cancel.reason == "stop" else "⌛ Timed out.")
+                return
+
             # Action
-            result = self.skill_engine.execute_step(step, context=None) # Passing None context for now as Vision linkage needs refactor
+            result = self.skill_engine.execute_step(step, context=None, cancel=cancel.child(Config.STEP_TIMEOUT)) # Passing None context for now as Vision linkage needs refactor
             
             # Memory Log (System)
             self.memory.log_interaction("system", f"Executed {step.action_type}: {result.message}")
             
             if not result.success:
                 self._respond(command.sender_id, f"❌ Failed: {result.message}")
+                completed = False
                 break
         
+        if completed:
+            self.planner.remember_plan(command.raw_text, plan)
         self._respond(command.sender_id, "✅ Done.")
 
     def _respond(self, chat_id, text):
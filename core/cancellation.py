@@ -0,0 +1,198 @@
+import time
+import logging
+import threading
+import weakref
+from typing import Dict, Optional, Set
+from .types import UserCommand
+from .config import Config
+from .metrics import Metrics
+from .shared_state import connect
+
+logger = logging.getLogger(__name__)
+
+STOP_WORDS = {"STOP", "CANCEL", "ABORT"}
+
+def is_stop(text: str) -> bool:
+    return text.strip().rstrip("!.").upper() in STOP_WORDS
+
+def sender_key(command: UserCommand) -> str:
+    return f"{command.platform}:{command.sender_id}"
+
+class Cancelled(Exception):
+    """Raised at a cancellation point once the token is set."""
+
+class CancellationToken:
+    """
+    Cooperative cancellation with an optional deadline. is_set() and wait()
+    behave like threading.Event, so a token can go wherever a stop_event is
+    accepted. Child tokens (per step) are cancelled with their parent and
+    never outlive its deadline.
+    """
+
+    def __init__(self, timeout: Optional[float] = None, parent: "CancellationToken" = None):
+        self._event = threading.Event()
+        self._children: "weakref.WeakSet[CancellationToken]" = weakref.WeakSet()
+        self.reason: Optional[str] = None
+        self.cancelled_at: Optional[float] = None  # Wall clock, comparable across processes
+        self.deadline = time.monotonic() + timeout if timeout else None
+        if parent is not None:
+            if parent.deadline is not None:
+                self.deadline = parent.deadline if self.deadline is None else min(self.deadline, parent.deadline)
+            parent._children.add(self)
+            if parent._event.is_set():
+                self.cancel(parent.reason, parent.cancelled_at)
+
+    def child(self, timeout: Optional[float] = None) -> "CancellationToken":
+        return CancellationToken(timeout, parent=self)
+
+    def cancel(self, reason: str = "cancelled", at: float = None):
+        if self._event.is_set():
+            return
+        self.reason = reason
+        self.cancelled_at = at or time.time()
+        self._event.set()
+        for child in list(self._children):
+            child.cancel(reason, self.cancelled_at)
+
+    def remaining(self) -> Optional[float]:
+        return None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+
+    def is_set(self) -> bool:
+        if not self._event.is_set() and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel("deadline")
+        return self._event.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Sleeps up to timeout (or the deadline); True if cancelled meanwhile."""
+        remaining = self.remaining()
+        if remaining is not None:
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        self._event.wait(timeout)
+        return self.is_set()
+
+    def check(self):
+        if self.is_set():
+            raise Cancelled(self.reason)
+
+class CancellationRegistry:
+    """
+    Tokens of the commands running in this process, by sender key
+    ("platform:sender_id"). cancel() stops them directly; with worker
+    processes it also records a stop request in STATE_DB, which every
+    process with running commands polls.
+
+    A STOP can land after a command left the queue but before its token is
+    registered; register() therefore also honours stop requests made since
+    the command was sent (at most STOP_TTL ago).
+    """
+    STOP_TTL = 60.0  # Stop requests older than this are purged
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, db_path: str = None):
+        self.metrics = Metrics.get_instance()
+        self._tokens: Dict[str, Set[CancellationToken]] = {}
+        self._tokens_lock = threading.Lock()
+        self._stopped: Dict[str, float] = {}  # Sender key -> time of its last stop request here
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        if Config.WORKER_PROCESSES:
+            self._db = connect(db_path)
+            self._db.execute("CREATE TABLE IF NOT EXISTS stop_requests (sender TEXT NOT NULL, requested_at REAL NOT NULL)")
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = CancellationRegistry()
+        return cls._instance
+
+    def register(self, key: str, token: CancellationToken, since: float = None):
+        """
+        Tracks token under key. A stop request for key made at or after since
+        (the command's send time) cancels it straight away.
+        """
+        with self._tokens_lock:
+            self._tokens.setdefault(key, set()).add(token)
+            if self._db is not None and self._watcher is None:
+                self._watcher = threading.Thread(target=self._watch, name="stop-watcher", daemon=True)
+                self._watcher.start()
+        stopped_at = self._stopped_since(key, max(since or 0.0, time.time() - self.STOP_TTL))
+        if stopped_at is not None:
+            token.cancel("stop", stopped_at)
+
+    def _stopped_since(self, key: str, since: float) -> Optional[float]:
+        with self._tokens_lock:
+            at = self._stopped.get(key)
+        if at is not None and at >= since:
+            return at
+        if self._db is None:
+            return None
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT MAX(requested_at) FROM stop_requests WHERE sender = ? AND requested_at >= ?", (key, since)
+            ).fetchone()
+        return row[0] if row else None
+
+    def unregister(self, key: str, token: CancellationToken):
+        with self._tokens_lock:
+            tokens = self._tokens.get(key)
+            if tokens:
+                tokens.discard(token)
+                if not tokens:
+                    del self._tokens[key]
+        if token.reason == "stop" and token.cancelled_at:
+            # Cancel-to-idle: from the STOP arriving to the command's last cleanup
+            self.metrics.histogram("cancel.to_idle_ms", (time.time() - token.cancelled_at) * 1000)
+
+    def _cancel_local(self, key: str, at: float = None) -> int:
+        with self._tokens_lock:
+            tokens = list(self._tokens.get(key, ()))
+        for token in tokens:
+            token.cancel("stop", at)
+        return len(tokens)
+
+    def cancel(self, key: str) -> int:
+        """Stops the sender's running commands; returns how many ran in this process."""
+        now = time.time()
+        with self._tokens_lock:
+            self._stopped = {k: at for k, at in self._stopped.items() if at >= now - self.STOP_TTL}
+            self._stopped[key] = now
+        count = self._cancel_local(key, now)
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM stop_requests WHERE requested_at < ?", (now - self.STOP_TTL,))
+                self._db.execute("INSERT INTO stop_requests (sender, requested_at) VALUES (?, ?)", (key, now))
+        self.metrics.incr("cancel.requested")
+        logger.info(f"Stop requested for {key} ({count} running here)")
+        return count
+
+    def _watch(self):
+        seen = time.time()
+        while True:
+            time.sleep(Config.OUTBOX_POLL_INTERVAL)
+            try:
+                with self._db_lock:
+                    rows = self._db.execute(
+                        "SELECT sender, requested_at FROM stop_requests WHERE requested_at > ?", (seen,)
+                    ).fetchall()
+            except Exception as e:
+                logger.warning(f"Stop request poll failed: {e}")
+                continue
+            for key, requested_at in rows:
+                seen = max(seen, requested_at)
+                self._cancel_local(key, requested_at)
+
+def handle_stop(command: UserCommand, queue) -> str:
+    """
+    Runs STOP ahead of the queue: cancels the sender's running commands and
+    drops the ones still waiting. Returns the reply for the sender.
+    """
+    key = sender_key(command)
+    CancellationRegistry.get_instance().cancel(key)
+    dropped = queue.discard(key)
+    if dropped:
+        return f"⏹ Stopping. Dropped {dropped} queued command(s)."
+    return "⏹ Stopping."
@@ -1,6 +1,7 @@
 from .gateway import BaseGateway
 from .types import UserCommand
 import threading
+import itertools
 import sys
 import time
 import logging
@@ -11,6 +12,7 @@ class CLIGateway(BaseGateway):
     def __init__(self):
         super().__init__("CLI")
         self.running = False
+        self._message_ids = itertools.count(1)
 
     def start(self):
         self.running = True
@@ -25,7 +27,7 @@ class CLIGateway(BaseGateway):
                     raw_text=text,
                     sender_id="CLI_USER",
                     platform="cli",
-                    timestamp=time.time()
+                    message_id=f"cli-{int(time.time())}-{next(self._message_ids)}"
                 )
                 self.push_command(cmd)
             except EOFError:
@@ -10,6 +10,144 @@ class Config:
     ]
     SYSTEM_NAME = "GhostDesk"
 
+    # Ollama connection pool
+    OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
+    OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "30"))
+    OLLAMA_POOL_SIZE = int(os.getenv("OLLAMA_POOL_SIZE", "4"))
+    # Per-endpoint pool sizes, e.g. "generate=8,tags=2"
+    OLLAMA_ENDPOINT_POOLS = {
+        name.strip(): int(size)
+        for name, _, size in (
+            item.partition("=") for item in os.getenv("OLLAMA_ENDPOINT_POOLS", "generate=8").split(",")
+        )
+        if name.strip() and size.strip()
+    }
+
+    # Model residency: how long Ollama keeps each model loaded after use,
+    # e.g. "llama3.2=30m,llama3.2-vision=10m" ("-1" = forever)
+    OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+    OLLAMA_MODEL_KEEP_ALIVE = {
+        name.strip(): value.strip()
+        for name, _, value in (
+            item.partition("=") for item in os.getenv("OLLAMA_MODEL_KEEP_ALIVE", "").split(",")
+        )
+        if name.strip() and value.strip()
+    }
+    # Warm-up: seconds between load attempts, attempts before a model is marked FAILED,
+    # and how often (s) to ask Ollama whether READY models are still loaded
+    OLLAMA_WARM_RETRY = float(os.getenv("OLLAMA_WARM_RETRY", "10"))
+    OLLAMA_WARM_ATTEMPTS = int(os.getenv("OLLAMA_WARM_ATTEMPTS", "5"))
+    OLLAMA_PS_INTERVAL = float(os.getenv("OLLAMA_PS_INTERVAL", "15"))
+
+    # LLM response cache (LLM_CACHE_DB empty = memory only)
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "512"))
+    LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "3600"))
+    LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", "")
+    LLM_CACHE_DB_MAX_ENTRIES = int(os.getenv("LLM_CACHE_DB_MAX_ENTRIES", "10000"))
+
+    # Tiered intent classification: rules -> embeddings -> LLM
+    INTENT_RULE_THRESHOLD = float(os.getenv("INTENT_RULE_THRESHOLD", "0.8"))
+    INTENT_EMBEDDINGS = os.getenv("INTENT_EMBEDDINGS", "true").lower() == "true"
+    INTENT_EMBED_MARGIN = float(os.getenv("INTENT_EMBED_MARGIN", "0.05"))
+
+    # Plan in parallel with LLM intent classification (plan discarded unless TASK)
+    SPECULATIVE_PLANNING = os.getenv("SPECULATIVE_PLANNING", "false").lower() == "true"
+
+    # Reusable plan templates (PLAN_CACHE_DB empty = memory only)
+    PLAN_CACHE_ENABLED = os.getenv("PLAN_CACHE_ENABLED", "true").lower() == "true"
+    PLAN_CACHE_SIZE = int(os.getenv("PLAN_CACHE_SIZE", "256"))
+    PLAN_CACHE_DB = os.getenv("PLAN_CACHE_DB", "")
+
+    # Execute plan steps as they stream in. Policy is then checked per step, so
+    # steps before a denied/approval-gated one will already have run.
+    STREAM_PLANS = os.getenv("STREAM_PLANS", "false").lower() == "true"
+
+    # Vision model input: long edge in px (0 = full resolution), JPEG/WEBP/PNG, lossy quality
+    VISION_MAX_EDGE = int(os.getenv("VISION_MAX_EDGE", "1280"))
+    VISION_FORMAT = os.getenv("VISION_FORMAT", "JPEG")
+    VISION_QUALITY = int(os.getenv("VISION_QUALITY", "80"))
+
+    # Element location cache: region side in frame px, max dHash distance (of 256 bits)
+    ELEMENT_CACHE_ENABLED = os.getenv("ELEMENT_CACHE_ENABLED", "true").lower() == "true"
+    ELEMENT_CACHE_SIZE = int(os.getenv("ELEMENT_CACHE_SIZE", "256"))
+    ELEMENT_CACHE_REGION = int(os.getenv("ELEMENT_CACHE_REGION", "160"))
+    ELEMENT_CACHE_MAX_DISTANCE = int(os.getenv("ELEMENT_CACHE_MAX_DISTANCE", "24"))
+
+    # CPU detectors tried before the vision model, in order
+    VISION_DETECTORS = os.getenv("VISION_DETECTORS", "cache,template")
+
+    # Template matching: crop side and coarse downscale in frame px, NCC thresholds
+    # (TEMPLATE_DIR is created with the first learned template; empty = keep them in memory only)
+    TEMPLATE_DIR = os.getenv("TEMPLATE_DIR", "element_templates")
+    TEMPLATE_SIZE = int(os.getenv("TEMPLATE_SIZE", "64"))
+    TEMPLATE_SCALE = int(os.getenv("TEMPLATE_SCALE", "4"))
+    TEMPLATE_THRESHOLD = float(os.getenv("TEMPLATE_THRESHOLD", "0.9"))
+    TEMPLATE_MARGIN = float(os.getenv("TEMPLATE_MARGIN", "0.05"))
+
+    # Post-action verification: frame diff tiles (DIFF_BLOCK px after a DIFF_SCALE downscale)
+    VERIFY_ACTIONS = os.getenv("VERIFY_ACTIONS", "true").lower() == "true"
+    # Fail the step on "no visible effect" instead of logging a warning (some actions legitimately show none)
+    VERIFY_STRICT = os.getenv("VERIFY_STRICT", "false").lower() == "true"
+    DIFF_SCALE = int(os.getenv("DIFF_SCALE", "4"))
+    DIFF_BLOCK = int(os.getenv("DIFF_BLOCK", "8"))
+    DIFF_THRESHOLD = float(os.getenv("DIFF_THRESHOLD", "10"))
+    SETTLE_TIMEOUT = float(os.getenv("SETTLE_TIMEOUT", "2.0"))
+    SETTLE_INTERVAL = float(os.getenv("SETTLE_INTERVAL", "0.05"))
+
+    # Desktop pacing: "human" (fixed delays) or "fast" (waits end on observed conditions)
+    EXECUTION_PROFILE = os.getenv("EXECUTION_PROFILE", "human")
+    WAIT_POLL_INTERVAL = float(os.getenv("WAIT_POLL_INTERVAL", "0.05"))
+
+    # TYPE steps: paste text at least this long (seconds to let the target read the clipboard)
+    TYPE_PASTE_THRESHOLD = int(os.getenv("TYPE_PASTE_THRESHOLD", "40"))
+    TYPE_PASTE_SETTLE = float(os.getenv("TYPE_PASTE_SETTLE", "0.15"))
+
+    # OPEN_APP direct launch: app index lifetime and readiness wait (seconds, upper bound)
+    LAUNCHER_INDEX_TTL = float(os.getenv("LAUNCHER_INDEX_TTL", "300"))
+    LAUNCH_TIMEOUT = float(os.getenv("LAUNCH_TIMEOUT", "2.0"))
+
+    # Coordinator worker threads (commands of one user still run in order)
+    COORDINATOR_WORKERS = int(os.getenv("COORDINATOR_WORKERS", "4"))
+
+    # Durable command queue (QUEUE_DB empty = in-memory SQLite, lost on restart)
+    QUEUE_DB = os.getenv("QUEUE_DB", "command_queue.db")
+    QUEUE_BATCH_SIZE = int(os.getenv("QUEUE_BATCH_SIZE", "64"))
+    QUEUE_FLUSH_INTERVAL = float(os.getenv("QUEUE_FLUSH_INTERVAL", "0.005"))
+    QUEUE_MAX_ATTEMPTS = int(os.getenv("QUEUE_MAX_ATTEMPTS", "3"))
+    QUEUE_LEASE_TIMEOUT = float(os.getenv("QUEUE_LEASE_TIMEOUT", "30"))
+    QUEUE_POLL_INTERVAL = float(os.getenv("QUEUE_POLL_INTERVAL", "0.05"))
+    QUEUE_BUSY_TIMEOUT = float(os.getenv("QUEUE_BUSY_TIMEOUT", "10"))
+
+    # Worker processes (0 = run the coordinator in the gateway process) and the
+    # state they share: approvals, identities, outbound messages, model states (STATE_DB empty = in-memory)
+    WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", "0"))
+    STATE_DB = os.getenv("STATE_DB", "ghostdesk_state.db")
+    OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "0.1"))
+    DESKTOP_LOCK_FILE = os.getenv("DESKTOP_LOCK_FILE", "desktop.lock")
+
+    # Deadlines (seconds, 0 = none) for a whole command and for each of its steps
+    PLAN_TIMEOUT = float(os.getenv("PLAN_TIMEOUT", "300"))
+    STEP_TIMEOUT = float(os.getenv("STEP_TIMEOUT", "60"))
+
+    # Long-term memory DB and its per-connection page cache (negative = KiB) and mmap window (bytes)
+    MEMORY_DB = os.getenv("MEMORY_DB", "localmolt.db")
+    MEMORY_CACHE_SIZE = int(os.getenv("MEMORY_CACHE_SIZE", "-8000"))
+    MEMORY_MMAP_SIZE = int(os.getenv("MEMORY_MMAP_SIZE", str(64 * 1024 * 1024)))
+
+    # Admission: token buckets (commands/s, burst), queue depth cap, message_id dedup window (s)
+    ADMISSION_SENDER_RATE = float(os.getenv("ADMISSION_SENDER_RATE", "0.5"))
+    ADMISSION_SENDER_BURST = float(os.getenv("ADMISSION_SENDER_BURST", "5"))
+    ADMISSION_PLATFORM_RATE = float(os.getenv("ADMISSION_PLATFORM_RATE", "5"))
+    ADMISSION_PLATFORM_BURST = float(os.getenv("ADMISSION_PLATFORM_BURST", "20"))
+    QUEUE_MAX_DEPTH = int(os.getenv("QUEUE_MAX_DEPTH", "200"))
+    ADMISSION_DEDUP_TTL = float(os.getenv("ADMISSION_DEDUP_TTL", "600"))
+    ADMISSION_DEDUP_SIZE = int(os.getenv("ADMISSION_DEDUP_SIZE", "10000"))
+
+    @classmethod
+    def keep_alive_for(cls, model: str) -> str:
+        return cls.OLLAMA_MODEL_KEEP_ALIVE.get(model, cls.OLLAMA_KEEP_ALIVE)
+
     @classmethod
     def validate(cls):
         if not cls.TELEGRAM_TOKEN:
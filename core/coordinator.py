@@ -1,24 +1,46 @@
 import time
 import logging
 import threading
-from typing import Dict, Any
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, Any, List, Optional, Tuple
 
-from .queue_mgr import CommandQueue
+from .queue_mgr import CommandQueue, Priority, classify
 from .types import UserCommand, AgentResult
 from .identity import IdentityManager
 from .policy import PolicyEngine, Decision
 from .access_control import ApprovalService
 from .audit import AuditLogger
+from .model_manager import ModelManager
+from .metrics import Metrics
+from .desktop_lease import DesktopLease, DesktopRun, needs_desktop
+from .cancellation import CancellationToken, CancellationRegistry, Cancelled, sender_key
+from .waits import set_screen_settle
+from .config import Config
 from ..agents.planner import PlannerAgent
 from ..agents.vision import VisionAgent
 from ..agents.action import ActionAgent
 from ..agents.knowledge import AttributionAgent
-from ..agents.skeletons import VerifierAgent
+from ..agents.verifier import VerifierAgent, EXPECTS_CHANGE, screen_settled
+from ..agents.frames import FrameProvider
 
 logger = logging.getLogger(__name__)
 
 class Coordinator:
-    def __init__(self):
+    """
+    Runs commands on a worker pool. Each user's commands run one at a time in
+    arrival order (approvals jump ahead); different users run in parallel.
+    A command is only taken off the queue when a worker is free, so the
+    queue's priority classes decide what runs next. Steps that drive the
+    mouse/keyboard additionally take the DesktopLease, which a plan keeps
+    from its first such step through its last.
+
+    Every command runs under a CancellationToken with a PLAN_TIMEOUT
+    deadline, and each step under a child token with STEP_TIMEOUT. STOP
+    (handled by the gateway, ahead of the queue) cancels it; plans check it
+    between steps, model calls and waits check it while they run.
+    """
+    def __init__(self, workers: int = None):
         self.queue = CommandQueue.get_instance()
         self.identity_mgr = IdentityManager.get_instance()
         self.approval_service = ApprovalService.get_instance()
@@ -28,37 +50,111 @@ class Coordinator:
         self.vision = VisionAgent(model="llama3.2-vision")
         self.attribution = AttributionAgent(model="llama3.2")
         self.action = ActionAgent()
-        self.verifier = VerifierAgent()
+        self.verifier = VerifierAgent(grab=self.vision.capture_frame)
+        set_screen_settle(screen_settled)
+        self.models = ModelManager.get_instance()
+        self.models.warm_up_async(["llama3.2", "llama3.2-vision"])
         
+        self.lease = DesktopLease.get_instance()
+        self.metrics = Metrics.get_instance()
+        self.cancellations = CancellationRegistry.get_instance()
+        self.workers = workers or Config.COORDINATOR_WORKERS
+        self._pool: Optional[ThreadPoolExecutor] = None
+        # sender_id -> commands waiting behind the one in flight, with their dispatch time
+        self._pending: Dict[str, Deque[Tuple[UserCommand, float]]] = {}
+        self._scheduled = set()  # Users with a command submitted to the pool
+        self._slots = threading.Semaphore(self.workers)  # Held by each submitted command
+        self._users_lock = threading.Lock()
+
         self.running = False
         self._thread = None
         # In a real app, this would be a message bus to send updates back to adapter
         self.adapter_callback = None 
+        # Worker processes answer through the outbox, which needs the command's platform
+        self.reply_callback = None
 
     def set_callback(self, callback):
         self.adapter_callback = callback
 
+    def set_reply_callback(self, callback):
+        """callback(command, text); used instead of adapter_callback when set."""
+        self.reply_callback = callback
+
     def start(self):
         self.running = True
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="coordinator")
         self._thread = threading.Thread(target=self._loop, daemon=True)
         self._thread.start()
-        logger.info("Enterprise Coordinator started.")
+        logger.info(f"Enterprise Coordinator started with {self.workers} workers.")
 
     def stop(self):
         self.running = False
         if self._thread:
             self._thread.join()
+        if self._pool:
+            self._pool.shutdown(wait=True)
         logger.info("Coordinator stopped.")
 
     def _loop(self):
         while self.running:
+            if not self._slots.acquire(timeout=1.0):
+                continue
             command = self.queue.get(timeout=1.0)
             if command:
-                self._handle_command(command)
-                self.queue.task_done()
+                self._dispatch(command)
+            else:
+                self._slots.release()
+
+    def _dispatch(self, command: UserCommand):
+        """Submits the command (keeping the slot), or parks it behind the user's running one."""
+        user = command.sender_id
+        entry = (command, time.perf_counter())
+        with self._users_lock:
+            pending = self._pending.setdefault(user, deque())
+            if classify(command) == Priority.APPROVAL:
+                pending.appendleft(entry)
+            else:
+                pending.append(entry)
+            if user in self._scheduled:
+                self._slots.release()
+                return
+            self._scheduled.add(user)
+        self._pool.submit(self._run_next, user)
 
-    def _handle_command(self, command: UserCommand):
+    def _run_next(self, user: str):
+        """
+        Runs the user's commands one after another on the same slot until the
+        user's backlog is empty. Looping here rather than resubmitting means
+        nothing is submitted to the pool once stop() has shut it down.
+        """
+        while True:
+            with self._users_lock:
+                command, dispatched = self._pending[user].popleft()
+
+            started = time.perf_counter()
+            self.metrics.histogram("coordinator.queue_wait_ms", (started - dispatched) * 1000)
+            cancel = CancellationToken(Config.PLAN_TIMEOUT)
+            self.cancellations.register(sender_key(command), cancel, since=command.timestamp.timestamp())
+            try:
+                self._handle_command(command, cancel)
+            except Exception as e:
+                logger.exception(f"Command from {user} failed: {e}")
+                self._notify_user(command, "Internal error while running your command.")
+            finally:
+                self.cancellations.unregister(sender_key(command), cancel)
+                self.metrics.histogram("coordinator.service_ms", (time.perf_counter() - started) * 1000)
+                self.queue.task_done(command)
+
+            with self._users_lock:
+                if not self._pending[user]:
+                    del self._pending[user]
+                    self._scheduled.discard(user)
+                    break
+        self._slots.release()
+
+    def _handle_command(self, command: UserCommand, cancel: CancellationToken = None):
         logger.info(f"Processing command from {command.sender_id}")
+        cancel = cancel or CancellationToken(Config.PLAN_TIMEOUT)
         
         # 0. IDENTITY LOOKUP
         identity = self.identity_mgr.get_identity(command.sender_id)
@@ -70,11 +166,18 @@ class Coordinator:
         if command.raw_text.upper().startswith("APPROVE "):
             req_id = command.raw_text.split(" ")[1].strip()
             if self.approval_service.approve_request(req_id):
-                self._resume_execution(req_id)
+                self._resume_execution(req_id, cancel)
+            return
+
+        if Config.STREAM_PLANS:
+            self._stream_and_execute(command, identity, cancel)
             return
 
         # 1. PLAN
-        plan = self.planner.create_plan(command.raw_text)
+        plan = self.planner.create_plan(command.raw_text, cancel=cancel)
+        if cancel.is_set():
+            self._notify_cancelled(command, cancel, 0)
+            return
         if not plan:
             self._notify_user(command, "Could not generate a plan.")
             return
@@ -94,58 +197,249 @@ class Coordinator:
             return
 
         # 3. ACT (If Allowed)
-        self._execute_plan(plan, command)
+        if self._execute_plan(plan, command, cancel):
+            self.planner.remember_plan(command.raw_text, plan)
 
-    def _resume_execution(self, request_id: str):
+    def _resume_execution(self, request_id: str, cancel: CancellationToken = None):
         req = self.approval_service.get_request(request_id)
         if req:
             self._notify_user(req.command, f"Request {request_id} Approved. Executing...")
-            self._execute_plan(req.plan, req.command)
+            if self._execute_plan(req.plan, req.command, cancel):
+                self.planner.remember_plan(req.command.raw_text, req.plan)
 
-    def _execute_plan(self, plan, command):
-        logger.info("Starting Execution Loop...")
-        for i, step in enumerate(plan):
-            logger.info(f"--- Step {i+1}: {step.description} ---")
-            
-            # Observe
-            screen_path = self.vision.capture_screen()
-            target_loc = None
-            if step.target_element:
-                res = self.vision.detect_element(screen_path, step.target_element)
-                target_loc = res.data
-            
-            # Special: ANSWER/RAG
-            if step.action_type == "ANSWER":
-                ans = self.attribution.answer_question(command.raw_text)
-                self._notify_user(command, f"💡 **Answer**: {ans}")
-                self.audit_logger.log_action(command.sender_id, "ANSWER", "RAG", "SUCCESS", "Answered")
-                continue
+    def _stream_and_execute(self, command: UserCommand, identity, cancel: CancellationToken = None):
+        """
+        Early dispatch: each step is policy-checked and run as soon as the
+        planner finishes streaming it, while later steps are still being
+        generated. Steps already run stay run if a later one is denied or
+        needs approval; the remainder is withheld (or queued for approval).
+        """
+        logger.info("Starting Streaming Execution Loop...")
+        cancel = cancel or CancellationToken(Config.PLAN_TIMEOUT)
+        outcome: Dict[str, bool] = {}
+        steps = self.planner.stream_plan(command.raw_text, stop_event=cancel, outcome=outcome)
+        frames = FrameProvider(self.vision.capture_frame)
+        desktop = DesktopRun(self.lease, f"{command.sender_id}:{command.message_id}")
+        try:
+            self._run_stream(steps, outcome, command, identity, frames, desktop, cancel)
+        finally:
+            desktop.release()
 
-            # Act
-            res = self.action.execute(step, context=target_loc)
-            
-            # AUDIT LOG
-            status = "SUCCESS" if res.success else "FAILURE"
-            self.audit_logger.log_action(
-                user_id=command.sender_id,
-                action_type=step.action_type,
-                action_value=str(step.value or step.target_element),
-                status=status,
-                result=res.message
-            )
-
-            if not res.success:
-                logger.error(f"Action failed: {res.message}")
-                self._notify_user(command, f"Step failed: {step.description}")
+    def _run_stream(self, steps, outcome: Dict[str, bool], command: UserCommand, identity,
+                    frames: FrameProvider, desktop: DesktopRun, cancel: CancellationToken):
+        done = []
+        count = 0
+
+        for step in steps:
+            if cancel.is_set():
                 break
+            if not needs_desktop(step.action_type):
+                # The next desktop step may be a while off; let others use the desktop meanwhile
+                desktop.release()
+
+            # 2. PROPOSE (Policy Check, per step)
+            decision = PolicyEngine.evaluate_plan(identity, [step])
+
+            if decision == Decision.DENY:
+                steps.close()
+                logger.info(f"Policy Decision: {decision} at step {count + 1}")
+                self._notify_user(command, f"Access Denied by Policy at step: {step.description}")
+                return
+
+            if decision == Decision.REQUIRE_APPROVAL:
+                desktop.release()
+                remaining = [step] + list(steps)
+                req_id = self.approval_service.create_request(command, identity, remaining)
+                self._notify_user(
+                    command,
+                    f"⚠️ Approval Required for the remaining {len(remaining)} steps ({count} already done). "
+                    f"Reply with 'APPROVE {req_id}' to proceed."
+                )
+                return
+
+            # 3. ACT
+            count += 1
+            if not self._execute_step(count, step, command, frames, cancel=cancel, desktop=desktop):
+                steps.close()
+                frames.report()
+                if cancel.is_set():
+                    self._notify_cancelled(command, cancel, count - 1)
+                else:
+                    self._notify_user(command, f"Step failed: {step.description}")
+                return
+            done.append(step)
+
+        frames.report()
+        if cancel.is_set():
+            steps.close()
+            self._notify_cancelled(command, cancel, count)
+            return
+        if count == 0:
+            self._notify_user(command, "Could not generate a plan.")
+            return
+        if outcome.get("complete"):
+            self.planner.remember_plan(command.raw_text, done)
+        self._notify_user(command, "Job Complete.")
 
-            # Verify (Mock)
-            self.verifier.verify(step, None, None)
+    def _execute_plan(self, plan, command, cancel: CancellationToken = None) -> bool:
+        """Runs the plan step by step; True if every step succeeded."""
+        logger.info("Starting Execution Loop...")
+        cancel = cancel or CancellationToken(Config.PLAN_TIMEOUT)
+        frames = FrameProvider(self.vision.capture_frame)
+        targets = [step.target_element for step in plan if FrameProvider.needs_pixels(step)]
+        # The desktop stays ours from the plan's first desktop step through its last
+        last_desktop = max((i for i, step in enumerate(plan) if needs_desktop(step.action_type)), default=-1)
+        desktop = DesktopRun(self.lease, f"{command.sender_id}:{command.message_id}")
+        try:
+            for i, step in enumerate(plan):
+                if FrameProvider.needs_pixels(step):
+                    targets.pop(0)
+                if cancel.is_set() or not self._execute_step(i + 1, step, command, frames, upcoming=targets,
+                                                             cancel=cancel, desktop=desktop):
+                    frames.report()
+                    if cancel.is_set():
+                        self._notify_cancelled(command, cancel, i)
+                    else:
+                        self._notify_user(command, f"Step failed: {step.description}")
+                    return False
+                if i >= last_desktop:
+                    desktop.release()
+        finally:
+            desktop.release()
         
+        frames.report()
         self._notify_user(command, "Job Complete.")
+        return True
+
+    def _locate(self, step, frames: FrameProvider, upcoming: List[str],
+                cancel: CancellationToken = None) -> Optional[Dict[str, Any]]:
+        """
+        Detects the step's target together with the targets of later steps in
+        one vision call. Later steps reuse those locations while the frame is
+        fresh; after an action the plan's sightings revalidate each one and
+        only the elements whose surroundings changed are asked for again.
+        """
+        if step.target_element not in frames.locations:
+            frames.recall([step.target_element] + upcoming)
+        if step.target_element not in frames.locations:
+            wanted = [step.target_element] + [t for t in upcoming if t not in frames.locations]
+            found = self.vision.detect_elements(frames.get(), wanted, cancel=cancel)
+            if cancel is not None and cancel.is_set():
+                return None  # Failures from a cut-off call say nothing about the screen
+            frames.found(found)
+        return frames.locations[step.target_element].data
+
+    def _execute_step(self, number: int, step, command: UserCommand, frames: FrameProvider,
+                      upcoming: Optional[List[str]] = None, cancel: CancellationToken = None,
+                      desktop: Optional[DesktopRun] = None) -> bool:
+        logger.info(f"--- Step {number}: {step.description} ---")
+        step_cancel = (cancel or CancellationToken()).child(Config.STEP_TIMEOUT)
+        try:
+            if not needs_desktop(step.action_type):
+                return self._run_step(step, command, frames, upcoming, step_cancel)
+
+            # Locate, act and verify as one unit on the shared desktop
+            if desktop is None:
+                with self.lease.hold(f"{command.sender_id}:{command.message_id}", cancel=step_cancel) as interrupted:
+                    if interrupted:
+                        frames.invalidate()
+                    return self._run_step(step, command, frames, upcoming, step_cancel)
+
+            interrupted = desktop.acquire(step_cancel)
+            if interrupted:
+                # Someone else's steps ran since our last frame
+                frames.invalidate()
+                if desktop.used and step.action_type != "OPEN_APP":
+                    # Focus may have moved to their window; typing on now could land there
+                    logger.warning(f"Step {number} failed: the desktop was used by another command mid-plan")
+                    return False
+            desktop.used = True
+            return self._run_step(step, command, frames, upcoming, step_cancel)
+        except Cancelled:
+            return False
+        finally:
+            if step_cancel.reason == "deadline" and not (cancel and cancel.is_set()):
+                self.metrics.incr("cancel.step_deadline")
+                logger.warning(f"Step {number} ran into its {Config.STEP_TIMEOUT:.0f}s deadline")
+
+    def _run_step(self, step, command: UserCommand, frames: FrameProvider,
+                  upcoming: Optional[List[str]], cancel: CancellationToken = None) -> bool:
+        # Observe (only steps that look at the screen pay for a capture)
+        target_loc = None
+        if FrameProvider.needs_pixels(step):
+            target_loc = self._locate(step, frames, upcoming or [], cancel)
+        if cancel is not None and cancel.is_set():
+            return False
+        
+        # Special: ANSWER/RAG
+        if step.action_type == "ANSWER":
+            ans = self.attribution.answer_question(command.raw_text, cancel=cancel)
+            if cancel is not None and cancel.is_set():
+                return False
+            self._notify_user(command, f"💡 **Answer**: {ans}")
+            self.audit_logger.log_action(command.sender_id, "ANSWER", "RAG", "SUCCESS", "Answered")
+            return True
+
+        # Act (steps that get verified need a before frame)
+        verify = self._should_verify(step)
+        pre_frame = frames.get() if verify else frames.peek()
+        res = self.action.execute(step, context=target_loc, cancel=cancel)
+        frames.after_action(step)
+        
+        # AUDIT LOG
+        status = "SUCCESS" if res.success else "FAILURE"
+        self.audit_logger.log_action(
+            user_id=command.sender_id,
+            action_type=step.action_type,
+            action_value=str(step.value or step.target_element),
+            status=status,
+            result=res.message
+        )
+
+        if not res.success:
+            if cancel is None or not cancel.is_set():
+                logger.error(f"Action failed: {res.message}")
+                self._refute(step, frames, target_loc)
+            return False
+
+        # Verify: wait for the UI to settle, then diff against the before frame
+        if verify:
+            settled = self.verifier.wait_for_settle(pre_frame, cancel=cancel)
+            if cancel is not None and cancel.is_set():
+                return False
+            frames.put(settled.frame)
+            check = self.verifier.verify(step, pre_frame, settled.frame)
+            if check.success and target_loc:
+                # Only now is the location known to be right
+                self.vision.confirm(pre_frame, step.target_element, (target_loc["x"], target_loc["y"]))
+            if not check.success:
+                self._refute(step, frames, target_loc)
+                if Config.VERIFY_STRICT:
+                    logger.error(f"Verification failed: {check.message}")
+                    return False
+                logger.warning(f"Verification failed, continuing: {check.message}")
+        return True
+
+    def _refute(self, step, frames: FrameProvider, target_loc: Optional[Dict[str, Any]]):
+        if target_loc:
+            frames.refute(step.target_element)
+            self.vision.forget(step.target_element)
+
+    @staticmethod
+    def _should_verify(step) -> bool:
+        return Config.VERIFY_ACTIONS and step.action_type.upper() in EXPECTS_CHANGE
+
+    def _notify_cancelled(self, command: UserCommand, cancel: CancellationToken, done: int):
+        self.metrics.incr(f"cancel.{cancel.reason}")
+        if cancel.reason == "deadline":
+            self._notify_user(command, f"⌛ Timed out after {done} step(s) ({Config.PLAN_TIMEOUT:.0f}s limit).")
+        else:
+            self._notify_user(command, f"⏹ Stopped after {done} step(s).")
 
     def _notify_user(self, command: UserCommand, message: str):
-        if self.adapter_callback:
+        if self.reply_callback:
+            self.reply_callback(command, message)
+        elif self.adapter_callback:
             self.adapter_callback(command.sender_id, message)
         else:
             logger.info(f"[OUTGOING -> {command.sender_id}] {message}")
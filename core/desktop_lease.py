@@ -0,0 +1,180 @@
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager, ExitStack
+from typing import Optional
+from .config import Config
+from .metrics import Metrics
+from .cancellation import CancellationToken, Cancelled
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# Steps that drive the physical mouse/keyboard or depend on what's on screen
+DESKTOP_ACTIONS = {"CLICK", "TYPE", "PRESS", "OPEN_APP"}
+
+def needs_desktop(action_type: str) -> bool:
+    return action_type.upper() in DESKTOP_ACTIONS
+
+class DesktopLease:
+    """
+    Exclusive, re-entrant claim on the physical desktop. There is one mouse
+    and one keyboard, so steps from different commands that use them run one
+    at a time; everything else (planning, RAG answers, shell and file steps)
+    runs in parallel.
+
+    With worker processes, the outermost hold also takes an exclusive lock on
+    DESKTOP_LOCK_FILE, which records the last holder so interruptions by
+    other processes are noticed too.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, lock_path: str = None):
+        self.lock_path = lock_path if lock_path is not None else (
+            Config.DESKTOP_LOCK_FILE if Config.WORKER_PROCESSES else None
+        )
+        self._lease = threading.RLock()
+        self._state_lock = threading.Lock()
+        self.holder: Optional[str] = None
+        self._last_holder: Optional[str] = None
+        self.metrics = Metrics.get_instance()
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = DesktopLease()
+        return cls._instance
+
+    @staticmethod
+    def _try_lock_file(fd: int, blocking: bool) -> bool:
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def _lock_file(self, cancel: Optional[CancellationToken]) -> int:
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            while not self._try_lock_file(fd, blocking=cancel is None and fcntl is not None):
+                if cancel is not None and cancel.is_set():
+                    raise Cancelled(cancel.reason)
+                time.sleep(0.01)
+        except BaseException:
+            os.close(fd)
+            raise
+        return fd
+
+    def _acquire(self, cancel: Optional[CancellationToken]):
+        if cancel is None:
+            self._lease.acquire()
+            return
+        while not self._lease.acquire(timeout=0.05):
+            if cancel.is_set():
+                raise Cancelled(cancel.reason)
+
+    def _unlock_file(self, fd: int, owner: str):
+        try:
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            # Byte 0 is the msvcrt lock region, so the holder goes after it
+            os.write(fd, b" " + owner.encode())
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _file_holder(fd: int) -> Optional[str]:
+        os.lseek(fd, 0, os.SEEK_SET)
+        return os.read(fd, 4096).decode(errors="replace").strip() or None
+
+    @contextmanager
+    def hold(self, owner: str, cancel: Optional[CancellationToken] = None):
+        """
+        Holds the desktop for the block. Yields True if someone else used it
+        since owner last did, i.e. any frame owner captured before is stale.
+        With cancel, waiting for the lease raises Cancelled once it is set.
+        """
+        start = time.perf_counter()
+        self._acquire(cancel)
+        waited = (time.perf_counter() - start) * 1000
+
+        with self._state_lock:
+            outer = self.holder is None
+            if outer:
+                self.holder = owner
+
+        fd = None
+        if outer and self.lock_path:
+            try:
+                fd = self._lock_file(cancel)
+            except BaseException:
+                with self._state_lock:
+                    self.holder = None
+                self._lease.release()
+                raise
+            self._last_holder = self._file_holder(fd) or self._last_holder
+            waited = (time.perf_counter() - start) * 1000
+        interrupted = outer and self._last_holder not in (None, owner)
+        if interrupted:
+            logger.debug(f"Desktop was used by {self._last_holder} since {owner} last held it")
+        self.metrics.histogram("desktop_lease.wait_ms", waited)
+
+        held_from = time.perf_counter()
+        try:
+            yield interrupted
+        finally:
+            if fd is not None:
+                self._unlock_file(fd, owner)
+            with self._state_lock:
+                if outer:
+                    self._last_holder = owner
+                    self.holder = None
+            if outer:
+                self.metrics.histogram("desktop_lease.hold_ms", (time.perf_counter() - held_from) * 1000)
+                if cancel is not None and cancel.reason == "stop" and cancel.cancelled_at:
+                    self.metrics.histogram("cancel.lease_release_ms", (time.time() - cancel.cancelled_at) * 1000)
+            self._lease.release()
+
+
+class DesktopRun:
+    """
+    Keeps a DesktopLease across a run of one plan's desktop steps, so another
+    command cannot move focus between, say, OPEN_APP and the TYPE after it.
+    acquire() is a no-op while the run already holds the lease.
+    """
+
+    def __init__(self, lease: DesktopLease, owner: str):
+        self.lease = lease
+        self.owner = owner
+        self.used = False  # A desktop step of this plan has run
+        self._stack: Optional[ExitStack] = None
+
+    def acquire(self, cancel: Optional[CancellationToken] = None) -> bool:
+        """Takes the lease if not held yet; True if someone else used the desktop meanwhile."""
+        if self._stack is not None:
+            return False
+        stack = ExitStack()
+        interrupted = stack.enter_context(self.lease.hold(self.owner, cancel=cancel))
+        self._stack = stack
+        return interrupted
+
+    def release(self):
+        if self._stack is not None:
+            stack, self._stack = self._stack, None
+            stack.close()
@@ -1,6 +1,11 @@
 import logging
 from abc import ABC, abstractmethod
 from .queue_mgr import CommandQueue
+from .model_manager import ModelManager, models_for
+from .admission import AdmissionController, Admission
+from .outbox import OutboxRelay
+from .cancellation import is_stop, handle_stop
+from .config import Config
 from .types import UserCommand
 
 logger = logging.getLogger(__name__)
@@ -9,6 +14,12 @@ class BaseGateway(ABC):
     def __init__(self, name: str):
         self.name = name
         self.queue = CommandQueue.get_instance()
+        self.models = ModelManager.get_instance()
+        self.admission = AdmissionController.get_instance()
+        # Coordinators in worker processes reply through the outbox
+        self.outbox_relay = OutboxRelay(self.send_message, name.lower()) if Config.WORKER_PROCESSES else None
+        if self.outbox_relay:
+            self.outbox_relay.start()
     
     @abstractmethod
     def start(self):
@@ -20,6 +31,33 @@ class BaseGateway(ABC):
         """Send a message out."""
         pass
 
-    def push_command(self, cmd: UserCommand):
-        """Standard way to push to Brain."""
-        self.queue.add_command(cmd)
+    def is_ready(self, cmd: UserCommand = None) -> bool:
+        """Whether the models the command needs (default: all) are past warm-up."""
+        return self.models.is_ready(models_for(cmd) if cmd else None)
+
+    def push_command(self, cmd: UserCommand) -> bool:
+        """
+        Standard way to push to Brain. Refuses commands while a model they
+        need is still loading, and anything the admission layer turns away.
+        STOP never queues: it cancels the sender's work right away.
+        """
+        if is_stop(cmd.raw_text):
+            self.send_message(cmd.sender_id, handle_stop(cmd, self.queue))
+            return False
+
+        ready, failed = self.models.check(models_for(cmd))
+        if not ready:
+            logger.info(f"Not ready, refusing command from {cmd.sender_id}")
+            self.send_message(cmd.sender_id, "⏳ Still loading models, please try again in a moment.")
+            return False
+
+        decision = self.admission.admit(cmd)
+        if decision != Admission.ACCEPT:
+            reply = self.admission.reply_for(decision)
+            if reply:
+                self.send_message(cmd.sender_id, reply)
+            return False
+        self.queue.put(cmd)
+        if failed:
+            self.send_message(cmd.sender_id, f"⚠️ Could not load {', '.join(failed)}; this may be slow or fail.")
+        return True
@@ -1,7 +1,9 @@
+import threading
 from enum import Enum
-from typing import Dict, Optional
+from typing import Optional
 from pydantic import BaseModel
 from .config import Config
+from .shared_state import connect
 
 class Role(str, Enum):
     ADMIN = "ADMIN"        # Full access
@@ -17,12 +19,32 @@ class UserIdentity(BaseModel):
 class IdentityManager:
     _instance = None
     
-    def __init__(self):
+    def __init__(self, db_path: str = None):
         # Mock "Entra ID" - In prod this would query an AD/LDAP service
-        # For PoC, we map config ALLOWED_USERS to ADMIN
-        self.user_db: Dict[str, Role] = {}
-        for uid in Config.ALLOWED_USERS:
-            self.user_db[uid] = Role.ADMIN
+        # For PoC, we map config ALLOWED_USERS to ADMIN. Roles live in STATE_DB
+        # so a change made in one worker process is seen by all of them; the
+        # allow-list stays the source of truth for who has an identity at all.
+        self._db = connect(db_path)
+        self._lock = threading.Lock()
+        self._sync(Config.ALLOWED_USERS)
+
+    def _sync(self, allowed: list):
+        """Adds allow-listed users as ADMIN (keeping a role set since) and drops everyone else."""
+        with self._lock:
+            self._db.execute("CREATE TABLE IF NOT EXISTS identities (user_id TEXT PRIMARY KEY, role TEXT NOT NULL)")
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    f"DELETE FROM identities WHERE user_id NOT IN ({','.join('?' * len(allowed))})", allowed
+                )
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO identities (user_id, role) VALUES (?, ?)",
+                    [(uid, Role.ADMIN.value) for uid in allowed]
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
 
     @classmethod
     def get_instance(cls):
@@ -31,7 +53,12 @@ class IdentityManager:
         return cls._instance
 
     def get_identity(self, user_id: str) -> Optional[UserIdentity]:
-        role = self.user_db.get(user_id)
-        if role:
-            return UserIdentity(user_id=user_id, role=role)
+        with self._lock:
+            row = self._db.execute("SELECT role FROM identities WHERE user_id = ?", (user_id,)).fetchone()
+        if row:
+            return UserIdentity(user_id=user_id, role=Role(row[0]))
         return None  # Unknown user
+
+    def set_role(self, user_id: str, role: Role):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO identities (user_id, role) VALUES (?, ?)", (user_id, role.value))
@@ -1,36 +1,290 @@
+import re
+import time
 import logging
+import threading
 import json
-from typing import Literal
+from typing import Literal, Optional, Tuple, Dict, List
 from ..core.llm import OllamaClient
+from .config import Config
+from .metrics import Metrics
+from .cancellation import CancellationToken
 
 logger = logging.getLogger(__name__)
 
 IntentType = Literal["CHAT", "TASK", "QUERY"]
 
+# Tier 1 lexicons
+_LEAD_IN = r"^(?:(?:please|pls|kindly|hey|ok|okay)[,\s]+)*(?:(?:can|could|would|will) you\s+)?(?:please\s+)?"
+
+_DETERMINERS = r"(?:(?:the|a|an|my|our|your|this|that|these|those|new|all|some)\s+)*"
+
+# Verbs that mean a desktop action whatever follows
+TASK_VERBS = [
+    "launch", "execute", "click", "double click", "rename",
+    "go to", "browse", "navigate", "scroll", "minimize", "maximize",
+    "reboot", "shut down", "shutdown", "speak", "render", "take a screenshot", "brief me",
+    "run daily briefing",
+]
+
+# Verbs that are just as common in conversation ("make me laugh", "copy that",
+# "start over") or that lead a noun phrase ("type of leave", "press release",
+# "open source", "delete key"); they only count as a task with a recognisable object
+OBJECT_VERBS = [
+    "open", "type", "press", "google", "delete", "download", "install", "start", "run", "close", "quit", "hit", "write", "save",
+    "create", "make", "remove", "move", "copy", "search", "send", "play", "say", "read out",
+    "restart", "visit",
+]
+
+TASK_OBJECTS = [
+    "app", "application", "program", "file", "files", "folder", "directory", "window", "windows",
+    "tab", "browser", "document", "note", "email", "mail", "message", "song", "music", "video",
+    "playlist", "screenshot", "command", "script", "briefing", "dashboard", "page", "computer", "pc",
+    "chrome", "firefox", "edge", "notepad", "calculator", "terminal", "spotify", "vscode",
+    "enter", "return", "escape", "esc", "space", "backspace", "ctrl", "alt", "shift", "button",
+]
+
+# Document nouns only: verbs like "says" also turn up in plain questions ("who says so?")
+KB_CUES = [
+    "policy", "policies", "document", "documents", "doc", "docs", "pdf", "report", "manual",
+    "handbook", "contract", "guideline", "guidelines", "procedure", "knowledge base", "kb",
+    "section", "clause", "according to",
+]
+
+CHAT_PATTERN = re.compile(
+    r"^(?:hi|hello|hey|yo|hiya|howdy|good (?:morning|afternoon|evening|night)|thanks|thank you|thx|"
+    r"ok|okay|cool|nice|great|bye|goodbye|see you|lol)(?:\s+(?:there|again|so much|\w+))?[\s!.,?]*$",
+    re.IGNORECASE
+)
+SELF_PATTERN = re.compile(
+    r"\b(?:who are you|what are you|your name|how are you|about yourself|what can you do)\b",
+    re.IGNORECASE
+)
+TASK_PATTERN = re.compile(
+    _LEAD_IN + r"(?:" + "|".join(re.escape(v) for v in sorted(TASK_VERBS, key=len, reverse=True)) + r")\b",
+    re.IGNORECASE
+)
+_OBJECT_VERB = r"(?:" + "|".join(re.escape(v) for v in sorted(OBJECT_VERBS, key=len, reverse=True)) + r")\b"
+OBJECT_VERB_PATTERN = re.compile(_LEAD_IN + _OBJECT_VERB, re.IGNORECASE)
+# ... followed by a known object, a quoted string, a path, a file or domain name, or "for <something>"
+OBJECT_TASK_PATTERN = re.compile(
+    _LEAD_IN + _OBJECT_VERB + r"\s+" + _DETERMINERS +
+    r"(?:(?:" + "|".join(re.escape(o) for o in TASK_OBJECTS) + r")\b|[\"'/\\~]|for\s+\w|\S+\.[a-z]{2,4}\b)",
+    re.IGNORECASE
+)
+QUESTION_PATTERN = re.compile(
+    _LEAD_IN + r"(?:what|who|when|where|why|how|which|is|are|does|do|summari[sz]e|explain|describe|"
+    r"tell me about|look up|find out)\b|\?\s*$",
+    re.IGNORECASE
+)
+KB_PATTERN = re.compile(
+    r"\b(?:" + "|".join(re.escape(c) for c in KB_CUES) + r")\b",
+    re.IGNORECASE
+)
+
+# Tier 2 seed examples, averaged into one centroid per intent
+SEED_EXAMPLES: Dict[str, List[str]] = {
+    "CHAT": [
+        "hi", "hello there", "how are you doing today", "who are you", "thanks a lot",
+        "good morning", "tell me a joke", "what's your name",
+    ],
+    "TASK": [
+        "open chrome and search for cats", "type hello world in notepad", "delete the temp file",
+        "click the submit button", "launch calculator", "run the daily briefing",
+        "go to github.com", "write a note to todo.txt",
+    ],
+    "QUERY": [
+        "what does the travel policy say about per diem", "summarize the onboarding pdf",
+        "what is the refund period in the contract", "explain section 4 of the handbook",
+        "who approves expense reports according to the manual", "find the vacation rules in the docs",
+        "what are the security guidelines", "how many sick days does the policy allow",
+    ],
+}
+
+
+class RuleIntentClassifier:
+    """
+    Tier 1: compiled regexes and a verb lexicon. Microseconds per call, and
+    confident only on messages with an unmistakable shape.
+    """
+
+    def classify(self, text: str) -> Tuple[IntentType, float]:
+        text = text.strip()
+        scores: Dict[str, float] = {"CHAT": 0.0, "TASK": 0.0, "QUERY": 0.0}
+
+        if CHAT_PATTERN.match(text) or SELF_PATTERN.search(text):
+            scores["CHAT"] = 0.95
+        if TASK_PATTERN.match(text) or OBJECT_TASK_PATTERN.match(text):
+            scores["TASK"] = 0.9
+        elif OBJECT_VERB_PATTERN.match(text):
+            # Could be a task, could be "make me laugh": leave it to the next tier
+            scores["TASK"] = 0.6
+        if QUESTION_PATTERN.search(text):
+            # A question about documents is a lookup; a bare question could be small talk
+            scores["QUERY"] = 0.9 if KB_PATTERN.search(text) else 0.5
+
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+        (best, best_score), (_, second_score) = ranked[0], ranked[1]
+        if best_score == 0.0:
+            return "CHAT", 0.0
+        if second_score >= 0.8:
+            # Two strong signals disagree (e.g. "can you open the policy pdf?")
+            return best, 0.5
+        return best, best_score
+
+
+class EmbeddingIntentClassifier:
+    """
+    Tier 2: nearest centroid over a small local sentence embedding model.
+    The model is loaded lazily; if sentence-transformers is unavailable or
+    the model fails to load, the tier reports itself disabled and is skipped.
+    """
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+        self.model_name = model_name
+        self._model = None
+        self._centroids = None
+        self._disabled = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> bool:
+        with self._lock:
+            if self._model is not None or self._disabled:
+                return not self._disabled
+            try:
+                import numpy as np
+                from sentence_transformers import SentenceTransformer
+            except ImportError:
+                logger.warning("sentence-transformers not installed; embedding intent tier disabled.")
+                self._disabled = True
+                return False
+
+            try:
+                model = SentenceTransformer(self.model_name)
+                centroids = {}
+                for intent, examples in SEED_EXAMPLES.items():
+                    vectors = model.encode(examples, normalize_embeddings=True)
+                    centroid = vectors.mean(axis=0)
+                    centroids[intent] = centroid / np.linalg.norm(centroid)
+            except Exception as e:
+                # e.g. the model can't be downloaded; the other tiers still work
+                logger.warning(f"Could not load embedding model {self.model_name}; embedding intent tier disabled: {e}")
+                self._disabled = True
+                return False
+            self._centroids = centroids
+            self._model = model
+            return True
+
+    def classify(self, text: str) -> Optional[Tuple[IntentType, float]]:
+        """Returns (intent, margin between best and runner-up similarity)."""
+        if not self._load():
+            return None
+        try:
+            vector = self._model.encode([text], normalize_embeddings=True)[0]
+        except Exception as e:
+            logger.warning(f"Embedding intent tier failed: {e}")
+            return None
+        sims = sorted(
+            ((intent, float(vector @ centroid)) for intent, centroid in self._centroids.items()),
+            key=lambda kv: kv[1], reverse=True
+        )
+        return sims[0][0], sims[0][1] - sims[1][1]
+
+
 class IntentParser:
-    def __init__(self, model: str = "llama3.2"):
-        self.llm = OllamaClient()
+    """
+    Tiered classifier: rules, then (optionally) embeddings, then the LLM.
+    Each tier only answers when it is confident; hit counts and latency are
+    recorded per tier under intent.<tier>.*.
+    """
+    TIERS = ("rules", "embedding", "llm")
+
+    def __init__(self, model: str = "llama3.2", use_embeddings: bool = None):
+        self.llm = OllamaClient.get_instance()
         self.model = model
+        self.metrics = Metrics.get_instance()
+        self.rules = RuleIntentClassifier()
+        use_embeddings = Config.INTENT_EMBEDDINGS if use_embeddings is None else use_embeddings
+        self.embeddings = EmbeddingIntentClassifier() if use_embeddings else None
 
-    def parse(self, text: str) -> IntentType:
-        """
-        Classifies the user input into CHAT, TASK, or QUERY.
-        """
-        prompt = f"""
+    def _build_prompt(self, text: str) -> str:
+        return f"""
         Classify the following message into one of these categories:
         - TASK: Requires performing actions on the computer (e.g. "Open Chrome", "Type hello", "Delete file").
         - QUERY: Requires looking up information from Knowledge Base (e.g. "What is in the policy?", "Summarize this PDF").
         - CHAT: General conversation, greeting, or question about yourself (e.g. "Hi", "Who are you?").
-        
+
         Message: "{text}"
-        
+
         Return ONLY the category name.
         """
-        
-        response = self.llm.generate(prompt, model=self.model, system="")
+
+    def _record(self, tier: str, start: float):
+        self.metrics.incr(f"intent.{tier}.hit")
+        self.metrics.observe(f"intent.{tier}.ms", (time.perf_counter() - start) * 1000)
+
+    def fast_path(self, text: str) -> Optional[Tuple[IntentType, str]]:
+        """
+        Runs only the cheap tiers. Returns (intent, tier) or None if the LLM is needed.
+        """
+        start = time.perf_counter()
+        intent, confidence = self.rules.classify(text)
+        if confidence >= Config.INTENT_RULE_THRESHOLD:
+            self._record("rules", start)
+            return intent, "rules"
+
+        if self.embeddings:
+            start = time.perf_counter()
+            result = self.embeddings.classify(text)
+            if result and result[1] >= Config.INTENT_EMBED_MARGIN:
+                self._record("embedding", start)
+                return result[0], "embedding"
+        return None
+
+    def classify(self, text: str) -> Tuple[IntentType, str]:
+        """
+        Returns (intent, tier that decided it).
+        """
+        fast = self.fast_path(text)
+        if fast:
+            return fast
+        return self.llm_parse(text), "llm"
+
+    def llm_parse(self, text: str, cancel: CancellationToken = None) -> IntentType:
+        """
+        Last tier on its own, for callers that already ran fast_path.
+        """
+        start = time.perf_counter()
+        response = self.llm.generate(self._build_prompt(text), model=self.model, system="", cancel=cancel)
+        self._record("llm", start)
+        return self._classify(response)
+
+    def parse(self, text: str) -> IntentType:
+        """
+        Classifies the user input into CHAT, TASK, or QUERY.
+        """
+        intent, tier = self.classify(text)
+        logger.debug(f"Intent {intent} decided by {tier} tier")
+        return intent
+
+    def tier_stats(self) -> Dict[str, Dict[str, float]]:
+        """Hit rate and mean latency per tier."""
+        snapshot = self.metrics.snapshot()
+        hits = {tier: snapshot["counters"].get(f"intent.{tier}.hit", 0) for tier in self.TIERS}
+        total = sum(hits.values()) or 1
+        stats = {}
+        for tier in self.TIERS:
+            timing = snapshot["observations"].get(f"intent.{tier}.ms", {})
+            stats[tier] = {
+                "hits": hits[tier],
+                "hit_rate": hits[tier] / total,
+                "avg_ms": timing.get("avg", 0.0)
+            }
+        return stats
+
+    def _classify(self, response: str) -> IntentType:
         if not response:
             return "CHAT" # Default
-            
+
         cleaned = response.strip().upper()
         if "TASK" in cleaned:
             return "TASK"
@@ -1,41 +1,228 @@
 import requests
 import json
+import time
 import logging
-from typing import Optional, Dict, Any
+import threading
+from typing import Optional, Dict, Any, Iterator, Set
+from requests.adapters import HTTPAdapter
+from .config import Config
+from .llm_cache import ResponseCache
+from .metrics import Metrics
+from .singleflight import SingleFlight
+from .cancellation import CancellationToken
 
 logger = logging.getLogger(__name__)
 
+def _build_payload(prompt: str, model: str, system: str, images: list, stream: bool,
+                   options: Dict[str, Any] = None) -> Dict[str, Any]:
+    payload = {
+        "model": model,
+        "prompt": prompt,
+        "stream": stream,
+        "format": "json"  # Force JSON output mode if supported by model/Ollama version
+    }
+
+    if system:
+        payload["system"] = system
+
+    if images:
+        payload["images"] = images
+
+    if options:
+        payload["options"] = options
+
+    # Sent on every call so Ollama keeps honouring the configured residency
+    payload["keep_alive"] = Config.keep_alive_for(model)
+
+    return payload
+
+def _cache_key(payload: Dict[str, Any]) -> str:
+    return ResponseCache.make_key(
+        payload["model"], payload.get("system", ""), payload["prompt"],
+        payload.get("images"), {"format": payload["format"], **payload.get("options", {})}
+    )
+
+def _default_cache() -> Optional[ResponseCache]:
+    return ResponseCache.get_instance() if Config.LLM_CACHE_ENABLED else None
+
 class OllamaClient:
-    def __init__(self, base_url: str = "http://localhost:11434"):
-        self.base_url = base_url
-        self.generate_endpoint = f"{base_url}/api/generate"
+    """
+    Shared HTTP client for the local Ollama instance.
+    Holds one keep-alive session so agents reuse pooled connections
+    instead of paying TCP setup on every call.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, base_url: str = None, pool_size: int = None,
+                 endpoint_pools: Dict[str, int] = None, timeout: float = None,
+                 cache: Optional[ResponseCache] = None):
+        self.base_url = (base_url or Config.OLLAMA_URL).rstrip("/")
+        self.generate_endpoint = f"{self.base_url}/api/generate"
+        self.timeout = timeout or Config.OLLAMA_TIMEOUT
+        self.cache = cache if cache is not None else _default_cache()
+        self.metrics = Metrics.get_instance()
+        self._inflight = SingleFlight("llm")
+        self.session = self._build_session(
+            pool_size or Config.OLLAMA_POOL_SIZE,
+            Config.OLLAMA_ENDPOINT_POOLS if endpoint_pools is None else endpoint_pools
+        )
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = OllamaClient()
+        return cls._instance
+
+    def _build_session(self, pool_size: int, endpoint_pools: Dict[str, int]) -> requests.Session:
+        session = requests.Session()
+        session.headers.update({"Connection": "keep-alive"})
+
+        # Default pool for every Ollama endpoint
+        session.mount(self.base_url, HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+
+        # requests picks the longest matching prefix, so these override the default
+        for endpoint, size in endpoint_pools.items():
+            session.mount(
+                f"{self.base_url}/api/{endpoint}",
+                HTTPAdapter(pool_connections=1, pool_maxsize=size)
+            )
+        return session
+
+    def close(self):
+        self.session.close()
+
+    def load_model(self, model: str, keep_alive: str = None) -> bool:
+        """
+        Loads a model into Ollama's memory without generating anything
+        (an empty prompt only triggers the load).
+        """
+        payload = {"model": model, "keep_alive": keep_alive or Config.keep_alive_for(model)}
+        try:
+            # Cold loads can take far longer than a normal completion
+            response = self.session.post(self.generate_endpoint, json=payload, timeout=max(self.timeout, 120))
+            response.raise_for_status()
+            return True
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Failed to load model {model}: {e}")
+            return False
 
-    def generate(self, prompt: str, model: str = "llama3.2", system: str = "", images: list = None) -> Optional[str]:
+    def loaded_models(self) -> Optional[Set[str]]:
+        """Names (with tag) of the models Ollama has in memory right now; None if it can't be asked."""
+        try:
+            # A status probe on the request path: don't wait on it like on a completion
+            response = self.session.get(f"{self.base_url}/api/ps", timeout=min(self.timeout, 2.0))
+            response.raise_for_status()
+            return {m.get("name", "") for m in response.json().get("models", [])}
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.warning(f"Could not list loaded models: {e}")
+            return None
+
+    def generate(self, prompt: str, model: str = "llama3.2", system: str = "", images: list = None,
+                 options: Dict[str, Any] = None, use_cache: bool = True,
+                 cancel: CancellationToken = None) -> Optional[str]:
         """
         Generates text using the local Ollama instance.
         Supports images for multimodal models (base64 encoded strings).
+        Identical requests are answered from the response cache unless use_cache is False,
+        and identical requests already in flight share one upstream call.
+        With cancel, the response is streamed so cancellation (or the token's
+        deadline) cuts it off between tokens; a cancelled call returns None.
         """
-        payload = {
-            "model": model,
-            "prompt": prompt,
-            "stream": False,
-            "format": "json"  # Force JSON output mode if supported by model/Ollama version
-        }
-        
-        if system:
-            payload["system"] = system
-            
-        if images:
-            payload["images"] = images
+        payload = _build_payload(prompt, model, system, images, stream=False, options=options)
+        key = _cache_key(payload)
+
+        if use_cache and self.cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
 
+        if cancel is not None:
+            return self._cancellable(prompt, model, system, images, options, key if use_cache else None, cancel)
+        return self._inflight.do(key, lambda: self._request(payload, key if use_cache else None))
+
+    def _cancellable(self, prompt: str, model: str, system: str, images: list, options: Optional[Dict[str, Any]],
+                     cache_key: Optional[str], cancel: CancellationToken) -> Optional[str]:
+        # Not shared through single-flight: one caller's cancellation must not cut off the others
+        self.metrics.incr("llm.upstream")
+        outcome: Dict[str, bool] = {}
+        text = "".join(self.generate_stream(prompt, model, system, images, stop_event=cancel, options=options,
+                                            outcome=outcome))
+        if cancel.is_set():
+            self.metrics.incr("llm.cancelled")
+            return None
+        if not outcome["complete"]:
+            # Cut off by a connection or server error: partial text is not an answer
+            return None
+        if cache_key and self.cache and text:
+            self.cache.put(cache_key, text)
+        return text
+
+    def _request(self, payload: Dict[str, Any], cache_key: Optional[str]) -> Optional[str]:
+        self.metrics.incr("llm.upstream")
         try:
-            response = requests.post(self.generate_endpoint, json=payload, timeout=30)
+            response = self.session.post(self.generate_endpoint, json=payload, timeout=self.timeout)
             response.raise_for_status()
             data = response.json()
-            return data.get("response", "")
+            text = data.get("response", "")
+            if cache_key and self.cache:
+                self.cache.put(cache_key, text)
+            return text
         except requests.exceptions.RequestException as e:
             logger.error(f"Ollama Connection Error: {e}")
             return None
         except json.JSONDecodeError as e:
             logger.error(f"Ollama Invalid Response: {e}")
             return None
+
+    def generate_stream(self, prompt: str, model: str = "llama3.2", system: str = "", images: list = None,
+                        stop_event: threading.Event = None, options: Dict[str, Any] = None,
+                        outcome: Dict[str, bool] = None) -> Iterator[str]:
+        """
+        Yields response fragments as Ollama's NDJSON chunks arrive.
+        Breaking out of the loop, closing the iterator or setting stop_event
+        (an Event or a CancellationToken) drops the connection, which also
+        stops generation on the Ollama side. Errors end the stream quietly;
+        outcome["complete"] tells afterwards whether Ollama finished it.
+        """
+        outcome = {} if outcome is None else outcome
+        outcome["complete"] = False
+        payload = _build_payload(prompt, model, system, images, stream=True, options=options)
+        start = time.perf_counter()
+        first_token = True
+        timeout = self.timeout
+        remaining = stop_event.remaining() if isinstance(stop_event, CancellationToken) else None
+        if remaining is not None:
+            # Don't sit in a read past the caller's deadline
+            timeout = max(0.1, min(timeout, remaining))
+
+        try:
+            with self.session.post(self.generate_endpoint, json=payload, timeout=timeout, stream=True) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if stop_event is not None and stop_event.is_set():
+                        logger.info("Ollama stream cancelled by caller.")
+                        return
+                    if not line:
+                        continue
+
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        logger.error(f"Ollama Stream Error: {chunk['error']}")
+                        return
+
+                    text = chunk.get("response", "")
+                    if text:
+                        if first_token:
+                            logger.debug(f"Ollama first token after {(time.perf_counter() - start) * 1000:.0f} ms")
+                            first_token = False
+                        yield text
+
+                    if chunk.get("done"):
+                        outcome["complete"] = True
+                        return
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Ollama Connection Error: {e}")
+        except json.JSONDecodeError as e:
+            logger.error(f"Ollama Invalid Stream Chunk: {e}")
@@ -0,0 +1,183 @@
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
+from .config import Config
+from .metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """
+    Content-addressed cache for LLM responses.
+    Tier 1 is an in-memory LRU, tier 2 an optional SQLite file that survives restarts.
+    Both tiers honour the same TTL; each is bounded by entry count.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, max_entries: int = None, ttl: float = None, db_path: str = None,
+                 db_max_entries: int = None):
+        self.max_entries = max_entries or Config.LLM_CACHE_SIZE
+        self.ttl = ttl if ttl is not None else Config.LLM_CACHE_TTL
+        self.db_max_entries = db_max_entries or Config.LLM_CACHE_DB_MAX_ENTRIES
+        self.metrics = Metrics.get_instance()
+
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()  # key -> (expires_at, response)
+        self._entries_lock = threading.Lock()
+
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._db_writes = 0
+        db_path = Config.LLM_CACHE_DB if db_path is None else db_path
+        if db_path:
+            self._init_db(db_path)
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = ResponseCache()
+        return cls._instance
+
+    def _init_db(self, db_path: str):
+        try:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute('''
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    response TEXT,
+                    expires_at REAL,
+                    accessed_at REAL
+                )
+            ''')
+            self._db.commit()
+            logger.info(f"LLM response cache persisted at {db_path}")
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open LLM cache DB, using memory only: {e}")
+            self._db = None
+
+    @staticmethod
+    def make_key(model: str, system: str, prompt: str, images: List[str] = None,
+                 options: Dict[str, Any] = None) -> str:
+        """
+        Hashes everything that influences the completion. Images are reduced to
+        their own digests first so multi-megabyte screenshots are not re-serialized.
+        """
+        image_hashes = [hashlib.sha256(img.encode("utf-8")).hexdigest() for img in images or []]
+        material = json.dumps(
+            [model, system or "", prompt, image_hashes, options or {}],
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+
+        with self._entries_lock:
+            entry = self._entries.get(key)
+            if entry:
+                expires_at, response = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.metrics.incr("llm_cache.hit")
+                    return response
+                del self._entries[key]
+                self.metrics.incr("llm_cache.expired")
+
+        response = self._db_get(key, now)
+        if response is not None:
+            self._remember(key, response, now)
+            self.metrics.incr("llm_cache.hit")
+            self.metrics.incr("llm_cache.hit_disk")
+            return response
+
+        self.metrics.incr("llm_cache.miss")
+        return None
+
+    def put(self, key: str, response: str):
+        if not response:
+            return  # Never cache failures
+        now = time.time()
+        self._remember(key, response, now)
+        self._db_put(key, response, now)
+
+    def _remember(self, key: str, response: str, now: float):
+        with self._entries_lock:
+            self._entries[key] = (now + self.ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.metrics.incr("llm_cache.evicted")
+
+    def _db_get(self, key: str, now: float) -> Optional[str]:
+        if not self._db:
+            return None
+        try:
+            with self._db_lock:
+                row = self._db.execute(
+                    'SELECT response, expires_at FROM llm_cache WHERE key = ?', (key,)
+                ).fetchone()
+                if not row:
+                    return None
+                if row[1] <= now:
+                    self._db.execute('DELETE FROM llm_cache WHERE key = ?', (key,))
+                    self._db.commit()
+                    return None
+                self._db.execute('UPDATE llm_cache SET accessed_at = ? WHERE key = ?', (now, key))
+                self._db.commit()
+                return row[0]
+        except sqlite3.Error as e:
+            logger.error(f"LLM cache read failed: {e}")
+            return None
+
+    def _db_put(self, key: str, response: str, now: float):
+        if not self._db:
+            return
+        try:
+            with self._db_lock:
+                self._db.execute('''
+                    INSERT INTO llm_cache (key, response, expires_at, accessed_at)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(key) DO UPDATE SET
+                        response=excluded.response,
+                        expires_at=excluded.expires_at,
+                        accessed_at=excluded.accessed_at
+                ''', (key, response, now + self.ttl, now))
+
+                # Trim lazily rather than on every write
+                self._db_writes += 1
+                if self._db_writes % 100 == 0:
+                    self._db.execute('DELETE FROM llm_cache WHERE expires_at <= ?', (now,))
+                    self._db.execute('''
+                        DELETE FROM llm_cache WHERE key IN (
+                            SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                        )
+                    ''', (self.db_max_entries,))
+                self._db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"LLM cache write failed: {e}")
+
+    def clear(self):
+        with self._entries_lock:
+            self._entries.clear()
+        if self._db:
+            with self._db_lock:
+                self._db.execute('DELETE FROM llm_cache')
+                self._db.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._entries_lock:
+            size = len(self._entries)
+        return {
+            "hits": self.metrics.get("llm_cache.hit"),
+            "disk_hits": self.metrics.get("llm_cache.hit_disk"),
+            "misses": self.metrics.get("llm_cache.miss"),
+            "evicted": self.metrics.get("llm_cache.evicted"),
+            "size": size
+        }
@@ -2,16 +2,78 @@ import sqlite3
 import logging
 import json
 import os
+import threading
 from typing import List, Dict, Optional, Any
 from datetime import datetime
+from .config import Config
 
 logger = logging.getLogger(__name__)
 
+# Statements are module constants so every call passes the identical string
+# and hits its connection's prepared-statement cache.
+SCHEMA = [
+    # Facts Table: Validated knowledge about user/world
+    '''
+    CREATE TABLE IF NOT EXISTS facts (
+        key TEXT PRIMARY KEY,
+        value TEXT,
+        updated_at TIMESTAMP
+    )
+    ''',
+    # Interactions Table: Chat history
+    '''
+    CREATE TABLE IF NOT EXISTS interactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        role TEXT,
+        content TEXT,
+        timestamp TIMESTAMP,
+        session_id TEXT
+    )
+    ''',
+    # get_recent_history filters by session and walks back from the newest row
+    'CREATE INDEX IF NOT EXISTS idx_interactions_session ON interactions (session_id, id)',
+    # Projects Table: Long-running task contexts
+    '''
+    CREATE TABLE IF NOT EXISTS projects (
+        name TEXT PRIMARY KEY,
+        description TEXT,
+        status TEXT,
+        context_data TEXT,
+        updated_at TIMESTAMP
+    )
+    ''',
+]
+
+REMEMBER_SQL = '''
+    INSERT INTO facts (key, value, updated_at)
+    VALUES (?, ?, ?)
+    ON CONFLICT(key) DO UPDATE SET
+        value=excluded.value,
+        updated_at=excluded.updated_at
+'''
+RECALL_SQL = 'SELECT value FROM facts WHERE key = ?'
+LOG_INTERACTION_SQL = 'INSERT INTO interactions (role, content, timestamp, session_id) VALUES (?, ?, ?, ?)'
+RECENT_HISTORY_SQL = '''
+    SELECT role, content, timestamp FROM interactions
+    WHERE session_id = ?
+    ORDER BY id DESC LIMIT ?
+'''
+
 class MemoryManager:
+    """
+    Long-term memory on SQLite. Each thread keeps one open connection
+    (autocommit, WAL, synchronous=NORMAL, MEMORY_MMAP_SIZE / MEMORY_CACHE_SIZE)
+    instead of connecting per call, so repeated statements reuse their
+    prepared form.
+    """
     _instance = None
     DB_PATH = "localmolt.db"
 
-    def __init__(self):
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or Config.MEMORY_DB or self.DB_PATH
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
         self._init_db()
 
     @classmethod
@@ -20,71 +82,52 @@ class MemoryManager:
             cls._instance = MemoryManager()
         return cls._instance
 
+    def _conn(self) -> sqlite3.Connection:
+        """This thread's connection, opened and tuned on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False,
+                                   cached_statements=64)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={int(Config.MEMORY_MMAP_SIZE)}")
+            conn.execute(f"PRAGMA cache_size={int(Config.MEMORY_CACHE_SIZE)}")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self):
+        """Closes every thread's connection; threads reconnect on next use."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
     def _init_db(self):
         """Initialize the SQLite database schema."""
         try:
-            conn = sqlite3.connect(self.DB_PATH)
-            cursor = conn.cursor()
-            
-            # Facts Table: Validated knowledge about user/world
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS facts (
-                    key TEXT PRIMARY KEY,
-                    value TEXT,
-                    updated_at TIMESTAMP
-                )
-            ''')
-
-            # Interactions Table: Chat history
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS interactions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    role TEXT,
-                    content TEXT,
-                    timestamp TIMESTAMP,
-                    session_id TEXT
-                )
-            ''')
-            
-            # Projects Table: Long-running task contexts
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS projects (
-                    name TEXT PRIMARY KEY,
-                    description TEXT,
-                    status TEXT,
-                    context_data TEXT,
-                    updated_at TIMESTAMP
-                )
-            ''')
-            
-            conn.commit()
-            conn.close()
-            logger.info(f"MemoryManager initialized at {self.DB_PATH}")
+            conn = self._conn()
+            for statement in SCHEMA:
+                conn.execute(statement)
+            logger.info(f"MemoryManager initialized at {self.db_path}")
         except Exception as e:
             logger.critical(f"Failed to init Memory DB: {e}")
 
     def remember(self, key: str, value: Any):
         """Store a fact."""
         try:
-            conn = sqlite3.connect(self.DB_PATH)
             timestamp = datetime.now().isoformat()
-            
+
             # Serialize if not string
             if not isinstance(value, str):
                 val_str = json.dumps(value)
             else:
                 val_str = value
 
-            conn.execute('''
-                INSERT INTO facts (key, value, updated_at) 
-                VALUES (?, ?, ?) 
-                ON CONFLICT(key) DO UPDATE SET 
-                    value=excluded.value, 
-                    updated_at=excluded.updated_at
-            ''', (key, val_str, timestamp))
-            
-            conn.commit()
-            conn.close()
+            self._conn().execute(REMEMBER_SQL, (key, val_str, timestamp))
             logger.info(f"Remembered: {key} = {val_str}")
         except Exception as e:
             logger.error(f"Failed to remember {key}: {e}")
@@ -92,12 +135,8 @@ class MemoryManager:
     def recall(self, key: str) -> Optional[Any]:
         """Retrieve a fact."""
         try:
-            conn = sqlite3.connect(self.DB_PATH)
-            cursor = conn.cursor()
-            cursor.execute('SELECT value FROM facts WHERE key = ?', (key,))
-            row = cursor.fetchone()
-            conn.close()
-            
+            row = self._conn().execute(RECALL_SQL, (key,)).fetchone()
+
             if row:
                 val = row[0]
                 # Try to auto-deserialize JSON
@@ -113,32 +152,17 @@ class MemoryManager:
     def log_interaction(self, role: str, content: str, session_id: str = "default"):
         """Log a chat message."""
         try:
-            conn = sqlite3.connect(self.DB_PATH)
             timestamp = datetime.now().isoformat()
-            conn.execute('''
-                INSERT INTO interactions (role, content, timestamp, session_id)
-                VALUES (?, ?, ?, ?)
-            ''', (role, content, timestamp, session_id))
-            conn.commit()
-            conn.close()
+            self._conn().execute(LOG_INTERACTION_SQL, (role, content, timestamp, session_id))
         except Exception as e:
             logger.error(f"Failed to log interaction: {e}")
 
     def get_recent_history(self, limit: int = 10, session_id: str = "default") -> List[Dict]:
         """Get recent chat history."""
         try:
-            conn = sqlite3.connect(self.DB_PATH)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT role, content, timestamp FROM interactions 
-                WHERE session_id = ? 
-                ORDER BY id DESC LIMIT ?
-            ''', (session_id, limit))
-            rows = cursor.fetchall()
-            conn.close()
-            
-            history = [{"role": row["role"], "content": row["content"], "timestamp": row["timestamp"]} for row in rows]
+            rows = self._conn().execute(RECENT_HISTORY_SQL, (session_id, limit)).fetchall()
+
+            history = [{"role": role, "content": content, "timestamp": timestamp} for role, content, timestamp in rows]
             return history[::-1] # Reverse to chrono order
         except Exception as e:
             logger.error(f"Failed to get history: {e}")
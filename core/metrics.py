@@ -0,0 +1,113 @@
+import time
+import threading
+import logging
+from contextlib import contextmanager
+from bisect import bisect_left
+from typing import Dict, Any, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in milliseconds; the last bucket catches everything above
+DEFAULT_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000)
+
+class Metrics:
+    """
+    Process-wide counters and timing summaries.
+    Names are dotted strings, e.g. "llm_cache.hit" or "intent.rules.ms".
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self._data_lock = threading.Lock()
+        self._counters: Dict[str, int] = {}
+        self._observations: Dict[str, Dict[str, float]] = {}
+        self._histograms: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = Metrics()
+        return cls._instance
+
+    def incr(self, name: str, value: int = 1):
+        with self._data_lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def get(self, name: str) -> int:
+        with self._data_lock:
+            return self._counters.get(name, 0)
+
+    def observe(self, name: str, value: float):
+        """Records one sample (typically milliseconds)."""
+        with self._data_lock:
+            obs = self._observations.get(name)
+            if obs is None:
+                obs = {"count": 0, "sum": 0.0, "min": value, "max": value}
+                self._observations[name] = obs
+            obs["count"] += 1
+            obs["sum"] += value
+            obs["min"] = min(obs["min"], value)
+            obs["max"] = max(obs["max"], value)
+
+    def histogram(self, name: str, value: float, buckets: Sequence[float] = DEFAULT_BUCKETS_MS):
+        """
+        Records one sample into fixed buckets (counts per upper bound, last
+        one unbounded), for latency distributions where avg/max hide the tail.
+        Also observes the sample so the summary stays available.
+        """
+        with self._data_lock:
+            hist = self._histograms.get(name)
+            if hist is None:
+                hist = {"bounds": tuple(buckets), "counts": [0] * (len(buckets) + 1)}
+                self._histograms[name] = hist
+            hist["counts"][bisect_left(hist["bounds"], value)] += 1
+        self.observe(name, value)
+
+    def quantile(self, name: str, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (None above the last bound)."""
+        with self._data_lock:
+            hist = self._histograms.get(name)
+            if hist is None:
+                return None
+            counts = list(hist["counts"])
+            bounds = hist["bounds"]
+        target = q * sum(counts)
+        seen = 0
+        for i, count in enumerate(counts):
+            seen += count
+            if count and seen >= target:
+                return bounds[i] if i < len(bounds) else None
+        return None
+
+    @contextmanager
+    def timer(self, name: str):
+        """Observes the wall time of the block in milliseconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1000)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._data_lock:
+            observations = {
+                name: dict(obs, avg=obs["sum"] / obs["count"])
+                for name, obs in self._observations.items()
+            }
+            histograms = {
+                # Per-bucket (not cumulative) counts
+                name: dict(
+                    {f"<={b:g}": c for b, c in zip(hist["bounds"], hist["counts"])},
+                    **{f">{hist['bounds'][-1]:g}": hist["counts"][-1]}
+                )
+                for name, hist in self._histograms.items()
+            }
+            return {"counters": dict(self._counters), "observations": observations, "histograms": histograms}
+
+    def reset(self):
+        with self._data_lock:
+            self._counters.clear()
+            self._observations.clear()
+            self._histograms.clear()
@@ -0,0 +1,180 @@
+import time
+import logging
+import threading
+from enum import Enum
+from typing import Dict, List, Tuple
+from .config import Config
+from .llm import OllamaClient
+from .metrics import Metrics
+from .shared_state import connect
+from .types import UserCommand
+
+logger = logging.getLogger(__name__)
+
+class ModelState(str, Enum):
+    COLD = "COLD"
+    WARMING = "WARMING"
+    READY = "READY"
+    FAILED = "FAILED"
+
+# Every command is classified and planned by the text model first. The vision
+# model is only needed once a step has to locate an element, and an approval
+# just resumes a plan that was already made.
+TEXT_MODEL = "llama3.2"
+
+def models_for(command: UserCommand) -> List[str]:
+    """The models a command can't start without."""
+    if command.raw_text.upper().startswith("APPROVE "):
+        return []
+    return [TEXT_MODEL]
+
+def _tagged(model: str) -> str:
+    return model if ":" in model else f"{model}:latest"
+
+class ModelManager:
+    """
+    Preloads the models the agents use so the first command after boot
+    does not pay Ollama's cold load. A failed load is retried up to
+    OLLAMA_WARM_ATTEMPTS times; after that the model is FAILED and no
+    longer holds traffic back.
+    States live in STATE_DB, so a gateway whose Coordinators run in worker
+    processes (and which registers no models itself) gates on what the
+    workers loaded. A READY model that Ollama has since unloaded (its
+    keep_alive ran out) is reported COLD; its next use loads it again.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, db_path: str = None):
+        self.llm = OllamaClient.get_instance()
+        self.metrics = Metrics.get_instance()
+        self._db = connect(db_path)
+        self._state_lock = threading.Lock()
+        self._checked_at = 0.0
+        with self._state_lock:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS model_states "
+                "(model TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = ModelManager()
+        return cls._instance
+
+    @staticmethod
+    def _stale_after() -> float:
+        # Longer than one load attempt plus the wait before the next: a WARMING
+        # row that old was left behind by a process that is gone
+        return Config.OLLAMA_WARM_RETRY + max(Config.OLLAMA_TIMEOUT, 120) + 60
+
+    def _set(self, model: str, state: ModelState):
+        with self._state_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO model_states (model, state, updated_at) VALUES (?, ?, ?)",
+                (model, state.value, time.time())
+            )
+
+    def warm_up_async(self, models: List[str]) -> threading.Thread:
+        """
+        Registers models and loads them on a background thread. Models some
+        process is already loading are skipped, so every component (and
+        every worker process) can simply declare what it needs.
+        """
+        now = time.time()
+        to_warm = []
+        with self._state_lock:
+            for model in models:
+                claimed = self._db.execute(
+                    "INSERT INTO model_states (model, state, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(model) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at "
+                    "WHERE model_states.state != ? OR model_states.updated_at < ? RETURNING model",
+                    (model, ModelState.WARMING.value, now, ModelState.WARMING.value, now - self._stale_after())
+                ).fetchone()
+                if claimed:
+                    to_warm.append(model)
+
+        thread = threading.Thread(target=self._warm_loop, args=(to_warm,), daemon=True)
+        if to_warm:
+            thread.start()
+        return thread
+
+    def _warm_loop(self, models: List[str]):
+        pending = list(models)
+        for attempt in range(1, Config.OLLAMA_WARM_ATTEMPTS + 1):
+            # One at a time: loading two large models at once can exhaust VRAM
+            pending = [model for model in pending if not self._warm(model)]
+            if not pending:
+                return
+            if attempt < Config.OLLAMA_WARM_ATTEMPTS:
+                logger.warning(f"Models not loaded yet, retrying in {Config.OLLAMA_WARM_RETRY}s: {pending}")
+                time.sleep(Config.OLLAMA_WARM_RETRY)
+                for model in pending:
+                    self._set(model, ModelState.WARMING)
+
+        for model in pending:
+            self._set(model, ModelState.FAILED)
+            self.metrics.incr(f"models.{model}.failed")
+        logger.error(f"Giving up on loading {pending} after {Config.OLLAMA_WARM_ATTEMPTS} attempts")
+
+    def _warm(self, model: str) -> bool:
+        keep_alive = Config.keep_alive_for(model)
+        logger.info(f"Warming model {model} (keep_alive={keep_alive})...")
+        start = time.perf_counter()
+        ok = self.llm.load_model(model, keep_alive)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if ok:
+            self._set(model, ModelState.READY)
+            self.metrics.observe(f"models.{model}.warm_ms", elapsed_ms)
+            logger.info(f"Model {model} ready after {elapsed_ms:.0f} ms")
+        else:
+            self.metrics.incr(f"models.{model}.warm_failed")
+        return ok
+
+    def _refresh_loaded(self, states: Dict[str, ModelState]):
+        """Marks READY models Ollama no longer has in memory as COLD (checked every OLLAMA_PS_INTERVAL)."""
+        now = time.monotonic()
+        if ModelState.READY not in states.values() or now - self._checked_at < Config.OLLAMA_PS_INTERVAL:
+            return
+        self._checked_at = now
+        loaded = self.llm.loaded_models()
+        if loaded is None:
+            return
+        for model, state in states.items():
+            if state == ModelState.READY and _tagged(model) not in loaded:
+                logger.info(f"Model {model} was unloaded by Ollama")
+                self._set(model, ModelState.COLD)
+                self.metrics.incr(f"models.{model}.unloaded")
+                states[model] = ModelState.COLD
+
+    def _states(self) -> Dict[str, ModelState]:
+        stale = time.time() - self._stale_after()
+        with self._state_lock:
+            rows = self._db.execute("SELECT model, state, updated_at FROM model_states").fetchall()
+        states = {
+            model: ModelState.COLD if state == ModelState.WARMING.value and updated_at < stale else ModelState(state)
+            for model, state, updated_at in rows
+        }
+        self._refresh_loaded(states)
+        return states
+
+    def check(self, models: List[str] = None) -> Tuple[bool, List[str]]:
+        """
+        (ready, failed) for the given models (default: all registered).
+        Not ready while any of them is still warming up; failed lists the
+        ones that gave up loading, which let traffic through.
+        """
+        states = self._states()
+        models = list(states) if models is None else models
+        ready = all(states.get(model) != ModelState.WARMING for model in models)
+        return ready, [model for model in models if states.get(model) == ModelState.FAILED]
+
+    def is_ready(self, models: List[str] = None) -> bool:
+        """True unless one of the models (default: all registered) is still warming up."""
+        return self.check(models)[0]
+
+    def status(self) -> Dict[str, str]:
+        return {model: state.value for model, state in self._states().items()}
@@ -0,0 +1,128 @@
+import time
+import logging
+import threading
+from typing import Callable, List, Optional, Tuple
+from .config import Config
+from .types import UserCommand
+from .metrics import Metrics
+from .shared_state import connect
+
+logger = logging.getLogger(__name__)
+
+class Outbox:
+    """
+    Outbound messages from worker processes, stored in STATE_DB until the
+    gateway process (the only one holding a chat connection) relays them.
+    Each message carries the platform it goes out on, and a relay claims
+    rows before sending them, so every message is delivered by exactly one
+    relay. A claim left behind by a relay that died lapses after
+    CLAIM_TIMEOUT seconds.
+    """
+    _instance = None
+    _lock = threading.Lock()
+    CLAIM_TIMEOUT = 60.0
+
+    def __init__(self, db_path: str = None):
+        self._db = connect(db_path)
+        self._db_lock = threading.Lock()
+        self.metrics = Metrics.get_instance()
+        with self._db_lock:
+            self._db.execute('''
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    recipient TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            ''')
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(outbox)")}
+            if "platform" not in columns:
+                self._db.execute("ALTER TABLE outbox ADD COLUMN platform TEXT NOT NULL DEFAULT ''")
+            if "claimed_at" not in columns:
+                self._db.execute("ALTER TABLE outbox ADD COLUMN claimed_at REAL")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_outbox_platform ON outbox (platform, id)")
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = Outbox()
+        return cls._instance
+
+    def send(self, recipient: str, text: str, platform: str = ""):
+        with self._db_lock:
+            self._db.execute(
+                "INSERT INTO outbox (recipient, text, created_at, platform) VALUES (?, ?, ?, ?)",
+                (recipient, text, time.time(), platform)
+            )
+        self.metrics.incr("outbox.queued")
+
+    def reply(self, command: UserCommand, text: str):
+        """Same signature as Coordinator.reply_callback: answers on the command's platform."""
+        self.send(command.sender_id, text, platform=command.platform)
+
+    def _claim(self, platform: str, limit: int) -> List[Tuple[int, str, str, float]]:
+        now = time.time()
+        with self._db_lock:
+            rows = self._db.execute('''
+                UPDATE outbox SET claimed_at = ?
+                WHERE id IN (
+                    SELECT id FROM outbox
+                    WHERE platform = ? AND (claimed_at IS NULL OR claimed_at < ?)
+                    ORDER BY id LIMIT ?
+                )
+                RETURNING id, recipient, text, created_at
+            ''', (now, platform, now - self.CLAIM_TIMEOUT, limit)).fetchall()
+        return sorted(rows)
+
+    def drain(self, send_fn: Callable[[str, str], None], platform: str = "", limit: int = 100) -> int:
+        """
+        Delivers up to limit of the platform's messages in order. A message is
+        deleted once send_fn returns; after a failure the rest of the batch
+        is released for the next attempt.
+        """
+        rows = self._claim(platform, limit)
+        sent = 0
+        for i, (row_id, recipient, text, created_at) in enumerate(rows):
+            try:
+                send_fn(recipient, text)
+            except Exception as e:
+                logger.error(f"Outbound message to {recipient} failed, will retry: {e}")
+                with self._db_lock:
+                    self._db.executemany("UPDATE outbox SET claimed_at = NULL WHERE id = ?",
+                                         [(row[0],) for row in rows[i:]])
+                break
+            with self._db_lock:
+                self._db.execute("DELETE FROM outbox WHERE id = ?", (row_id,))
+            self.metrics.histogram("outbox.delay_ms", (time.time() - created_at) * 1000)
+            sent += 1
+        return sent
+
+class OutboxRelay:
+    """Background thread in the gateway process that feeds the platform's messages to send_fn."""
+
+    def __init__(self, send_fn: Callable[[str, str], None], platform: str, outbox: Outbox = None):
+        self.send_fn = send_fn
+        self.platform = platform
+        self.outbox = outbox or Outbox.get_instance()
+        self.interval = Config.OUTBOX_POLL_INTERVAL
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="outbox-relay", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                if self.outbox.drain(self.send_fn, self.platform):
+                    continue
+            except Exception as e:
+                logger.error(f"Outbox relay error: {e}")
+            self._stop.wait(self.interval)
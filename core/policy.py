@@ -59,10 +59,14 @@ class PolicyEngine:
             return True
         return False
 
+    @staticmethod
+    def is_critical_app(app: str) -> bool:
+        app = (app or "").lower()
+        return any(crit in app for crit in PolicyEngine.CRITICAL_APPS)
+
     @staticmethod
     def _is_system_critical(step: Step) -> bool:
         if step.action_type == "OPEN_APP":
-            app = (step.value or "").lower()
-            if any(crit in app for crit in PolicyEngine.CRITICAL_APPS):
+            if PolicyEngine.is_critical_app(step.value):
                 return True
         return False
@@ -1,27 +1,289 @@
-import queue
-from typing import Optional
+import os
+import time
+import socket
+import sqlite3
+import logging
+import threading
+from enum import IntEnum
+from typing import Dict, List, Optional, Tuple
 from .types import UserCommand
+from .config import Config
+from .metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+class Priority(IntEnum):
+    """Lower runs first."""
+    APPROVAL = 0
+    INTERACTIVE = 1
+    SCHEDULED = 2
+    BULK = 3
+
+def classify(command: UserCommand) -> Priority:
+    if command.raw_text.upper().startswith("APPROVE "):
+        return Priority.APPROVAL
+    if command.platform == "internal":
+        return Priority.SCHEDULED
+    return Priority.INTERACTIVE
 
 class CommandQueue:
+    """
+    Durable priority queue on SQLite (WAL).
+
+    put() buffers commands and writes them in one transaction per batch:
+    when QUEUE_BATCH_SIZE is reached, QUEUE_FLUSH_INTERVAL after the first
+    buffered command, or right before a get(). get() leases the oldest
+    command of the most urgent class; the lease is acked (deleted) by
+    task_done(command). Delivery is at-least-once; a command delivered
+    QUEUE_MAX_ATTEMPTS times without an ack is parked as dead.
+
+    Several processes may share one file. Each lease records its owner
+    (host:pid) and every open queue heartbeats in the workers table; leases
+    whose owner is a dead process on this host, or has been silent for
+    QUEUE_LEASE_TIMEOUT, go back to ready. A sender's commands are leased
+    one at a time, so they stay in order whichever process takes them.
+    """
     _instance = None
-    
-    def __init__(self):
-        self._queue = queue.Queue()
+    _lock = threading.Lock()
+
+    def __init__(self, db_path: str = None, batch_size: int = None, flush_interval: float = None,
+                 max_attempts: int = None):
+        self.db_path = (Config.QUEUE_DB if db_path is None else db_path) or ":memory:"
+        self.batch_size = batch_size or Config.QUEUE_BATCH_SIZE
+        self.flush_interval = Config.QUEUE_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.max_attempts = max_attempts or Config.QUEUE_MAX_ATTEMPTS
+        self.lease_timeout = Config.QUEUE_LEASE_TIMEOUT
+        self.poll_interval = Config.QUEUE_POLL_INTERVAL
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.metrics = Metrics.get_instance()
+
+        self._db_lock = threading.Lock()
+        self._available = threading.Condition(threading.Lock())
+        self._buffer: List[Tuple[int, str, str, float]] = []
+        self._flush_timer: Optional[threading.Timer] = None
+        self._leases: Dict[int, int] = {}   # id(command) -> row id
+        self._local = threading.local()     # Last lease per thread, for task_done()
+
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None,
+                                   timeout=Config.QUEUE_BUSY_TIMEOUT)
+        self._closed = threading.Event()
+        self._last_recovery = 0.0
+        self._init_db()
+        threading.Thread(target=self._heartbeat_loop, daemon=True).start()
 
     @classmethod
     def get_instance(cls):
-        if cls._instance is None:
-            cls._instance = CommandQueue()
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = CommandQueue()
         return cls._instance
 
-    def put(self, command: UserCommand):
-        self._queue.put(command)
+    def _init_db(self):
+        with self._db_lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute('''
+                CREATE TABLE IF NOT EXISTS commands (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    priority INTEGER NOT NULL,
+                    state TEXT NOT NULL DEFAULT 'ready',
+                    payload TEXT NOT NULL,
+                    enqueued_at REAL NOT NULL,
+                    leased_at REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(commands)")}
+            for column in ("owner", "sender"):
+                if column not in columns:
+                    self._db.execute(f"ALTER TABLE commands ADD COLUMN {column} TEXT")
+            # Rows queued before the sender column existed would skip per-sender ordering
+            self._db.execute('''
+                UPDATE commands
+                SET sender = json_extract(payload, '$.platform') || ':' || json_extract(payload, '$.sender_id')
+                WHERE sender IS NULL
+            ''')
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_commands_ready ON commands (state, priority, id)")
+            self._db.execute('''
+                CREATE TABLE IF NOT EXISTS workers (
+                    owner TEXT PRIMARY KEY,
+                    heartbeat REAL NOT NULL
+                )
+            ''')
+            self._beat()
+        self.recover()
 
-    def get(self, block=True, timeout=None) -> Optional[UserCommand]:
+    # --- Liveness ---
+
+    def _beat(self):
+        self._db.execute("INSERT OR REPLACE INTO workers (owner, heartbeat) VALUES (?, ?)", (self.owner, time.time()))
+
+    def _heartbeat_loop(self):
+        while not self._closed.wait(self.lease_timeout / 3):
+            try:
+                with self._db_lock:
+                    self._beat()
+            except sqlite3.Error as e:
+                logger.warning(f"Queue heartbeat failed: {e}")
+
+    @staticmethod
+    def _pid_alive(pid: int) -> bool:
         try:
-            return self._queue.get(block=block, timeout=timeout)
-        except queue.Empty:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            pass  # Exists but isn't ours to signal
+        return True
+
+    def recover(self) -> int:
+        """Returns leases held by dead or silent owners to ready."""
+        self._last_recovery = time.monotonic()
+        host = socket.gethostname()
+        with self._db_lock:
+            for (owner,) in self._db.execute("SELECT owner FROM workers").fetchall():
+                owner_host, _, pid = owner.rpartition(":")
+                if owner != self.owner and owner_host == host and pid.isdigit() and not self._pid_alive(int(pid)):
+                    self._db.execute("DELETE FROM workers WHERE owner = ?", (owner,))
+            recovered = self._db.execute('''
+                UPDATE commands SET state = 'ready', leased_at = NULL, owner = NULL
+                WHERE state = 'leased' AND (owner IS NULL OR owner NOT IN (
+                    SELECT owner FROM workers WHERE heartbeat > ?
+                ))
+            ''', (time.time() - self.lease_timeout,)).rowcount
+        if recovered:
+            self.metrics.incr("queue.recovered", recovered)
+            logger.warning(f"Recovered {recovered} unacknowledged commands from {self.db_path}")
+        return recovered
+
+    # --- Producer side ---
+
+    def put(self, command: UserCommand, priority: Priority = None):
+        priority = classify(command) if priority is None else priority
+        entry = (int(priority), f"{command.platform}:{command.sender_id}", command.model_dump_json(), time.time())
+        with self._available:
+            self._buffer.append(entry)
+            full = len(self._buffer) >= self.batch_size
+            if not full and self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        self.metrics.incr("queue.put")
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Writes buffered commands in a single transaction."""
+        with self._available:
+            batch, self._buffer = self._buffer, []
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        if not batch:
+            return
+
+        with self._db_lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany(
+                    "INSERT INTO commands (priority, sender, payload, enqueued_at) VALUES (?, ?, ?, ?)", batch
+                )
+                self._db.execute("COMMIT")
+            except sqlite3.Error:
+                self._db.execute("ROLLBACK")
+                with self._available:
+                    self._buffer[:0] = batch
+                raise
+        self.metrics.observe("queue.batch_size", len(batch))
+        with self._available:
+            self._available.notify_all()
+
+    # --- Consumer side ---
+
+    def _lease_next(self) -> Optional[UserCommand]:
+        with self._db_lock:
+            rows = self._db.execute('''
+                UPDATE commands SET state = 'leased', leased_at = ?, owner = ?, attempts = attempts + 1
+                WHERE id = (
+                    SELECT id FROM commands AS c WHERE state = 'ready' AND NOT EXISTS (
+                        SELECT 1 FROM commands WHERE state = 'leased' AND sender = c.sender
+                    )
+                    ORDER BY priority, id LIMIT 1
+                )
+                RETURNING id, payload, enqueued_at, attempts
+            ''', (time.time(), self.owner)).fetchall()  # Drain RETURNING so the statement commits
+        if not rows:
             return None
-            
-    def task_done(self):
-        self._queue.task_done()
+
+        row_id, payload, enqueued_at, attempts = rows[0]
+        if attempts > self.max_attempts:
+            with self._db_lock:
+                self._db.execute("UPDATE commands SET state = 'dead' WHERE id = ?", (row_id,))
+            self.metrics.incr("queue.dead")
+            logger.error(f"Command {row_id} failed {attempts - 1} deliveries, parking it")
+            return self._lease_next()
+
+        command = UserCommand.model_validate_json(payload)
+        self._leases[id(command)] = row_id
+        self._local.last = command
+        self.metrics.histogram("queue.wait_ms", (time.time() - enqueued_at) * 1000)
+        return command
+
+    def get(self, block=True, timeout=None) -> Optional[UserCommand]:
+        """Leases the next command, waiting up to timeout if block is set."""
+        self.flush()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            command = self._lease_next()
+            if command is not None or not block:
+                return command
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            with self._available:
+                # Bounded wait: other processes sharing the file don't notify us
+                wait = self.poll_interval if remaining is None else min(remaining, self.poll_interval)
+                self._available.wait(wait)
+            self.flush()
+            if time.monotonic() - self._last_recovery > self.lease_timeout:
+                self.recover()
+
+    def task_done(self, command: UserCommand = None):
+        """Acks a leased command (default: the last one this thread got)."""
+        command = command or getattr(self._local, "last", None)
+        if command is None:
+            return
+        row_id = self._leases.pop(id(command), None)
+        if getattr(self._local, "last", None) is command:
+            self._local.last = None
+        if row_id is None:
+            return
+        with self._db_lock:
+            self._db.execute("DELETE FROM commands WHERE id = ?", (row_id,))
+        self.metrics.incr("queue.acked")
+
+    def discard(self, sender: str) -> int:
+        """Drops the commands sender ("platform:sender_id") has waiting; leased ones stay."""
+        self.flush()
+        with self._db_lock:
+            dropped = self._db.execute(
+                "DELETE FROM commands WHERE state = 'ready' AND sender = ?", (sender,)
+            ).rowcount
+        if dropped:
+            self.metrics.incr("queue.discarded", dropped)
+        return dropped
+
+    def qsize(self) -> int:
+        """Commands waiting to be leased (buffered or stored)."""
+        with self._available:
+            buffered = len(self._buffer)
+        with self._db_lock:
+            stored = self._db.execute("SELECT COUNT(*) FROM commands WHERE state = 'ready'").fetchone()[0]
+        return buffered + stored
+
+    def close(self):
+        self.flush()
+        self._closed.set()
+        with self._db_lock:
+            self._db.execute("DELETE FROM workers WHERE owner = ?", (self.owner,))
+            self._db.close()
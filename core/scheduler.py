@@ -1,9 +1,10 @@
 import time
+import uuid
 import threading
 import logging
 import schedule
 from typing import Callable
-from .queue_mgr import CommandQueue
+from .queue_mgr import CommandQueue, Priority
 from .types import UserCommand
 
 logger = logging.getLogger(__name__)
@@ -37,6 +38,6 @@ class Scheduler:
             raw_text="Run Daily Briefing",
             sender_id="SYSTEM",
             platform="internal",
-            timestamp=time.time()
+            message_id=f"schedule-{uuid.uuid4().hex[:8]}"
         )
-        self.queue.add_command(cmd)
+        self.queue.put(cmd, priority=Priority.SCHEDULED)
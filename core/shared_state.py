@@ -0,0 +1,17 @@
+import sqlite3
+from .config import Config
+
+def connect(db_path: str = None) -> sqlite3.Connection:
+    """
+    Connection to the state file shared by the gateway and worker processes
+    (STATE_DB; empty = in-memory, i.e. single process). Autocommit, WAL, and
+    a busy timeout so writers from other processes queue up instead of failing.
+    Callers serialise use of the connection with their own lock.
+    """
+    db = sqlite3.connect(
+        (Config.STATE_DB if db_path is None else db_path) or ":memory:",
+        check_same_thread=False, isolation_level=None, timeout=Config.QUEUE_BUSY_TIMEOUT
+    )
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    return db
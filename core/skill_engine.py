@@ -9,7 +9,12 @@ from ghostdesk.skills.terminal import TerminalSkill
 from ghostdesk.skills.filesystem import FileSkill
 from .types import Step
 from .permissions import PermissionManager
+from .metrics import Metrics
+from .desktop_lease import DesktopLease, needs_desktop
+from .cancellation import CancellationToken, Cancelled
+import time
 import logging
+import threading
 from typing import Dict, Any
 
 logger = logging.getLogger(__name__)
@@ -23,6 +28,7 @@ class SkillEngine:
         self.skills: Dict[str, BaseSkill] = {}
         self.action_map: Dict[str, BaseSkill] = {}
         self.permission_mgr = PermissionManager.get_instance()
+        self.metrics = Metrics.get_instance()
         
         # Register default skills
         self.register_skill(DesktopSkill())
@@ -40,13 +46,23 @@ class SkillEngine:
             self.action_map[action] = skill
         logger.info(f"Registered Skill: {skill.name} handles {skill.actions}")
 
-    def execute_step(self, step: Step, context: Any = None) -> SkillResult:
+    def execute_step(self, step: Step, context: Any = None, cancel: CancellationToken = None) -> SkillResult:
+        """
+        Runs one step. With cancel, a step cancelled before it starts (or
+        while waiting for the desktop) fails with a "Cancelled" result.
+        """
         action_type = step.action_type.upper()
+        if cancel is not None and cancel.is_set():
+            return SkillResult(success=False, message=f"Cancelled ({cancel.reason})")
         
         skill = self.action_map.get(action_type)
         if not skill:
             return SkillResult(success=False, message=f"No skill registered for action: {action_type}")
 
+        # Skills see the step they run for (TYPE takes its description as a hint)
+        if context is None or isinstance(context, dict):
+            context = {"description": step.description, **(context or {})}
+
         # Permission Check
         params = step.value
         allowed = self.permission_mgr.check_permission(action_type, params)
@@ -55,5 +71,17 @@ class SkillEngine:
             # For Phase 1 PoC, we just fail. Phase 2 (Gateway) will handle "Request Approval".
             return SkillResult(success=False, message=f"PERMISSION DENIED: {action_type} for {params} requires approval.")
             
-        # Execute
-        return skill.execute(action_type, params, context)
+        # Execute (timed per action type, so profile changes show up)
+        start = time.perf_counter()
+        if needs_desktop(action_type):
+            try:
+                with DesktopLease.get_instance().hold(f"skills:{threading.get_ident()}", cancel=cancel):
+                    result = skill.execute(action_type, params, context)
+            except Cancelled as e:
+                return SkillResult(success=False, message=f"Cancelled ({e})")
+        else:
+            result = skill.execute(action_type, params, context)
+        elapsed = (time.perf_counter() - start) * 1000
+        self.metrics.observe(f"skill.{action_type}.ms", elapsed)
+        logger.info(f"{action_type} took {elapsed:.0f} ms")
+        return result
@@ -0,0 +1,80 @@
+import re
+import time
+import logging
+import platform
+import pyautogui
+from typing import Optional
+from .config import Config
+from .metrics import Metrics
+from .waits import profile
+
+logger = logging.getLogger(__name__)
+
+SECRET_HINT = re.compile(r"\b(password|passphrase|passcode|pin|otp|token|secret|api[ _-]?key|credential)s?\b", re.I)
+SECRET_PREFIXES = ("sk-", "ghp_", "gho_", "xox", "AKIA", "AIza")
+
+def looks_secret(text: str) -> bool:
+    """Heuristic: a single high-entropy-looking word, or a known token format."""
+    if text.startswith(SECRET_PREFIXES):
+        return True
+    if not 8 <= len(text) <= 128 or any(ch.isspace() for ch in text):
+        return False
+    classes = sum([
+        any(ch.islower() for ch in text),
+        any(ch.isupper() for ch in text),
+        any(ch.isdigit() for ch in text),
+        any(not ch.isalnum() for ch in text)
+    ])
+    return classes >= 3
+
+def choose_strategy(text: str, hint: Optional[str] = None) -> str:
+    """
+    "keys" for short or secret-looking input (never put secrets on the
+    clipboard, where clipboard managers keep history), "paste" for the rest
+    above the threshold or anything pyautogui can't type (non-ASCII).
+    """
+    if (hint and SECRET_HINT.search(hint)) or looks_secret(text):
+        return "keys"
+    if len(text) >= Config.TYPE_PASTE_THRESHOLD or not text.isascii():
+        return "paste"
+    return "keys"
+
+def _paste(text: str) -> bool:
+    try:
+        import pyperclip
+    except ImportError:
+        logger.warning("pyperclip not installed, falling back to typing")
+        return False
+
+    try:
+        previous = pyperclip.paste()
+    except pyperclip.PyperclipException as e:
+        logger.warning(f"Clipboard unavailable ({e}), falling back to typing")
+        return False
+
+    pyperclip.copy(text)
+    try:
+        pyautogui.hotkey("command" if platform.system() == "Darwin" else "ctrl", "v")
+        # The target app reads the clipboard when it handles the keystroke, not before
+        time.sleep(Config.TYPE_PASTE_SETTLE)
+    finally:
+        pyperclip.copy(previous or "")
+    return True
+
+def type_text(text: str, hint: Optional[str] = None) -> str:
+    """
+    Enters text into the focused control with the cheapest safe strategy.
+    hint is the step description, used to spot password fields.
+    Returns the strategy used.
+    """
+    start = time.perf_counter()
+    strategy = choose_strategy(text, hint)
+    if strategy == "paste" and not _paste(text):
+        strategy = "keys"
+    if strategy == "keys":
+        pyautogui.write(text, interval=profile().type_interval)
+
+    metrics = Metrics.get_instance()
+    metrics.incr(f"text_entry.{strategy}")
+    metrics.observe(f"text_entry.{strategy}.ms", (time.perf_counter() - start) * 1000)
+    return strategy
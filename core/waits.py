@@ -0,0 +1,128 @@
+import re
+import time
+import shutil
+import logging
+import platform
+import subprocess
+import pyautogui
+from typing import Callable, List, Optional
+from pydantic import BaseModel
+from .config import Config
+from .metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+# tasklist/pgrep/wmctrl answer in milliseconds; a hung one must not hang the step
+PROBE_TIMEOUT = 5.0
+
+# Screen-settle check (timeout -> settled?), registered by whoever owns the screen grabber
+_screen_settle: Optional[Callable[[float], bool]] = None
+
+def set_screen_settle(fn: Optional[Callable[[float], bool]]):
+    global _screen_settle
+    _screen_settle = fn
+
+class ExecutionProfile(BaseModel):
+    """How desktop actions pace themselves."""
+    name: str
+    move_duration: float   # Seconds for a mouse move
+    type_interval: float   # Seconds between keystrokes
+    adaptive: bool         # End waits on observed conditions instead of sleeping them out
+
+PROFILES = {
+    "human": ExecutionProfile(name="human", move_duration=0.5, type_interval=0.05, adaptive=False),
+    "fast": ExecutionProfile(name="fast", move_duration=0.0, type_interval=0.0, adaptive=True)
+}
+
+def profile() -> ExecutionProfile:
+    selected = PROFILES.get(Config.EXECUTION_PROFILE.lower())
+    if selected is None:
+        logger.warning(f"Unknown execution profile '{Config.EXECUTION_PROFILE}', using human")
+        return PROFILES["human"]
+    return selected
+
+def wait_until(predicate: Callable[[], bool], timeout: float, interval: float = None) -> bool:
+    """Polls predicate until it holds or timeout passes. Returns whether it held."""
+    interval = Config.WAIT_POLL_INTERVAL if interval is None else interval
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            if predicate():
+                return True
+        except Exception as e:
+            logger.debug(f"Wait condition raised: {e}")
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return False
+        time.sleep(min(interval, remaining))
+
+def process_running(name: str) -> bool:
+    name = name.lower().removesuffix(".exe")
+    try:
+        if platform.system() == "Windows":
+            out = subprocess.run(["tasklist", "/fo", "csv", "/nh"], capture_output=True, text=True,
+                                 timeout=PROBE_TIMEOUT).stdout
+            return any(line.lower().lstrip('"').startswith(name) for line in out.splitlines())
+        # Match the process name only (kernel truncates it to 15 chars), not arbitrary command lines
+        return subprocess.run(["pgrep", "-i", re.escape(name[:15])], capture_output=True,
+                              timeout=PROBE_TIMEOUT).returncode == 0
+    except subprocess.TimeoutExpired:
+        logger.warning(f"Process check for {name} timed out")
+        return False
+
+def window_titles() -> Optional[List[str]]:
+    """Titles of top-level windows, or None if this platform can't list them."""
+    if hasattr(pyautogui, "getAllTitles"):
+        return [t for t in pyautogui.getAllTitles() if t]
+    if shutil.which("wmctrl"):
+        try:
+            out = subprocess.run(["wmctrl", "-l"], capture_output=True, text=True, timeout=PROBE_TIMEOUT).stdout
+        except subprocess.TimeoutExpired:
+            logger.warning("wmctrl timed out listing windows")
+            return []
+        return [line.split(None, 3)[3] for line in out.splitlines() if len(line.split(None, 3)) == 4]
+    return None
+
+def window_present(pattern: str) -> Optional[bool]:
+    titles = window_titles()
+    if titles is None:
+        return None
+    regex = re.compile(pattern, re.IGNORECASE)
+    return any(regex.search(title) for title in titles)
+
+def wait_for_process(name: str, timeout: float) -> bool:
+    return wait_until(lambda: process_running(name), timeout)
+
+def wait_for_window(pattern: str, timeout: float) -> bool:
+    """Waits for a window title matching pattern; without a window list, for the screen to settle."""
+    if window_titles() is None:
+        return wait_for_screen_settle(timeout)
+    return wait_until(lambda: window_present(pattern), timeout)
+
+def wait_for_screen_settle(timeout: float) -> bool:
+    """Waits for the screen to stop changing; without a registered check, sleeps timeout out."""
+    if _screen_settle is None:
+        time.sleep(timeout)
+        return False
+    return _screen_settle(timeout)
+
+def settle(upper_bound: float, until: Callable[[float], bool] = None, label: str = "settle") -> float:
+    """
+    A delay that the "fast" profile may cut short. The human profile sleeps
+    upper_bound as before; the fast profile returns once until(timeout)
+    reports its condition met (by default: the screen stopped changing),
+    never later than upper_bound. Returns the seconds actually waited.
+    """
+    start = time.perf_counter()
+    if profile().adaptive:
+        met = (until or wait_for_screen_settle)(upper_bound)
+        if not met:
+            Metrics.get_instance().incr(f"waits.{label}.timeout")
+    else:
+        time.sleep(upper_bound)
+
+    waited = time.perf_counter() - start
+    metrics = Metrics.get_instance()
+    metrics.observe(f"waits.{label}.ms", waited * 1000)
+    metrics.observe("waits.saved_ms", max(0.0, upper_bound - waited) * 1000)
+    return waited
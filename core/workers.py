@@ -0,0 +1,83 @@
+import time
+import signal
+import logging
+import threading
+import multiprocessing
+from typing import Callable, List, Optional
+from .config import Config
+from .metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+def worker_main(index: int, threads: int, stop_event):
+    """Entry point of a worker process: a Coordinator that replies through the outbox."""
+    from .coordinator import Coordinator
+    from .outbox import Outbox
+    from .queue_mgr import CommandQueue
+
+    logging.basicConfig(level=logging.INFO, format=f"%(asctime)s [worker-{index}] %(name)s: %(message)s")
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # The parent decides when to stop
+
+    coordinator = Coordinator(workers=threads)
+    coordinator.set_reply_callback(Outbox.get_instance().reply)
+    coordinator.start()
+    stop_event.wait()
+    coordinator.stop()
+    CommandQueue.get_instance().close()
+
+class WorkerPool:
+    """
+    Runs Coordinators in WORKER_PROCESSES separate processes, all consuming
+    the shared QUEUE_DB. A plan that crashes its process only loses that
+    process: its leased commands are redelivered once the queue notices the
+    owner is gone, and the pool starts a replacement.
+    """
+
+    def __init__(self, processes: int = None, threads: int = None, target: Callable = None):
+        if not Config.QUEUE_DB or not Config.STATE_DB:
+            raise ValueError("Worker processes need QUEUE_DB and STATE_DB set to shared files")
+        self.processes = processes or Config.WORKER_PROCESSES
+        self.threads = threads or Config.COORDINATOR_WORKERS
+        self.target = target or worker_main
+        self.metrics = Metrics.get_instance()
+        self._ctx = multiprocessing.get_context("spawn")  # No inherited locks or SQLite handles
+        self._stop = self._ctx.Event()
+        self._procs: List[Optional[multiprocessing.Process]] = [None] * self.processes
+        self._monitor: Optional[threading.Thread] = None
+
+    def _spawn(self, index: int):
+        proc = self._ctx.Process(
+            target=self.target, args=(index, self.threads, self._stop), name=f"ghostdesk-worker-{index}", daemon=True
+        )
+        proc.start()
+        self._procs[index] = proc
+
+    def start(self):
+        for index in range(self.processes):
+            self._spawn(index)
+        self._monitor = threading.Thread(target=self._supervise, daemon=True)
+        self._monitor.start()
+        logger.info(f"Started {self.processes} worker processes x {self.threads} threads")
+
+    def _supervise(self):
+        while not self._stop.wait(1.0):
+            for index, proc in enumerate(self._procs):
+                if proc is not None and not proc.is_alive() and not self._stop.is_set():
+                    logger.error(f"Worker {index} (pid {proc.pid}) exited with {proc.exitcode}, restarting")
+                    self.metrics.incr("workers.restarted")
+                    self._spawn(index)
+
+    def stop(self, timeout: float = 30.0):
+        self._stop.set()
+        if self._monitor:
+            self._monitor.join()
+        deadline = time.monotonic() + timeout
+        for proc in self._procs:
+            if proc is None:
+                continue
+            proc.join(max(0.0, deadline - time.monotonic()))
+            if proc.is_alive():
+                proc.terminate()
+                proc.join()
+        logger.info("Worker processes stopped.")
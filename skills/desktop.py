@@ -3,6 +3,8 @@ import time
 import pyautogui
 from typing import List, Any
 from .base import BaseSkill, SkillResult
+from ..core.waits import profile
+from ..core.text_entry import type_text
 
 logger = logging.getLogger(__name__)
 pyautogui.FAILSAFE = True
@@ -30,14 +32,16 @@ class DesktopSkill(BaseSkill):
                 if x is None or y is None:
                      return SkillResult(success=False, message="Missing coordinates for CLICK")
                 
-                pyautogui.moveTo(x, y, duration=0.5)
+                pyautogui.moveTo(x, y, duration=profile().move_duration)
                 pyautogui.click()
                 return SkillResult(success=True, message=f"Clicked {x},{y}")
 
             elif action == "TYPE":
                 text = params if isinstance(params, str) else str(params)
-                pyautogui.write(text, interval=0.05)
-                return SkillResult(success=True, message=f"Typed: {text}")
+                hint = context.get("description") if isinstance(context, dict) else None
+                strategy = type_text(text, hint=hint)
+                # Never echo the text: results end up in memory, and it may be a password
+                return SkillResult(success=True, message=f"Typed {len(text)} characters", data={"strategy": strategy})
 
             elif action == "PRESS":
                 key = params if isinstance(params, str) else str(params)
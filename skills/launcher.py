@@ -0,0 +1,244 @@
+import os
+import re
+import glob
+import time
+import shlex
+import difflib
+import logging
+import platform
+import threading
+import subprocess
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+from .base import SkillResult
+from ..core.config import Config
+from ..core.metrics import Metrics
+from ..core.policy import PolicyEngine
+from ..core.waits import settle, window_present, wait_for_window
+
+logger = logging.getLogger(__name__)
+
+# Field codes in desktop entry Exec lines (%f, %U, ...) are placeholders for arguments
+EXEC_FIELD_CODE = re.compile(r"\s*%[a-zA-Z]")
+
+# Kinds that may be matched by a near-miss name. Bare PATH binaries need the
+# exact name: "shutdow" must not turn into /usr/sbin/shutdown.
+FUZZY_KINDS = {"desktop", "shortcut", "bundle"}
+
+class LaunchTarget(BaseModel):
+    """Something the launcher knows how to start."""
+    name: str                  # Display name, also used to spot the window
+    command: List[str]
+    kind: str                  # "path", "desktop", "shortcut" or "bundle"
+
+class AppLauncher:
+    """
+    Starts applications directly instead of driving the OS run dialog.
+    App names resolve through an index of PATH executables and desktop
+    entries (Start Menu shortcuts, .app bundles), built once and refreshed
+    after LAUNCHER_INDEX_TTL or when a name is not found. Only desktop
+    entries match approximately; PATH executables must be named exactly.
+    launch() waits up to LAUNCH_TIMEOUT like any other settle(): the human
+    profile sleeps it out, the fast profile returns once a matching window
+    shows up (or, where windows can't be listed, the screen settles).
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, index_ttl: float = None, timeout: float = None):
+        self.index_ttl = Config.LAUNCHER_INDEX_TTL if index_ttl is None else index_ttl
+        self.timeout = Config.LAUNCH_TIMEOUT if timeout is None else timeout
+        self.metrics = Metrics.get_instance()
+        self._index: Dict[str, LaunchTarget] = {}
+        self._built_at = 0.0
+        self._index_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = AppLauncher()
+        return cls._instance
+
+    @staticmethod
+    def _key(name: str) -> str:
+        name = name.strip().lower()
+        return name[:-4] if name.endswith((".exe", ".app", ".lnk")) else name
+
+    # --- Index ---
+
+    def _scan_path(self, index: Dict[str, LaunchTarget]):
+        windows = platform.system() == "Windows"
+        exts = {e.lower() for e in os.environ.get("PATHEXT", ".EXE;.BAT;.CMD").split(";")} if windows else None
+        for directory in os.environ.get("PATH", "").split(os.pathsep):
+            try:
+                entries = os.scandir(directory)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if windows and os.path.splitext(entry.name)[1].lower() not in exts:
+                        continue
+                    if not windows and not os.access(entry.path, os.X_OK):
+                        continue
+                    key = self._key(os.path.splitext(entry.name)[0] if windows else entry.name)
+                    # Earlier PATH entries win, as in the shell
+                    index.setdefault(key, LaunchTarget(name=key, command=[entry.path], kind="path"))
+
+    def _scan_desktop_entries(self, index: Dict[str, LaunchTarget]):
+        dirs = [os.path.expanduser("~/.local/share/applications")]
+        dirs += [os.path.join(d, "applications") for d in os.environ.get("XDG_DATA_DIRS", "/usr/local/share:/usr/share").split(":")]
+        dirs.append("/var/lib/flatpak/exports/share/applications")
+        for path in (p for d in dirs for p in glob.glob(os.path.join(d, "*.desktop"))):
+            fields = {}
+            try:
+                with open(path, encoding="utf-8", errors="replace") as f:
+                    in_entry = False
+                    for line in f:
+                        line = line.strip()
+                        if line.startswith("["):
+                            in_entry = line == "[Desktop Entry]"
+                        elif in_entry and "=" in line:
+                            key, value = line.split("=", 1)
+                            fields.setdefault(key.strip(), value.strip())
+            except OSError:
+                continue
+            if fields.get("NoDisplay") == "true" or fields.get("Type", "Application") != "Application" or "Exec" not in fields:
+                continue
+            try:
+                command = shlex.split(EXEC_FIELD_CODE.sub("", fields["Exec"]))
+            except ValueError:
+                continue
+            if not command:
+                continue
+            name = fields.get("Name", os.path.basename(path)[:-8])
+            target = LaunchTarget(name=name, command=command, kind="desktop")
+            # Desktop entries beat bare PATH hits: they carry the right arguments
+            index[self._key(name)] = target
+            index[self._key(os.path.basename(path)[:-8].split(".")[-1])] = target
+
+    def _scan_shortcuts(self, index: Dict[str, LaunchTarget]):
+        roots = [os.path.join(os.environ.get(v, ""), "Microsoft", "Windows", "Start Menu", "Programs")
+                 for v in ("ProgramData", "APPDATA") if os.environ.get(v)]
+        for path in (p for r in roots for p in glob.glob(os.path.join(r, "**", "*.lnk"), recursive=True)):
+            name = os.path.basename(path)[:-4]
+            index.setdefault(self._key(name), LaunchTarget(name=name, command=[path], kind="shortcut"))
+
+    def _scan_bundles(self, index: Dict[str, LaunchTarget]):
+        for path in glob.glob("/Applications/*.app") + glob.glob(os.path.expanduser("~/Applications/*.app")):
+            name = os.path.basename(path)[:-4]
+            index.setdefault(self._key(name), LaunchTarget(name=name, command=["open", "-a", path], kind="bundle"))
+
+    def refresh(self) -> int:
+        start = time.perf_counter()
+        index: Dict[str, LaunchTarget] = {}
+        self._scan_path(index)
+        system = platform.system()
+        if system == "Windows":
+            self._scan_shortcuts(index)
+        elif system == "Darwin":
+            self._scan_bundles(index)
+        else:
+            self._scan_desktop_entries(index)
+
+        with self._index_lock:
+            self._index = index
+            self._built_at = time.monotonic()
+        elapsed = (time.perf_counter() - start) * 1000
+        self.metrics.observe("launcher.index_ms", elapsed)
+        logger.info(f"App index: {len(index)} entries in {elapsed:.0f} ms")
+        return len(index)
+
+    def _lookup(self, key: str) -> Optional[LaunchTarget]:
+        with self._index_lock:
+            if key in self._index:
+                return self._index[key]
+            fuzzy = [k for k, target in self._index.items() if target.kind in FUZZY_KINDS]
+            close = difflib.get_close_matches(key, fuzzy, n=1, cutoff=0.85)
+            return self._index[close[0]] if close else None
+
+    def resolve(self, app_name: str) -> Optional[LaunchTarget]:
+        key = self._key(app_name)
+        stale = not self._built_at or time.monotonic() - self._built_at > self.index_ttl
+        if stale:
+            self.refresh()
+        target = self._lookup(key)
+        if target is None and not stale and time.monotonic() - self._built_at > 5.0:
+            # Maybe installed since the last scan
+            self.refresh()
+            target = self._lookup(key)
+        self.metrics.incr("launcher.resolved" if target else "launcher.unresolved")
+        return target
+
+    # --- Launch ---
+
+    def _spawn(self, target: LaunchTarget) -> Optional[subprocess.Popen]:
+        if target.kind == "shortcut":
+            os.startfile(target.command[0])
+            return None
+        return subprocess.Popen(target.command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL, start_new_session=True)
+
+    def _ready(self, target: LaunchTarget, proc: Optional[subprocess.Popen], timeout: float) -> bool:
+        if proc is not None:
+            # A quick non-zero exit is a failed launch; zero usually means it handed off to a running instance
+            try:
+                if proc.wait(timeout=0.05) != 0:
+                    return False
+            except subprocess.TimeoutExpired:
+                pass
+
+        names = {target.name, os.path.basename(target.command[0])}
+        pattern = "|".join(re.escape(n) for n in names if n)
+        seen = []
+
+        def until(t: float) -> bool:
+            seen.append(wait_for_window(pattern, t))
+            return seen[-1]
+
+        settle(timeout, until, label="app_launch")
+        # The human profile slept instead of watching; look once afterwards
+        return seen[-1] if seen else bool(window_present(pattern))
+
+    def _escalates(self, app_name: str, target: LaunchTarget) -> bool:
+        """True if a name that passed policy resolved to a critical app it doesn't name."""
+        resolved = f"{target.name} {os.path.basename(target.command[0])}"
+        return PolicyEngine.is_critical_app(resolved) and not PolicyEngine.is_critical_app(app_name)
+
+    def launch(self, app_name: str, timeout: float = None) -> Optional[SkillResult]:
+        """
+        Starts app_name directly. Returns None if the name can't be resolved,
+        so callers can fall back to another method.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        target = self.resolve(app_name)
+        if target is None:
+            return None
+        if self._escalates(app_name, target):
+            # Policy approved the requested name, not what it resolved to
+            self.metrics.incr("launcher.refused")
+            logger.warning(f"Refusing to launch {target.command[0]} for '{app_name}'")
+            return SkillResult(success=False, message=f"'{app_name}' resolves to {target.name}, which is not allowed")
+
+        try:
+            proc = self._spawn(target)
+        except OSError as e:
+            self.metrics.incr("launcher.failed")
+            return SkillResult(success=False, message=f"Could not start {target.name}: {e}")
+
+        ready = self._ready(target, proc, timeout)
+        elapsed = (time.perf_counter() - start) * 1000
+        if proc is not None and proc.poll() not in (None, 0):
+            self.metrics.incr("launcher.failed")
+            return SkillResult(success=False, message=f"{target.name} exited with code {proc.returncode}")
+
+        self.metrics.observe("launcher.launch_ms", elapsed)
+        self.metrics.incr("launcher.ready" if ready else "launcher.timeout")
+        state = "ready" if ready else "started, readiness not confirmed"
+        logger.info(f"Launched {target.name} via {target.kind} in {elapsed:.0f} ms ({state})")
+        return SkillResult(
+            success=True,
+            message=f"Launched {target.name} ({state})",
+            data={"pid": proc.pid if proc else None, "ready": ready, "ms": elapsed}
+        )
@@ -4,6 +4,8 @@ import platform
 import pyautogui
 from typing import List, Any
 from .base import BaseSkill, SkillResult
+from .launcher import AppLauncher
+from ..core.waits import settle, wait_for_window, wait_for_process
 
 logger = logging.getLogger(__name__)
 
@@ -22,12 +24,17 @@ class SystemSkill(BaseSkill):
         try:
             if action == "OPEN_APP":
                 app_name = str(params)
-                # Method 1: Win+R (Universalish)
+                # Method 1: Direct spawn from the app index
+                launched = AppLauncher.get_instance().launch(app_name)
+                if launched:
+                    return launched
+
+                # Method 2: Win+R (Universalish)
                 pyautogui.hotkey('win', 'r')
-                pyautogui.sleep(0.5)
+                settle(0.5, lambda t: wait_for_window(r"^run$", t), label="run_dialog")
                 pyautogui.write(app_name)
                 pyautogui.press('enter')
-                pyautogui.sleep(2.0)
+                settle(2.0, lambda t: wait_for_process(app_name, t), label="app_launch")
                 return SkillResult(success=True, message=f"Launched {app_name}")
             
             return SkillResult(success=False, message=f"Action {action} not supported by SystemSkill")
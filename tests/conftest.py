@@ -0,0 +1,20 @@
+"""
+Unit tests for the components that need neither a desktop nor a model.
+Run from the directory that contains the ghostdesk package:
+
+    python -m pytest ghostdesk/tests
+"""
+import itertools
+import pytest
+from ghostdesk.core.types import UserCommand
+
+_message_ids = itertools.count(1)
+
+
+@pytest.fixture
+def make_command():
+    def make(text: str = "open notepad", sender_id: str = "alice", platform: str = "telegram",
+             message_id: str = None) -> UserCommand:
+        return UserCommand(raw_text=text, sender_id=sender_id, platform=platform,
+                           message_id=message_id or str(next(_message_ids)))
+    return make
@@ -0,0 +1,97 @@
+import pytest
+from ghostdesk.core.config import Config
+from ghostdesk.core.admission import Admission, AdmissionController, TokenBucket
+
+
+class _Queue:
+    def __init__(self, depth: int = 0):
+        self.depth = depth
+
+    def qsize(self) -> int:
+        return self.depth
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(Config, "ADMISSION_SENDER_RATE", 1.0)
+    monkeypatch.setattr(Config, "ADMISSION_SENDER_BURST", 2.0)
+    monkeypatch.setattr(Config, "ADMISSION_PLATFORM_RATE", 100.0)
+    monkeypatch.setattr(Config, "ADMISSION_PLATFORM_BURST", 100.0)
+    monkeypatch.setattr(Config, "QUEUE_MAX_DEPTH", 10)
+
+
+def test_bucket_starts_full_and_drains():
+    bucket = TokenBucket(rate=1.0, burst=2.0)
+    now = bucket.updated
+    for _ in range(2):
+        assert bucket.available(now)
+        bucket.take()
+    assert not bucket.available(now)
+
+
+def test_bucket_refills_at_rate_up_to_burst():
+    bucket = TokenBucket(rate=2.0, burst=3.0)
+    now = bucket.updated
+    for _ in range(3):
+        bucket.take()
+    assert not bucket.available(now + 0.4)
+    assert bucket.available(now + 0.5)
+    assert bucket.full(now + 100)
+    assert bucket.tokens == 3.0
+
+
+def test_sender_is_rate_limited_after_burst(limits, make_command):
+    admission = AdmissionController(_Queue())
+    assert admission.admit(make_command(sender_id="alice")) == Admission.ACCEPT
+    assert admission.admit(make_command(sender_id="alice")) == Admission.ACCEPT
+    assert admission.admit(make_command(sender_id="alice")) == Admission.RATE_LIMITED
+    # Other senders have their own bucket
+    assert admission.admit(make_command(sender_id="bob")) == Admission.ACCEPT
+
+
+def test_platform_bucket_caps_all_senders(limits, monkeypatch, make_command):
+    monkeypatch.setattr(Config, "ADMISSION_PLATFORM_BURST", 2.0)
+    monkeypatch.setattr(Config, "ADMISSION_PLATFORM_RATE", 0.001)
+    admission = AdmissionController(_Queue())
+    assert admission.admit(make_command(sender_id="a")) == Admission.ACCEPT
+    assert admission.admit(make_command(sender_id="b")) == Admission.ACCEPT
+    assert admission.admit(make_command(sender_id="c")) == Admission.RATE_LIMITED
+    assert admission.admit(make_command(sender_id="c", platform="cli")) == Admission.ACCEPT
+
+
+def test_resubmitted_message_is_a_duplicate(limits, make_command):
+    admission = AdmissionController(_Queue())
+    command = make_command(message_id="77")
+    assert admission.admit(command) == Admission.ACCEPT
+    assert admission.admit(make_command(message_id="77")) == Admission.DUPLICATE
+    assert admission.reply_for(Admission.DUPLICATE) is None
+    # Same message id from someone else is a different message
+    assert admission.admit(make_command(sender_id="bob", message_id="77")) == Admission.ACCEPT
+
+
+def test_rejected_message_is_not_remembered_as_seen(limits, make_command):
+    queue = _Queue(depth=10)
+    admission = AdmissionController(queue)
+    assert admission.admit(make_command(message_id="5")) == Admission.SHED
+    queue.depth = 0
+    assert admission.admit(make_command(message_id="5")) == Admission.ACCEPT
+
+
+def test_dedup_entries_expire(limits, monkeypatch, make_command):
+    monkeypatch.setattr(Config, "ADMISSION_DEDUP_TTL", 0.0)
+    admission = AdmissionController(_Queue())
+    assert admission.admit(make_command(message_id="9")) == Admission.ACCEPT
+    assert admission.admit(make_command(message_id="9")) == Admission.ACCEPT
+
+
+def test_full_queue_sheds_all_but_approvals(limits, make_command):
+    admission = AdmissionController(_Queue(depth=10))
+    assert admission.admit(make_command("open notepad")) == Admission.SHED
+    assert admission.admit(make_command("APPROVE 1234")) == Admission.ACCEPT
+
+
+def test_approvals_skip_the_rate_limit(limits, make_command):
+    admission = AdmissionController(_Queue())
+    for _ in range(2):
+        admission.admit(make_command(sender_id="alice"))
+    assert admission.admit(make_command("APPROVE 1234", sender_id="alice")) == Admission.ACCEPT
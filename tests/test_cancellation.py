@@ -0,0 +1,111 @@
+import time
+import threading
+import pytest
+from ghostdesk.core.cancellation import (
+    CancellationRegistry, CancellationToken, Cancelled, handle_stop, is_stop, sender_key
+)
+
+
+@pytest.fixture
+def registry():
+    return CancellationRegistry()
+
+
+def test_stop_words(make_command):
+    assert is_stop("stop") and is_stop(" Cancel! ") and is_stop("ABORT.")
+    assert not is_stop("stop the music")
+    assert sender_key(make_command(sender_id="alice", platform="cli")) == "cli:alice"
+
+
+def test_cancel_sets_reason_once():
+    token = CancellationToken()
+    assert not token.is_set()
+    token.cancel("stop")
+    token.cancel("deadline")
+    assert token.is_set()
+    assert token.reason == "stop"
+    with pytest.raises(Cancelled):
+        token.check()
+
+
+def test_deadline_cancels_and_wait_ends_there():
+    token = CancellationToken(timeout=0.05)
+    start = time.monotonic()
+    assert token.wait(5.0)
+    assert time.monotonic() - start < 1.0
+    assert token.reason == "deadline"
+
+
+def test_wait_returns_early_on_cancel():
+    token = CancellationToken()
+    threading.Timer(0.05, token.cancel, args=("stop",)).start()
+    start = time.monotonic()
+    assert token.wait(5.0)
+    assert time.monotonic() - start < 1.0
+
+
+def test_children_follow_their_parent():
+    parent = CancellationToken(timeout=60)
+    child = parent.child(timeout=600)
+    assert child.deadline == parent.deadline  # Never outlives the parent
+
+    parent.cancel("stop")
+    assert child.is_set() and child.reason == "stop"
+    assert child.cancelled_at == parent.cancelled_at
+    # Created after the fact: cancelled from the start
+    assert parent.child().is_set()
+
+
+def test_child_deadline_leaves_parent_running():
+    parent = CancellationToken()
+    child = parent.child(timeout=0.01)
+    time.sleep(0.02)
+    assert child.is_set()
+    assert not parent.is_set()
+
+
+def test_registry_cancels_the_senders_tokens(registry):
+    alice, bob = CancellationToken(), CancellationToken()
+    registry.register("telegram:alice", alice)
+    registry.register("telegram:bob", bob)
+
+    assert registry.cancel("telegram:alice") == 1
+    assert alice.is_set() and alice.reason == "stop"
+    assert not bob.is_set()
+
+
+def test_unregistered_token_is_left_alone(registry):
+    token = CancellationToken()
+    registry.register("telegram:alice", token)
+    registry.unregister("telegram:alice", token)
+    assert registry.cancel("telegram:alice") == 0
+    assert not token.is_set()
+
+
+def test_stop_before_registration_still_cancels(registry):
+    # The command was sent, then STOP arrived before its token was registered
+    sent = time.time()
+    registry.cancel("telegram:alice")
+    token = CancellationToken()
+    registry.register("telegram:alice", token, since=sent)
+    assert token.is_set() and token.reason == "stop"
+
+
+def test_stop_does_not_cancel_later_commands(registry):
+    registry.cancel("telegram:alice")
+    time.sleep(0.01)
+    token = CancellationToken()
+    registry.register("telegram:alice", token, since=time.time())
+    assert not token.is_set()
+
+
+def test_handle_stop_drops_waiting_commands(make_command):
+    class Queue:
+        def discard(self, sender):
+            self.discarded = sender
+            return 2
+
+    queue = Queue()
+    reply = handle_stop(make_command("STOP", sender_id="zoe"), queue)
+    assert queue.discarded == "telegram:zoe"
+    assert "2" in reply
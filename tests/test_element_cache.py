@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from PIL import Image
+from ghostdesk.agents.element_cache import ElementLocationCache
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    return Image.fromarray(rng.integers(0, 255, (400, 600, 3), dtype=np.uint8))
+
+
+@pytest.fixture
+def cache():
+    return ElementLocationCache(max_entries=8, max_distance=24, region_size=80, name="test_cache")
+
+
+def test_lookup_while_region_unchanged(cache, frame):
+    cache.store("Save Button", frame, (200, 100), (200, 100))
+    assert cache.lookup("save  button", frame) == (200, 100)
+
+
+def test_region_change_drops_entry(cache, frame):
+    cache.store("Save Button", frame, (200, 100), (200, 100))
+    changed = np.asarray(frame).copy()
+    changed[60:140, 160:240] = 255 - changed[60:140, 160:240]
+    assert cache.lookup("Save Button", Image.fromarray(changed)) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_invalidate_forgets_every_location_of_element(cache, frame):
+    cache.store("Save Button", frame, (200, 100), (200, 100))
+    cache.store("Save Button", frame, (400, 300), (400, 300))
+    cache.store("Cancel", frame, (100, 300), (100, 300))
+    cache.invalidate("save button")
+    assert cache.lookup("Save Button", frame) is None
+    assert cache.lookup("Cancel", frame) == (100, 300)
+
+
+def test_oldest_entry_evicted(frame):
+    cache = ElementLocationCache(max_entries=2, region_size=80, name="test_cache")
+    for i in range(3):
+        cache.store(f"item {i}", frame, (100 + i * 100, 100), (100 + i * 100, 100))
+    assert cache.lookup("item 0", frame) is None
+    assert cache.lookup("item 2", frame) == (300, 100)
@@ -0,0 +1,37 @@
+import pytest
+from ghostdesk.core.config import Config
+from ghostdesk.core.identity import IdentityManager, Role
+
+
+@pytest.fixture
+def state_db(tmp_path):
+    return str(tmp_path / "state.db")
+
+
+def test_allowed_users_become_admin(state_db, monkeypatch):
+    monkeypatch.setattr(Config, "ALLOWED_USERS", ["alice", "bob"])
+    identities = IdentityManager(state_db)
+    assert identities.get_identity("alice").role == Role.ADMIN
+    assert identities.get_identity("mallory") is None
+
+
+def test_removed_user_loses_access_after_restart(state_db, monkeypatch):
+    monkeypatch.setattr(Config, "ALLOWED_USERS", ["alice", "bob"])
+    IdentityManager(state_db)
+    monkeypatch.setattr(Config, "ALLOWED_USERS", ["alice"])
+    identities = IdentityManager(state_db)
+    assert identities.get_identity("bob") is None
+    assert identities.get_identity("alice").role == Role.ADMIN
+
+
+def test_empty_allow_list_revokes_everyone(state_db, monkeypatch):
+    monkeypatch.setattr(Config, "ALLOWED_USERS", ["alice"])
+    IdentityManager(state_db)
+    monkeypatch.setattr(Config, "ALLOWED_USERS", [])
+    assert IdentityManager(state_db).get_identity("alice") is None
+
+
+def test_role_change_survives_restart(state_db, monkeypatch):
+    monkeypatch.setattr(Config, "ALLOWED_USERS", ["alice"])
+    IdentityManager(state_db).set_role("alice", Role.EMPLOYEE)
+    assert IdentityManager(state_db).get_identity("alice").role == Role.EMPLOYEE
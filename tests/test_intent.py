@@ -0,0 +1,32 @@
+import pytest
+from ghostdesk.core.intent import RuleIntentClassifier
+
+
+@pytest.fixture
+def rules():
+    return RuleIntentClassifier()
+
+
+@pytest.mark.parametrize("text", [
+    "open notepad", "press enter", "type 'hello' in notepad", "google for cheap flights",
+    "delete temp.txt", "can you open spotify", "click the submit button",
+])
+def test_clear_tasks_are_confident(rules, text):
+    assert rules.classify(text) == ("TASK", 0.9)
+
+
+@pytest.mark.parametrize("text", [
+    "Type of leave allowed in the handbook", "Press release dates", "google is down lol",
+    "open source is the best", "Delete key on my keyboard is stuck", "make me laugh",
+])
+def test_noun_led_messages_are_left_to_later_tiers(rules, text):
+    _, confidence = rules.classify(text)
+    assert confidence < 0.8
+
+
+def test_document_question_is_query(rules):
+    assert rules.classify("what does the travel policy say about per diem?") == ("QUERY", 0.9)
+
+
+def test_greeting_is_chat(rules):
+    assert rules.classify("hello there!") == ("CHAT", 0.95)
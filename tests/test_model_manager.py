@@ -0,0 +1,79 @@
+import pytest
+from ghostdesk.core.config import Config
+from ghostdesk.core.model_manager import ModelManager, ModelState, models_for
+
+
+class FakeOllama:
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.loaded = set()
+        self.loads = []
+
+    def load_model(self, model, keep_alive=None):
+        self.loads.append(model)
+        if model in self.fail:
+            return False
+        self.loaded.add(f"{model}:latest")
+        return True
+
+    def loaded_models(self):
+        return set(self.loaded)
+
+
+@pytest.fixture(autouse=True)
+def fast_warm_up(monkeypatch):
+    monkeypatch.setattr(Config, "OLLAMA_WARM_RETRY", 0)
+    monkeypatch.setattr(Config, "OLLAMA_WARM_ATTEMPTS", 3)
+    monkeypatch.setattr(Config, "OLLAMA_PS_INTERVAL", 0)
+
+
+@pytest.fixture
+def state_db(tmp_path):
+    return str(tmp_path / "state.db")
+
+
+def manager(state_db, ollama):
+    models = ModelManager(state_db)
+    models.llm = ollama
+    return models
+
+
+def test_failed_model_stops_holding_traffic_back(state_db):
+    ollama = FakeOllama(fail={"llama3.2-vision"})
+    models = manager(state_db, ollama)
+    models.warm_up_async(["llama3.2", "llama3.2-vision"]).join()
+    assert ollama.loads.count("llama3.2-vision") == 3
+    assert models.status() == {"llama3.2": "READY", "llama3.2-vision": "FAILED"}
+    assert models.check(["llama3.2", "llama3.2-vision"]) == (True, ["llama3.2-vision"])
+
+
+def test_gate_only_waits_for_models_the_command_needs(state_db, make_command):
+    models = manager(state_db, FakeOllama())
+    models._set("llama3.2", ModelState.READY)
+    models._set("llama3.2-vision", ModelState.WARMING)
+    assert models.is_ready(models_for(make_command("open notepad")))
+    assert models.is_ready(models_for(make_command("APPROVE 1234")))
+    assert not models.is_ready()
+
+
+def test_readiness_is_shared_across_processes(state_db):
+    worker = manager(state_db, FakeOllama())
+    worker.warm_up_async(["llama3.2"]).join()
+    gateway = manager(state_db, worker.llm)
+    assert gateway.status() == {"llama3.2": "READY"}
+
+
+def test_model_being_warmed_elsewhere_is_not_loaded_twice(state_db):
+    ollama = FakeOllama()
+    manager(state_db, ollama)._set("llama3.2", ModelState.WARMING)
+    assert not manager(state_db, ollama).warm_up_async(["llama3.2"]).is_alive()
+    assert ollama.loads == []
+
+
+def test_unloaded_model_reported_cold(state_db):
+    ollama = FakeOllama()
+    models = manager(state_db, ollama)
+    models.warm_up_async(["llama3.2"]).join()
+    ollama.loaded.clear()
+    assert models.status() == {"llama3.2": "COLD"}
+    assert models.is_ready(["llama3.2"])
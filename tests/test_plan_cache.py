@@ -0,0 +1,93 @@
+from ghostdesk.core.types import Step
+from ghostdesk.agents.plan_cache import PlanCache, normalize_intent
+from ghostdesk.agents.planner import SUPPORTED_ACTIONS
+
+
+def _cache():
+    return PlanCache("test", SUPPORTED_ACTIONS, max_entries=8, db_path="")
+
+
+def _search_plan(term):
+    return [
+        Step(description="Open Google Chrome", action_type="OPEN_APP", value="chrome.exe"),
+        Step(description="Focus search bar", action_type="CLICK", target_element="Address Bar"),
+        Step(description=f"Search for {term}", action_type="TYPE", value=term),
+        Step(description="Press Enter", action_type="PRESS", value="enter"),
+    ]
+
+
+def test_normalize_replaces_the_slot_span_only():
+    key, slots = normalize_intent("Open Chrome and search for e")
+    assert key == "open chrome and search for {term0}"
+    assert slots == {"term0": "e"}
+
+
+def test_normalize_slots_and_trailing_punctuation():
+    key, slots = normalize_intent('Write "buy milk" to todo.txt!')
+    assert key == 'write "{quoted0}" to {file0}'
+    assert slots == {"quoted0": "buy milk", "file0": "todo.txt"}
+
+
+def test_same_shape_reuses_template_with_new_values():
+    cache = _cache()
+    assert cache.store("Open Chrome and search for Cats", _search_plan("Cats"))
+
+    plan = cache.lookup("open chrome and search for dogs")
+    assert [step.value for step in plan] == ["chrome.exe", None, "dogs", "enter"]
+    assert plan[1].target_element == "Address Bar"
+    assert plan[2].description == "Search for dogs"
+
+
+def test_value_is_substituted_on_word_boundaries_only():
+    cache = _cache()
+    plan = _search_plan("car")
+    plan[0].description = "Open the carousel app"
+    assert cache.store("open chrome and search for car", plan)
+
+    filled = cache.lookup("open chrome and search for boats")
+    assert filled[0].description == "Open the carousel app"
+    assert filled[2].value == "boats"
+
+
+def test_value_inside_element_name_is_not_cached():
+    # "Address Bar" must never become "Address {term0}"
+    cache = _cache()
+    assert not cache.store("open chrome and search for bar", _search_plan("bar"))
+    assert cache.lookup("open chrome and search for cats") is None
+
+
+def test_value_outside_its_slot_is_not_cached():
+    cache = _cache()
+    assert not cache.store("open chrome and search for chrome", _search_plan("chrome"))
+
+
+def test_plan_without_the_slot_value_is_not_cached():
+    cache = _cache()
+    plan = _search_plan("Cats")
+    plan[2].value = "kittens"
+    plan[2].description = "Type the query"
+    assert not cache.store("open chrome and search for Cats", plan)
+
+
+def test_unknown_actions_and_context_dependent_requests_are_not_cached():
+    cache = _cache()
+    assert not cache.store("format the disk", [Step(description="x", action_type="FORMAT_DISK")])
+    assert not cache.store("do that again", _search_plan("Cats"))
+    assert cache.lookup("do that again") is None
+
+
+def test_templates_are_evicted_least_recently_used_first():
+    cache = PlanCache("test", SUPPORTED_ACTIONS, max_entries=2, db_path="")
+    for app in ("notepad", "calculator", "paint"):
+        assert cache.store(f"launch {app} now", [Step(description="Launch", action_type="OPEN_APP", value=app)])
+    assert cache.lookup("launch notepad now") is None
+    assert cache.lookup("launch paint now")[0].value == "paint"
+
+
+def test_templates_persist_per_fingerprint(tmp_path):
+    db = str(tmp_path / "plans.db")
+    assert PlanCache("v1", SUPPORTED_ACTIONS, db_path=db).store("open chrome and search for Cats", _search_plan("Cats"))
+
+    assert PlanCache("v1", SUPPORTED_ACTIONS, db_path=db).lookup("open chrome and search for dogs")[2].value == "dogs"
+    # Another planner prompt/model drops them
+    assert PlanCache("v2", SUPPORTED_ACTIONS, db_path=db).lookup("open chrome and search for dogs") is None
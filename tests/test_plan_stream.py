@@ -0,0 +1,66 @@
+import json
+from ghostdesk.agents.plan_stream import IncrementalStepParser
+
+PLAN = [
+    {"description": "Open {braces} in a string", "action_type": "OPEN_APP", "value": "notepad"},
+    {"description": "Type a quote \" and a brace }", "action_type": "TYPE", "value": "hi"},
+    {"description": "Press Enter", "action_type": "PRESS", "value": "enter"},
+]
+
+
+def _feed_in_chunks(parser, text, size):
+    steps = []
+    for i in range(0, len(text), size):
+        steps.extend(parser.feed(text[i:i + size]))
+    return steps
+
+
+def test_steps_come_out_as_each_object_closes():
+    parser = IncrementalStepParser()
+    text = json.dumps(PLAN)
+    first_end = text.index("}, {") + 1
+
+    assert parser.feed(text[:first_end - 1]) == []
+    assert parser.feed(text[first_end - 1:first_end]) == [PLAN[0]]
+    assert parser.feed(text[first_end:]) == PLAN[1:]
+    assert parser.close()
+
+
+def test_chunk_boundaries_do_not_matter():
+    text = json.dumps(PLAN)
+    for size in (1, 2, 7, len(text)):
+        parser = IncrementalStepParser()
+        assert _feed_in_chunks(parser, text, size) == PLAN
+        assert parser.close()
+
+
+def test_wrapper_object_and_markdown_fences():
+    parser = IncrementalStepParser()
+    text = "```json\n" + json.dumps({"steps": PLAN}) + "\n```"
+    assert _feed_in_chunks(parser, text, 5) == PLAN
+    assert parser.close()
+
+
+def test_objects_without_action_type_are_not_steps():
+    parser = IncrementalStepParser()
+    assert parser.feed('[{"note": "thinking"}, {"action_type": "PRESS", "value": "esc"}]') == [
+        {"action_type": "PRESS", "value": "esc"}
+    ]
+    assert parser.close()
+
+
+def test_truncated_stream_drops_the_partial_step():
+    parser = IncrementalStepParser()
+    text = json.dumps(PLAN)
+    cut = text.index('"action_type": "PRESS"')
+    assert _feed_in_chunks(parser, text[:cut], 3) == PLAN[:2]
+    assert parser.truncated
+    assert not parser.close()
+
+
+def test_malformed_step_is_skipped_and_reported():
+    parser = IncrementalStepParser()
+    steps = parser.feed('[{"action_type": "TYPE", "value": oops}, {"action_type": "PRESS", "value": "enter"}]')
+    assert steps == [{"action_type": "PRESS", "value": "enter"}]
+    assert parser.malformed == 1
+    assert not parser.close()
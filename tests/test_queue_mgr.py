@@ -0,0 +1,126 @@
+import pytest
+from ghostdesk.core.queue_mgr import CommandQueue, Priority, classify
+
+
+@pytest.fixture
+def queue(tmp_path):
+    q = CommandQueue(db_path=str(tmp_path / "queue.db"), flush_interval=60, max_attempts=2)
+    yield q
+    q.close()
+
+
+def _crash(queue):
+    """What a worker dying mid-command leaves behind: its leases, owned by nobody alive."""
+    with queue._db_lock:
+        queue._db.execute("UPDATE commands SET owner = 'gone:1' WHERE state = 'leased'")
+    queue._leases.clear()
+
+
+def test_classify(make_command):
+    assert classify(make_command("APPROVE 1234")) == Priority.APPROVAL
+    assert classify(make_command("briefing", platform="internal")) == Priority.SCHEDULED
+    assert classify(make_command("open notepad")) == Priority.INTERACTIVE
+
+
+def test_leases_by_priority_then_arrival(queue, make_command):
+    queue.put(make_command("scheduled", sender_id="cron", platform="internal"))
+    queue.put(make_command("first", sender_id="alice"))
+    queue.put(make_command("second", sender_id="bob"))
+    queue.put(make_command("APPROVE 42", sender_id="carol"))
+
+    order = []
+    while True:
+        command = queue.get(block=False)
+        if command is None:
+            break
+        order.append(command.raw_text)
+        queue.task_done(command)
+    assert order == ["APPROVE 42", "first", "second", "scheduled"]
+    assert queue.qsize() == 0
+
+
+def test_one_lease_per_sender_until_acked(queue, make_command):
+    first, second = make_command("one"), make_command("two")
+    queue.put(first)
+    queue.put(second)
+
+    leased = queue.get(block=False)
+    assert leased.raw_text == "one"
+    assert queue.get(block=False) is None  # Would run out of order next to "one"
+    queue.task_done(leased)
+    assert queue.get(block=False).raw_text == "two"
+
+
+def test_get_times_out_when_empty(queue):
+    assert queue.get(timeout=0.05) is None
+
+
+def test_unacked_lease_of_a_dead_owner_is_redelivered(queue, make_command):
+    queue.put(make_command("open notepad"))
+    assert queue.get(block=False) is not None
+    assert queue.qsize() == 0
+
+    _crash(queue)
+    assert queue.recover() == 1
+    redelivered = queue.get(block=False)
+    assert redelivered.raw_text == "open notepad"
+
+
+def test_live_lease_is_not_recovered(queue, make_command):
+    queue.put(make_command())
+    assert queue.get(block=False) is not None
+    assert queue.recover() == 0
+
+
+def test_commands_survive_reopening(tmp_path, make_command):
+    path = str(tmp_path / "queue.db")
+    q = CommandQueue(db_path=path, flush_interval=60)
+    q.put(make_command("remember me"))
+    q.close()
+
+    q = CommandQueue(db_path=path)
+    try:
+        assert q.get(block=False).raw_text == "remember me"
+    finally:
+        q.close()
+
+
+def test_command_is_dead_lettered_after_max_attempts(queue, make_command):
+    queue.put(make_command("poison"))
+    for _ in range(queue.max_attempts):
+        assert queue.get(block=False).raw_text == "poison"
+        _crash(queue)
+        queue.recover()
+
+    assert queue.get(block=False) is None
+    with queue._db_lock:
+        states = queue._db.execute("SELECT state FROM commands").fetchall()
+    assert states == [("dead",)]
+
+
+def test_discard_drops_waiting_commands_only(queue, make_command):
+    queue.put(make_command("running", sender_id="alice"))
+    running = queue.get(block=False)
+    queue.put(make_command("waiting", sender_id="alice"))
+    queue.put(make_command("other", sender_id="bob"))
+
+    assert queue.discard("telegram:alice") == 1
+    queue.task_done(running)
+    assert queue.get(block=False).raw_text == "other"
+
+
+def test_rows_without_sender_are_backfilled(tmp_path, make_command):
+    path = str(tmp_path / "queue.db")
+    q = CommandQueue(db_path=path, flush_interval=60)
+    q.put(make_command("old"))
+    q.flush()
+    with q._db_lock:
+        q._db.execute("UPDATE commands SET sender = NULL")
+    q.close()
+
+    q = CommandQueue(db_path=path)
+    try:
+        with q._db_lock:
+            assert q._db.execute("SELECT sender FROM commands").fetchall() == [("telegram:alice",)]
+    finally:
+        q.close()
@@ -0,0 +1,46 @@
+import os
+import numpy as np
+import pytest
+from PIL import Image
+from ghostdesk.agents.template_match import TemplateMatcher
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(1)
+    return Image.fromarray(rng.integers(0, 255, (480, 640, 3), dtype=np.uint8))
+
+
+@pytest.fixture
+def matcher(tmp_path):
+    return TemplateMatcher(template_dir=str(tmp_path / "templates"), template_size=64, scale=4,
+                           threshold=0.9, margin=0.05)
+
+
+def test_nothing_learned_nothing_matched(matcher, frame):
+    assert matcher.match("Save Button", frame) is None
+    assert not os.path.exists(matcher.template_dir)
+
+
+def test_learned_template_found_again(matcher, frame):
+    matcher.learn("Save Button", frame, (300, 200))
+    x, y, score = matcher.match("save button", frame)
+    assert abs(x - 300) <= 1 and abs(y - 200) <= 1 and score > 0.9
+    assert len(os.listdir(matcher.template_dir)) == 1
+
+
+def test_learned_templates_survive_restart(matcher, frame):
+    matcher.learn("Save Button", frame, (300, 200))
+    fresh = TemplateMatcher(template_dir=matcher.template_dir, template_size=64, scale=4)
+    assert fresh.match("Save Button", frame) is not None
+
+
+def test_forget_removes_templates_from_memory_and_disk(matcher, frame):
+    matcher.learn("Save Button", frame, (300, 200))
+    matcher.learn("Cancel", frame, (100, 100))
+    matcher.forget("Save Button")
+    assert matcher.match("Save Button", frame) is None
+    assert len(os.listdir(matcher.template_dir)) == 1
+    fresh = TemplateMatcher(template_dir=matcher.template_dir, template_size=64, scale=4)
+    assert fresh.match("Save Button", frame) is None
+    assert fresh.match("Cancel", frame) is not None